@@ -0,0 +1,204 @@
+import os
+import re
+import string
+from collections import deque
+
+
+# Words whose presence makes a very short answer worth sending to the LLM.
+# Matched as substrings, so e.g. 'hook' also matches 'hooks'.
+TECHNICAL_KEYWORDS = frozenset([
+    'react', 'javascript', 'node', 'html', 'css', 'api', 'database', 'server', 'client', 'frontend',
+    'backend', 'function', 'variable', 'component', 'state', 'props', 'hook', 'async', 'await', 'promise',
+    'json', 'http', 'rest', 'graphql', 'sql', 'nosql', 'mongodb', 'mysql', 'postgresql', 'redis',
+    'docker', 'kubernetes', 'aws', 'azure', 'git', 'github', 'ci', 'cd', 'testing', 'jest', 'cypress',
+    'selenium', 'typescript', 'webpack', 'babel', 'npm', 'yarn', 'package', 'module', 'import', 'export',
+    'class', 'object', 'array', 'string', 'number', 'boolean', 'null', 'undefined', 'error', 'exception',
+    'try', 'catch', 'finally', 'if', 'else', 'for', 'while', 'loop', 'recursion', 'algorithm',
+    'data structure', 'method', 'property', 'attribute', 'element', 'dom', 'bom', 'event', 'listener',
+    'callback', 'closure', 'scope', 'hoisting', 'prototype', 'inheritance', 'polymorphism',
+    'encapsulation', 'abstraction', 'solid', 'dry', 'kiss', 'yagni', 'mvc', 'mvp', 'mvvm', 'flux', 'redux',
+    'mobx', 'rxjs', 'observable', 'subject', 'behavior', 'replay', 'then', 'resolve', 'reject', 'pending',
+    'fulfilled', 'rejected', 'settled', 'race', 'all', 'allsettled', 'any',
+    # React hooks, which are too long to hit 'hook' and too short to pass on length
+    'usestate', 'useeffect', 'usememo', 'usecallback', 'useref', 'usecontext', 'usereducer'
+])
+
+# Whole answers that only express uncertainty (compared after normalization)
+NON_ANSWERS = frozenset([
+    'idk', 'dunno', 'no idea', 'dont know', "don't know", 'not sure', 'maybe', 'probably', 'i think',
+    'i guess', 'not really', 'kind of', 'sort of', 'a bit', 'a little', 'somewhat', 'somehow', 'somewhere',
+    'sometime', 'someone', 'something', 'anything', 'everything', 'nothing', 'whatever', 'anyway',
+    'anyhow', 'someway',
+    "i don't know", 'i dont know', 'i do not know', 'no clue', 'not sure sorry', 'skip', 'pass', 'n/a'
+])
+
+_GIBBERISH = re.compile(r'[a-z]{10,}')
+_REPEATED_CHARACTER = re.compile(r'(.)\1{4,}')
+_REPEATED_WORD = re.compile(r'(\w+)(?:\s+\1){3,}')
+_TRAILING_PUNCTUATION = string.punctuation.replace('/', '') + string.whitespace
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton: finds any of many keywords in one pass over the text"""
+
+    def __init__(self, keywords):
+        """Build the trie with failure links for ``keywords``"""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+
+        for keyword in keywords:
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                node = next_node
+            self._output[node] = keyword
+
+        # Breadth-first so every failure link points at an already finished node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+
+    def search(self, text):
+        """Return the first keyword found in ``text``, or None"""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node] is not None:
+                return output[node]
+        return None
+
+
+_TECHNICAL_MATCHER = KeywordMatcher(TECHNICAL_KEYWORDS)
+
+
+def _is_empty(answer):
+    return answer['stripped'] == ''
+
+
+def _is_gibberish(answer):
+    # A single run of letters with no spaces, e.g. "fdkjvbvvkbvsd"
+    return _GIBBERISH.fullmatch(answer['lower']) is not None
+
+
+def _is_repeated_character(answer):
+    return _REPEATED_CHARACTER.fullmatch(answer['lower']) is not None
+
+
+def _is_punctuation_only(answer):
+    # Digits count as content: numeric and formula answers go to the LLM
+    return not any(char.isalnum() for char in answer['lower'])
+
+
+def _is_repeated_word(answer):
+    return _REPEATED_WORD.fullmatch(answer['lower']) is not None
+
+
+def _is_short_non_technical(answer):
+    return len(answer['stripped']) < 10 and _TECHNICAL_MATCHER.search(answer['lower']) is None
+
+
+def _is_non_answer(answer):
+    return answer['lower'] in NON_ANSWERS or answer['lower'].strip(_TRAILING_PUNCTUATION) in NON_ANSWERS
+
+
+# Rules in evaluation order: (name, test, score, communication score,
+# feedback, areas for improvement, suggestions). The first matching rule
+# scores the answer; answers no rule matches go to the LLM.
+DEFAULT_RULES = (
+    ('empty', _is_empty, 0, 0,
+     "No answer provided. Please provide a response to receive a score.",
+     "Provide a complete answer to the question",
+     "Take time to read the question carefully and provide a thoughtful response"),
+    ('gibberish', _is_gibberish, 5, 1,
+     "Answer appears to be random characters or gibberish. Please provide a meaningful response to the technical question.",
+     "Provide a coherent technical answer",
+     "Read the question carefully and provide a relevant technical response"),
+    ('repeated_character', _is_repeated_character, 5, 1,
+     "Answer appears to be repeated characters. Please provide a meaningful response to the technical question.",
+     "Provide a coherent technical answer",
+     "Read the question carefully and provide a relevant technical response"),
+    ('too_short', _is_short_non_technical, 10, 2,
+     "Answer is too short and doesn't contain technical content. Please provide a more detailed response explaining your technical knowledge.",
+     "Provide a more detailed technical answer",
+     "Expand your answer with technical details and examples"),
+    ('non_answer', _is_non_answer, 15, 3,
+     "Answer indicates uncertainty. Please provide a more confident response based on your technical knowledge.",
+     "Provide a more confident technical answer",
+     "Draw from your technical knowledge and experience to provide a more detailed response"),
+    ('punctuation_only', _is_punctuation_only, 5, 1,
+     "Answer contains no words. Please provide a meaningful response to the technical question.",
+     "Provide a coherent technical answer",
+     "Read the question carefully and provide a relevant technical response"),
+    ('repeated_word', _is_repeated_word, 5, 1,
+     "Answer appears to be one word repeated. Please provide a meaningful response to the technical question.",
+     "Provide a coherent technical answer",
+     "Read the question carefully and provide a relevant technical response")
+)
+
+
+class AnswerPrefilter:
+    """Scores empty, gibberish, too-short and non-answers locally, without the LLM.
+
+    Rules come from a table (``DEFAULT_RULES``) and are tried in order; the
+    PREFILTER_DISABLED_RULES environment variable (comma-separated rule
+    names) switches individual rules off.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES, disabled=None):
+        """Initialize the engine from a rule table"""
+        if disabled is None:
+            disabled = [name.strip() for name in os.getenv('PREFILTER_DISABLED_RULES', '').split(',') if name.strip()]
+        self.rules = tuple(rule for rule in rules if rule[0] not in set(disabled))
+
+    def classify(self, answer):
+        """Return (rule name, score response data) for an answer a rule catches, or None"""
+        answer = answer or ''
+        stripped = answer.strip()
+        normalized = {'stripped': stripped, 'lower': stripped.lower()}
+        for name, test, score, communication, feedback, improvement, suggestion in self.rules:
+            if test(normalized):
+                return name, {
+                    "success": True,
+                    "score": score,
+                    "feedback": feedback,
+                    "detailed_scores": {
+                        "technical_accuracy": 0,
+                        "problem_solving": 0,
+                        "communication": communication,
+                        "relevance": 0,
+                        "depth_of_knowledge": 0
+                    },
+                    "strengths": [],
+                    "areas_for_improvement": [improvement],
+                    "suggestions": [suggestion]
+                }
+        return None
+
+    def classify_many(self, answers):
+        """Classify a batch of answers; identical answers are only evaluated once"""
+        seen = {}
+        results = []
+        for answer in answers:
+            key = answer or ''
+            if key not in seen:
+                seen[key] = self.classify(key)
+            results.append(seen[key])
+        return results
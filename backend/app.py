@@ -1,16 +1,55 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
-from flask_restx import Api, Resource, fields, Namespace
+from flask_restx import Api, Resource, fields, Namespace, marshal
 import os
+import io
+import csv
+import re
+import json
+import math
+import time
+import logging
+import hashlib
 import tempfile
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from resume_parser import ResumeParser
+from resume_parser import ResumeParser, PARSER_VERSION
+from llm_client import LLMClient, LLMError, LLMUnavailable, LLMDeadlineExceeded
+from resilience import Deadline
+from rate_limiter import RateLimiter, PRIORITY_INTERACTIVE, PRIORITY_QUESTIONS, PRIORITY_SUMMARY, PRIORITY_BACKGROUND
+from parse_pool import ParsePool, ParsePoolFull, ParseLimitExceeded, ParseTimeout
+from bulk_ingest import SUPPORTED_EXTENSIONS, iter_zip_items, ingest
+from question_bank import QuestionBank
+from email_validation import DeliverabilityChecker
+from answer_prefilter import AnswerPrefilter
+from local_scorer import LocalScorer
+from singleflight import SingleFlight
+from job_queue import JobQueue, DONE, QUEUED, RUNNING
+from candidate_store import CandidateStore, InvalidQuery, SUMMARY_FIELDS, summary_input
+from cache import ResultCache
+from streaming import sse_comment, sse_event, JSONObjectStream
+from prompts import build_question_messages, build_score_messages, build_summary_messages
+from logging_config import configure_logging, init_request_ids
+import metrics
+import storage
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Structured, leveled logging with per-request IDs
+configure_logging()
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+init_request_ids(app)
+
+# Prometheus-style metrics, aggregated across workers through METRICS_DIR
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+if METRICS_ENABLED:
+    metrics.configure()
+    metrics.init_request_metrics(app)
 
 # Initialize Flask-RESTX API
 api = Api(
@@ -25,15 +64,62 @@ api = Api(
 # Initialize resume parser
 parser = ResumeParser()
 
+# Initialize opt-in email deliverability checks (parsing itself validates syntax offline)
+email_checker = DeliverabilityChecker()
+
+# Server-side candidate store for the interviewer dashboard
+candidate_store = CandidateStore()
+
+# Initialize process pool for CPU-bound parsing (inline when disabled)
+parse_pool = ParsePool()
+
+# Initialize a separate pool for bulk ingestion so backfills never queue
+# behind (or ahead of) interactive single-resume parses
+bulk_parse_pool = ParsePool(
+    max_workers=int(os.getenv('BULK_PARSE_WORKERS', 2)),
+    timeout=float(os.getenv('PARSE_TIMEOUT', 60))
+)
+BULK_MAX_FILES = int(os.getenv('BULK_MAX_FILES', 500))
+BULK_MAX_FILE_BYTES = int(os.getenv('BULK_MAX_FILE_BYTES', 20 * 1024 * 1024))
+
+# Initialize parse cache keyed by upload content (in-process LRU plus optional shared SQLite layer)
+parse_cache = ResultCache(
+    namespace='resume-parse',
+    version=PARSER_VERSION,
+    max_entries=int(os.getenv('PARSE_CACHE_MAX_ENTRIES', 200)),
+    ttl=int(os.getenv('PARSE_CACHE_TTL', 24 * 3600)),
+    db_path=storage.data_path('parse_cache.db') if os.getenv('PARSE_CACHE_SHARED', 'true').lower() == 'true' else None,
+    max_disk_entries=int(os.getenv('PARSE_CACHE_MAX_DISK_ENTRIES', 5000))
+)
+
+# Initialize OpenAI quota limiter shared by all workers on this host
+rate_limiter = RateLimiter()
+
+# Initialize shared, connection-pooled OpenAI client
+llm_client = LLMClient(rate_limiter=rate_limiter)
+
+# Time budget in seconds for all OpenAI attempts (retries included) of one request
+LLM_DEADLINE_QUESTIONS = float(os.getenv('LLM_DEADLINE_QUESTIONS', 60))
+LLM_DEADLINE_SCORE = float(os.getenv('LLM_DEADLINE_SCORE', 20))
+LLM_DEADLINE_SUMMARY = float(os.getenv('LLM_DEADLINE_SUMMARY', 45))
+
+# Send a duplicate scoring request if the first has not answered after this many seconds (0 disables)
+SCORE_HEDGE_AFTER = float(os.getenv('SCORE_HEDGE_AFTER', 0))
+
+# Response headers for server-sent event streams (disable proxy buffering)
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
 # Define namespaces
 health_ns = Namespace('health', description='Health check operations')
 resume_ns = Namespace('resume', description='Resume parsing operations')
 chat_ns = Namespace('chat', description='AI chat operations')
+candidates_ns = Namespace('candidates', description='Candidate store for the interviewer dashboard')
 
 # Add namespaces to API
 api.add_namespace(health_ns)
 api.add_namespace(resume_ns)
 api.add_namespace(chat_ns)
+api.add_namespace(candidates_ns)
 
 # Root route with navigation links
 @app.route('/')
@@ -46,17 +132,41 @@ def index():
         "links": {
             "health": "/api/v1/health/",
             "docs": "/docs/",
-            "swagger_json": "/api/v1/swagger.json"
+            "swagger_json": "/api/v1/swagger.json",
+            "metrics": "/metrics"
         },
         "endpoints": {
             "health_check": "GET /api/v1/health/",
+            "llm_health_check": "GET /api/v1/health/llm",
+            "question_bank_health_check": "GET /api/v1/health/question-bank",
+            "parse_pool_health_check": "GET /api/v1/health/parse-pool",
+            "rate_limit_health_check": "GET /api/v1/health/rate-limit",
             "parse_resume": "POST /api/v1/resume/parse",
+            "parse_resume_bulk": "POST /api/v1/resume/parse-bulk",
+            "parse_cache": "GET|DELETE /api/v1/resume/parse-cache",
             "generate_questions": "POST /api/v1/chat/generate-questions",
+            "generate_questions_stream": "POST /api/v1/chat/generate-questions/stream",
             "score_answer": "POST /api/v1/chat/score-answer",
-            "generate_summary": "POST /api/v1/chat/generate-summary"
+            "score_answers": "POST /api/v1/chat/score-answers",
+            "score_cache": "GET|DELETE /api/v1/chat/score-cache",
+            "generate_summary": "POST /api/v1/chat/generate-summary",
+            "generate_summary_stream": "POST /api/v1/chat/generate-summary/stream",
+            "summary_jobs": "GET /api/v1/chat/summary-jobs",
+            "summary_job": "GET /api/v1/chat/summary-jobs/{id}",
+            "list_candidates": "GET|POST /api/v1/candidates/",
+            "candidate": "GET|PUT|DELETE /api/v1/candidates/{id}",
+            "candidate_stats": "GET /api/v1/candidates/stats",
+            "export_candidates": "GET /api/v1/candidates/export"
         }
     })
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics for all workers on this host"""
+    if not METRICS_ENABLED:
+        return jsonify({"success": False, "error": "Metrics are disabled"}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # Define models for request/response documentation
 health_response_model = api.model('HealthResponse', {
     'status': fields.String(required=True, description='Service status', example='healthy'),
@@ -69,7 +179,18 @@ resume_parse_response_model = api.model('ResumeParseResponse', {
         'name': fields.String(description='Extracted name', example='John Doe'),
         'email': fields.String(description='Extracted email', example='john.doe@example.com'),
         'phone': fields.String(description='Extracted phone number', example='+1-555-123-4567'),
-        'text': fields.String(description='Full resume text content')
+        'text': fields.String(description='Full resume text content (only with include_text=true)'),
+        'confidence': fields.Nested(api.model('ContactConfidence', {
+            'name': fields.Float(description='Confidence in the extracted name (0-1)', example=0.95),
+            'email': fields.Float(description='Confidence in the extracted email (0-1)', example=0.85),
+            'phone': fields.Float(description='Confidence in the extracted phone number (0-1)', example=0.7)
+        }), description='How each contact field was found; 0 when not found'),
+        'pages': fields.List(fields.Nested(api.model('PageTiming', {
+            'page': fields.Integer(description='Page number', example=1),
+            'method': fields.String(description='Extractor that produced the page text', enum=['pdfplumber', 'PyPDF2', 'failed'], example='pdfplumber'),
+            'seconds': fields.Float(description='Extraction time for the page', example=0.12),
+            'chars': fields.Integer(description='Extracted characters', example=3197)
+        })), description='Per-page extraction timing (PDF only)')
     }), description='Parsed resume data'),
     'error': fields.String(description='Error message if operation failed')
 })
@@ -94,7 +215,18 @@ score_request_model = api.model('ScoreRequest', {
         'difficulty': fields.String(required=True, description='Question difficulty'),
         'category': fields.String(required=True, description='Question category')
     }), required=True, description='Question details'),
-    'answer': fields.String(required=True, description='Candidate answer', example='let and const are block-scoped while var is function-scoped...')
+    'answer': fields.String(required=True, description='Candidate answer', example='let and const are block-scoped while var is function-scoped...'),
+    'summary_candidate': fields.Nested(api.model('SummaryCandidate', {
+        'name': fields.String(description='Candidate name', example='John Doe'),
+        'email': fields.String(description='Candidate email', example='john.doe@example.com'),
+        'answers': fields.List(fields.Nested(api.model('PreviousAnswer', {
+            'answer': fields.String(description='Answer text'),
+            'score': fields.Integer(description='Answer score')
+        })), description='Answers given before this one'),
+        'questions': fields.List(fields.Nested(api.model('SummaryQuestion', {
+            'text': fields.String(description='Question text')
+        })), description='All interview questions')
+    }), description='Send with the final answer to start generating the candidate summary in the background')
 })
 
 detailed_scores_model = api.model('DetailedScores', {
@@ -113,9 +245,41 @@ score_response_model = api.model('ScoreResponse', {
     'strengths': fields.List(fields.String, description='Identified strengths', example=['Clear explanation', 'Good examples']),
     'areas_for_improvement': fields.List(fields.String, description='Areas for improvement', example=['More technical depth']),
     'suggestions': fields.List(fields.String, description='Suggestions for improvement', example=['Practice more coding problems']),
+    'scorer': fields.String(description='What scored the answer: the pre-filters, the local scorer or the LLM', enum=['prefilter', 'local', 'llm'], example='llm'),
+    'confidence': fields.Float(description='Local scorer confidence (0-1); only set when scorer is local', example=0.91),
+    'summary_job_id': fields.String(description='Background summary job started for summary_candidate; poll /chat/summary-jobs/{id}'),
     'error': fields.String(description='Error message if operation failed')
 })
 
+score_batch_request_model = api.model('ScoreBatchRequest', {
+    'items': fields.List(fields.Nested(score_request_model), required=True, description='Question and answer pairs to score')
+})
+
+score_batch_response_model = api.model('ScoreBatchResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'results': fields.List(fields.Nested(score_response_model), description='Per-item score results, in request order'),
+    'scored_locally': fields.Integer(description='Valid items scored by the pre-filters or the local scorer instead of the LLM', example=2),
+    'error': fields.String(description='Error message if operation failed')
+})
+
+cache_stats_model = api.model('CacheStats', {
+    'namespace': fields.String(description='Cache namespace', example='score-answer'),
+    'version': fields.String(description='Cache version; entries from other versions are discarded', example='1'),
+    'shared': fields.Boolean(description='Whether the shared on-disk layer is enabled'),
+    'memory_hits': fields.Integer(description='Hits served from this worker\'s memory', example=12),
+    'disk_hits': fields.Integer(description='Hits served from the shared on-disk layer', example=3),
+    'misses': fields.Integer(description='Lookups that required a fresh computation', example=40),
+    'sets': fields.Integer(description='Entries written by this worker', example=40),
+    'evictions': fields.Integer(description='Entries evicted from this worker\'s memory', example=0),
+    'hit_ratio': fields.Float(description='Hits divided by lookups for this worker', example=0.27),
+    'memory_entries': fields.Integer(description='Entries held in this worker\'s memory', example=40),
+    'disk_entries': fields.Integer(description='Entries held in the shared on-disk layer', example=120)
+})
+
+parse_cache_stats_model = api.inherit('ParseCacheStats', cache_stats_model, {
+    'bytes_saved': fields.Integer(description='Upload bytes this worker did not have to parse thanks to cache hits', example=524288)
+})
+
 candidate_model = api.model('Candidate', {
     'name': fields.String(required=True, description='Candidate name', example='John Doe'),
     'email': fields.String(required=True, description='Candidate email', example='john.doe@example.com'),
@@ -130,12 +294,143 @@ candidate_model = api.model('Candidate', {
 })
 
 summary_request_model = api.model('SummaryRequest', {
-    'candidate': fields.Nested(candidate_model, required=True, description='Candidate data for summary generation')
+    'candidate': fields.Nested(candidate_model, description='Candidate data for summary generation'),
+    'candidate_id': fields.String(description='Id of a stored candidate to summarize instead of posting its data; the summary is saved on it', example='candidate_1700000000000_ab12cd34e')
+})
+
+llm_health_response_model = api.model('LLMHealthResponse', {
+    'status': fields.String(required=True, description='LLM client status', example='healthy'),
+    'base_url': fields.String(description='Upstream base URL', example='https://api.openai.com/v1'),
+    'pool_connections': fields.Integer(description='Number of per-host pools to cache', example=4),
+    'pool_maxsize': fields.Integer(description='Maximum keep-alive connections per host', example=10),
+    'connect_timeout': fields.Float(description='Connect timeout in seconds', example=5.0),
+    'read_timeout': fields.Float(description='Read timeout in seconds', example=30.0),
+    'requests': fields.Integer(description='Upstream requests sent by this worker', example=42),
+    'errors': fields.Integer(description='Upstream requests that raised a connection error', example=0),
+    'in_flight': fields.Integer(description='Upstream requests currently in flight', example=1),
+    'max_retries': fields.Integer(description='Retries allowed per call', example=2),
+    'retries': fields.Integer(description='Retries sent after a rate limit, 5xx or network error', example=3),
+    'hedged': fields.Integer(description='Scoring calls that sent a hedged duplicate request', example=0),
+    'hedge_wins': fields.Integer(description='Hedged calls answered first by the duplicate', example=0),
+    'prompt_tokens_estimated': fields.Integer(description='Prompt tokens estimated before sending, for responses that reported usage', example=4120),
+    'prompt_tokens': fields.Integer(description='Prompt tokens OpenAI reported for the same responses', example=3985),
+    'circuit_breaker': fields.Nested(api.model('CircuitBreakerStats', {
+        'state': fields.String(description='Breaker state', enum=['closed', 'open', 'half_open'], example='closed'),
+        'consecutive_failures': fields.Integer(description='Upstream failures since the last success', example=0),
+        'opened': fields.Integer(description='Times the breaker opened', example=0),
+        'rejected': fields.Integer(description='Calls failed fast while the breaker was open', example=0)
+    }), description='Circuit breaker state for this worker'),
+    'pools': fields.List(fields.Raw, description='Per-host connection pool statistics')
+})
+
+question_bank_health_response_model = api.model('QuestionBankHealthResponse', {
+    'enabled': fields.Boolean(description='Whether questions are served from the bank'),
+    'stock': fields.Raw(description='Unserved questions per difficulty', example={'easy': 12, 'medium': 10, 'hard': 11}),
+    'low_watermark': fields.Integer(description='Stock per difficulty that triggers a background refill', example=4),
+    'target': fields.Integer(description='Stock per difficulty a refill aims for', example=20),
+    'refilling': fields.Boolean(description='Whether this worker is refilling the bank')
+})
+
+parse_pool_stats_model = api.model('ParsePoolStats', {
+    'workers': fields.Integer(description='Parsing processes; 0 parses inline without limits', example=2),
+    'in_flight': fields.Integer(description='Jobs running or queued', example=3),
+    'max_queue': fields.Integer(description='Jobs allowed to wait for a free process before requests get 503', example=8),
+    'submitted': fields.Integer(description='Jobs accepted by this worker', example=120),
+    'completed': fields.Integer(description='Jobs that returned a result', example=117),
+    'failed': fields.Integer(description='Jobs that raised an error', example=3),
+    'rejected': fields.Integer(description='Jobs refused because the queue was full', example=0),
+    'limit_exceeded': fields.Integer(description='Jobs stopped by the CPU, time or memory limit', example=1),
+    'pool_restarts': fields.Integer(description='Times the pool was replaced after a process died', example=0),
+    'avg_seconds': fields.Float(description='Smoothed job duration including queue time', example=0.42),
+    'max_jobs_per_worker': fields.Integer(description='Jobs a process runs before it is replaced', example=100),
+    'cpu_limit': fields.Integer(description='CPU seconds allowed per job', example=20),
+    'time_limit': fields.Float(description='Wall-clock seconds allowed per job', example=30),
+    'memory_limit_mb': fields.Integer(description='Address space cap per process in MiB; 0 disables it', example=1024)
+})
+
+rate_limit_health_response_model = api.model('RateLimitHealthResponse', {
+    'enabled': fields.Boolean(description='Whether OpenAI calls are rate limited client-side'),
+    'requests_per_minute': fields.Integer(description='Request quota shared by all workers; 0 disables it', example=3500),
+    'tokens_per_minute': fields.Integer(description='Estimated token quota shared by all workers; 0 disables it', example=200000),
+    'available': fields.Raw(description='Quota left in each bucket', example={'requests': 3490, 'tokens': 185000}),
+    'queue_depth': fields.Raw(description='Calls waiting for quota per priority', example={'interactive': 0, 'questions': 1, 'summary': 2, 'background': 0}),
+    'acquired': fields.Integer(description='Calls let through by this worker', example=120),
+    'waited': fields.Integer(description='Calls that had to wait for quota', example=6),
+    'rejected': fields.Integer(description='Calls refused because quota would not free up in time', example=0),
+    'wait_seconds_total': fields.Float(description='Seconds spent waiting for quota', example=3.2),
+    'wait_seconds_avg': fields.Float(description='Average wait of calls that waited', example=0.53),
+    'wait_seconds_max': fields.Float(description='Longest wait for quota', example=1.4)
+})
+
+parse_pool_health_response_model = api.model('ParsePoolHealthResponse', {
+    'parse': fields.Nested(parse_pool_stats_model, description='Pool used by /resume/parse'),
+    'bulk': fields.Nested(parse_pool_stats_model, description='Pool used by /resume/parse-bulk')
+})
+
+stored_candidate_model = api.model('StoredCandidate', {
+    'id': fields.String(required=True, description='Candidate id', example='candidate_1700000000000_ab12cd34e'),
+    'name': fields.String(description='Candidate name', example='John Doe'),
+    'email': fields.String(description='Candidate email', example='john.doe@example.com'),
+    'phone': fields.String(description='Candidate phone', example='5551234567'),
+    'interviewStatus': fields.String(description='Interview status', enum=['not_started', 'in_progress', 'paused', 'completed']),
+    'finalScore': fields.Float(description='Final interview score', example=85),
+    'summary': fields.String(description='Candidate summary'),
+    'createdAt': fields.String(description='When the candidate was first stored (ISO 8601)'),
+    'updatedAt': fields.String(description='When the candidate was last stored (ISO 8601)')
+})
+
+candidate_list_response_model = api.model('CandidateListResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'candidates': fields.List(fields.Nested(stored_candidate_model), description='One page of candidates'),
+    'total': fields.Integer(description='Candidates matching the filters, across all pages', example=1250),
+    'next_cursor': fields.String(description='Pass as `cursor` to get the next page; null on the last page'),
+    'error': fields.String(description='Error message if operation failed')
+})
+
+candidate_sync_request_model = api.model('CandidateSyncRequest', {
+    'candidates': fields.List(fields.Raw, required=True, description='Full candidate objects to insert or replace by id')
+})
+
+candidate_put_request_model = api.model('CandidatePutRequest', {
+    'candidate': fields.Raw(required=True, description='Full candidate object, including chat history and answers')
+})
+
+candidate_response_model = api.model('CandidateResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'candidate': fields.Raw(description='Full candidate object with createdAt and updatedAt'),
+    'error': fields.String(description='Error message if operation failed')
+})
+
+candidate_sync_response_model = api.model('CandidateSyncResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'candidates': fields.List(fields.Raw, description='The stored candidates'),
+    'error': fields.String(description='Error message if operation failed')
+})
+
+candidate_stats_response_model = api.model('CandidateStatsResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'counts': fields.Raw(description='Candidates per interview status', example={'not_started': 0, 'in_progress': 3, 'paused': 1, 'completed': 42})
 })
 
 summary_response_model = api.model('SummaryResponse', {
     'success': fields.Boolean(required=True, description='Operation success status'),
     'summary': fields.String(required=True, description='Generated candidate summary', example='John demonstrates solid technical knowledge...'),
+    'source': fields.String(description='Where the summary came from: a finished background job, an in-flight one, or a new OpenAI call', enum=['hit', 'attached', 'generated'], example='hit'),
+    'error': fields.String(description='Error message if operation failed')
+})
+
+summary_job_response_model = api.model('SummaryJobResponse', {
+    'success': fields.Boolean(required=True, description='Operation success status'),
+    'job': fields.Nested(api.model('SummaryJob', {
+        'id': fields.String(description='Job id'),
+        'status': fields.String(description='Job status', enum=['queued', 'running', 'done', 'failed']),
+        'summary': fields.String(description='Generated summary once done'),
+        'error': fields.String(description='Last error, if an attempt failed'),
+        'attempts': fields.Integer(description='Attempts started'),
+        'created_at': fields.Float(description='Queued at (Unix time)'),
+        'started_at': fields.Float(description='Last attempt started at (Unix time)'),
+        'finished_at': fields.Float(description='Finished at (Unix time)')
+    })),
     'error': fields.String(description='Error message if operation failed')
 })
 
@@ -149,11 +444,96 @@ class HealthCheck(Resource):
         """Health check endpoint"""
         return {"status": "healthy", "message": "Resume parser service is running"}
 
+@health_ns.route('/llm')
+class LLMHealthCheck(Resource):
+    @health_ns.doc('llm_health_check')
+    @health_ns.marshal_with(llm_health_response_model)
+    def get(self):
+        """LLM client connection pool statistics"""
+        stats = llm_client.stats()
+        if not os.getenv('OPENAI_API_KEY'):
+            stats['status'] = "unconfigured"
+        elif stats['circuit_breaker']['state'] != 'closed':
+            stats['status'] = "degraded"
+        else:
+            stats['status'] = "healthy"
+        return stats
+
+@health_ns.route('/question-bank')
+class QuestionBankHealthCheck(Resource):
+    @health_ns.doc('question_bank_health_check')
+    @health_ns.marshal_with(question_bank_health_response_model)
+    def get(self):
+        """Question bank stock levels"""
+        return question_bank.stats()
+
+@health_ns.route('/parse-pool')
+class ParsePoolHealthCheck(Resource):
+    @health_ns.doc('parse_pool_health_check')
+    @health_ns.marshal_with(parse_pool_health_response_model)
+    def get(self):
+        """Parse pool queue depth, job counters and limits"""
+        return {'parse': parse_pool.stats(), 'bulk': bulk_parse_pool.stats()}
+
+@health_ns.route('/rate-limit')
+class RateLimitHealthCheck(Resource):
+    @health_ns.doc('rate_limit_health_check')
+    @health_ns.marshal_with(rate_limit_health_response_model)
+    def get(self):
+        """OpenAI quota levels, queue depth and wait times"""
+        return rate_limiter.stats()
+
+# Uploads larger than this are spilled to a temp file instead of parsed from memory
+PARSE_SPILL_THRESHOLD = int(os.getenv('PARSE_SPILL_THRESHOLD', 8 * 1024 * 1024))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def read_upload(file, suffix):
+    """Read an uploaded file in chunks, hashing it as it goes.
+
+    Returns the SHA-256 hex digest, the size in bytes and the parse source:
+    a memoryview over the bytes, or the path of a temp file (which the caller must
+    remove) once the upload exceeds PARSE_SPILL_THRESHOLD.
+    """
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    temp_file = None
+    size = 0
+    try:
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            if temp_file is None and size > PARSE_SPILL_THRESHOLD:
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+                temp_file.write(buffer.getvalue())
+                buffer = None
+            if temp_file is not None:
+                temp_file.write(chunk)
+            else:
+                buffer.write(chunk)
+    except Exception:
+        if temp_file is not None:
+            temp_file.close()
+            os.unlink(temp_file.name)
+        raise
+
+    if temp_file is not None:
+        temp_file.close()
+        return digest.hexdigest(), size, temp_file.name
+    # A memoryview over the buffer avoids copying the upload again
+    return digest.hexdigest(), size, buffer.getbuffer()
+
 # Resume Parsing Endpoint
 @resume_ns.route('/parse')
 class ParseResume(Resource):
     @resume_ns.doc('parse_resume')
-    @resume_ns.expect(api.parser().add_argument('file', location='files', type='file', required=True, help='Resume file (PDF or DOCX)'))
+    @resume_ns.expect(
+        api.parser()
+        .add_argument('file', location='files', type='file', required=True, help='Resume file (PDF or DOCX)')
+        .add_argument('include_text', location='args', type=str, default='false', help='Set to true to also return the full resume text')
+    )
     @resume_ns.marshal_with(resume_parse_response_model)
     def post(self):
         """Parse resume file and extract information"""
@@ -174,14 +554,26 @@ class ParseResume(Resource):
             if file_ext not in allowed_extensions:
                 return {"success": False, "error": "Unsupported file type. Please upload PDF or DOCX file."}, 400
             
-            # Save file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_file:
-                file.save(temp_file.name)
-                temp_file_path = temp_file.name
+            # Without include_text only the contact fields are needed, so the
+            # parser can stop reading as soon as it has found all of them
+            include_text = request.args.get('include_text', 'false').lower() == 'true'
+            
+            # Small uploads stay in memory; large ones are spilled to a temp file
+            digest, size, source = read_upload(file, file_ext)
             
             try:
-                # Parse the resume
-                result = parser.parse_resume(temp_file_path)
+                # Re-uploads of the same file are served from the parse cache. The
+                # mode is part of the key because contacts-only parsing stops
+                # early and may return other values than a full parse
+                cache_key = parse_cache.make_key(digest, file_ext, include_text)
+                result = parse_cache.get(cache_key, saved=size)
+                if result is None:
+                    # Parse the resume
+                    result = parse_pool.parse(source, parser, contacts_only=not include_text, file_ext=file_ext)
+                    parse_cache.set(cache_key, result)
+                
+                # Deliverability has its own per-domain cache, so cached parses are checked too
+                result = email_checker.filter_results([result])[0]
                 
                 return {
                     "success": True,
@@ -189,16 +581,221 @@ class ParseResume(Resource):
                 }
                 
             finally:
-                # Clean up temporary file
-                if os.path.exists(temp_file_path):
-                    os.unlink(temp_file_path)
+                # Clean up spilled temporary file
+                if isinstance(source, str) and os.path.exists(source):
+                    os.unlink(source)
                     
+        except ParsePoolFull as e:
+            # Shed load instead of tying up this request worker in a long queue
+            return {
+                "success": False,
+                "error": str(e)
+            }, 503, {'Retry-After': str(e.retry_after)}
+        except (ParseLimitExceeded, MemoryError) as e:
+            # MemoryError is only seen here when parsing inline (PARSE_POOL_WORKERS=0)
+            return {
+                "success": False,
+                "error": f"Resume is too large or complex to parse: {str(e) or 'out of memory'}"
+            }, 422
+        except ParseTimeout as e:
+            return {
+                "success": False,
+                "error": f"Resume is too large or complex to parse, or the parser is busy: {str(e)}"
+            }, 504
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Failed to parse resume: {str(e)}"
             }, 500
 
+# Bulk Resume Ingestion Endpoint
+def iter_upload_items(uploads):
+    """Yield (name, load) for uploaded resumes, expanding zip archives"""
+    for upload in uploads:
+        file_ext = os.path.splitext(upload.filename or '')[1].lower()
+        if file_ext == '.zip':
+            yield from iter_zip_items(upload.stream, upload.filename, max_file_bytes=BULK_MAX_FILE_BYTES)
+        elif file_ext in SUPPORTED_EXTENSIONS:
+            def load(upload=upload):
+                data = upload.read()
+                if len(data) > BULK_MAX_FILE_BYTES:
+                    raise ValueError(f"File is larger than {BULK_MAX_FILE_BYTES} bytes")
+                return data
+            yield upload.filename, load
+        else:
+            def load():
+                raise ValueError("Unsupported file type. Please upload PDF, DOCX or ZIP files.")
+            yield upload.filename, load
+
+@resume_ns.route('/parse-bulk')
+class ParseResumeBulk(Resource):
+    @resume_ns.doc('parse_resume_bulk', produces=['application/x-ndjson'])
+    @resume_ns.expect(
+        api.parser()
+        .add_argument('files', location='files', type='file', action='append', required=True, help='Resume files (PDF or DOCX) and/or ZIP archives of them')
+        .add_argument('include_text', location='args', type=str, default='false', help='Set to true to also return the full resume text')
+    )
+    def post(self):
+        """Parse many resumes, streaming one NDJSON line per file as each finishes.
+
+        Each line has the file name and either `data` (ResumeData) or
+        `error`; one failing file does not affect the others. The last line
+        is a `summary` with counts, failures and throughput.
+        """
+        uploads = [upload for upload in request.files.getlist('files') if upload.filename]
+        if not uploads:
+            return {"success": False, "error": "No files provided"}, 400
+
+        include_text = request.args.get('include_text', 'false').lower() == 'true'
+
+        def generate():
+            records = ingest(
+                iter_upload_items(uploads),
+                bulk_parse_pool,
+                parser,
+                contacts_only=not include_text,
+                max_files=BULK_MAX_FILES,
+                email_checker=email_checker
+            )
+            try:
+                for record in records:
+                    yield json.dumps(record) + '\n'
+            except Exception as e:
+                # Per-file failures are reported inline and never get here
+                logger.exception("Bulk ingestion aborted")
+                yield json.dumps({"success": False, "error": f"Bulk ingestion aborted: {str(e)}"}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=SSE_HEADERS)
+
+# Parse Cache Endpoint
+def parse_cache_stats():
+    """Return parse cache counters with the saved total reported in bytes"""
+    stats = parse_cache.stats()
+    stats['bytes_saved'] = stats.pop('saved')
+    return stats
+
+@resume_ns.route('/parse-cache')
+class ParseCache(Resource):
+    @resume_ns.doc('parse_cache_stats')
+    @resume_ns.marshal_with(parse_cache_stats_model)
+    def get(self):
+        """Parse cache hit/miss counters and bytes saved"""
+        return parse_cache_stats()
+
+    @resume_ns.doc('parse_cache_invalidate')
+    @resume_ns.marshal_with(parse_cache_stats_model)
+    def delete(self):
+        """Drop all cached parse results"""
+        parse_cache.invalidate()
+        return parse_cache_stats()
+
+# Question Generation
+# Room for six questions with their reference answers
+QUESTION_MAX_TOKENS = 2500
+
+def llm_error_response(e):
+    """Map an LLMError to an error response: 503 with Retry-After while the
+    circuit is open, 504 when the deadline ran out and 500 otherwise"""
+    body = {"success": False, "error": str(e)}
+    if isinstance(e, LLMUnavailable):
+        return body, 503, {'Retry-After': str(e.retry_after)}
+    if isinstance(e, LLMDeadlineExceeded):
+        return body, 504
+    return body, 500
+
+def check_api_key():
+    """Raise LLMError if no OpenAI API key is configured"""
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise LLMError("OpenAI API key not found in environment variables")
+    return api_key
+
+def generate_questions_with_llm(priority=PRIORITY_QUESTIONS):
+    """Request a fresh question set from OpenAI and return the raw question dicts"""
+    # Check if API key is available
+    api_key = check_api_key()
+    
+    # Use the shared pooled client
+    logger.info("Requesting interview questions from OpenAI")
+    response = llm_client.chat_completion(
+        messages=build_question_messages(),
+        max_tokens=QUESTION_MAX_TOKENS,
+        temperature=0.7,
+        deadline=Deadline(LLM_DEADLINE_QUESTIONS),
+        priority=priority
+    )
+    
+    if response.status_code != 200:
+        error_text = response.text
+        logger.error("OpenAI API error", extra={'status': response.status_code, 'body': error_text[:500]})
+        raise LLMError(f"OpenAI API call failed with status {response.status_code}: {error_text}")
+    
+    result = response.json()
+    questions_text = result['choices'][0]['message']['content']
+    
+    if not questions_text or questions_text.strip() == "":
+        logger.error("Empty response from OpenAI")
+        raise LLMError("OpenAI returned empty response")
+    
+    logger.debug("Question response received", extra={'chars': len(questions_text)})
+    
+    questions = parse_questions_text(questions_text)
+    store_references(questions)
+    return questions
+
+def parse_questions_text(questions_text):
+    """Parse the question list returned by OpenAI, unwrapping markdown code blocks"""
+    # Parse the JSON response
+    try:
+        questions = json.loads(questions_text)
+    except json.JSONDecodeError as e:
+        logger.warning("Question response is not plain JSON: %s", e)
+        
+        # Try to extract JSON from the response if it's wrapped in markdown
+        try:
+            # Look for JSON code blocks
+            json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', questions_text, re.DOTALL)
+            if json_match:
+                json_text = json_match.group(1)
+                questions = json.loads(json_text)
+            else:
+                raise Exception("No JSON found in response")
+        except Exception as extract_error:
+            logger.error("Could not extract JSON from question response: %s", extract_error)
+            raise LLMError(f"Failed to parse AI response as JSON: {str(e)}. Could not extract JSON: {str(extract_error)}")
+    
+    return questions
+
+def store_references(questions):
+    """Keep the reference answers of generated questions for local scoring"""
+    try:
+        local_scorer.add_references(questions)
+    except Exception as e:
+        logger.warning("Could not store reference answers: %s", e)
+
+def format_questions(questions):
+    """Number questions and derive time limits from difficulty"""
+    formatted_questions = []
+    for i, q in enumerate(questions):
+        formatted_questions.append({
+            "id": str(i + 1),
+            "text": q.get("text", ""),
+            "difficulty": q.get("difficulty", "easy"),
+            "timeLimit": 20 if q.get("difficulty") == "easy" else 60 if q.get("difficulty") == "medium" else 120,
+            "category": q.get("category", "Frontend")
+        })
+    return formatted_questions
+
+# Initialize local scorer; reference answers are stored as questions are generated
+local_scorer = LocalScorer()
+
+# Initialize pre-generated question bank (refilled in the background)
+# Refills only use quota that interactive requests leave over
+question_bank = QuestionBank(
+    generator=lambda: generate_questions_with_llm(priority=PRIORITY_BACKGROUND),
+    can_refill=lambda: bool(os.getenv('OPENAI_API_KEY'))
+)
+
 # Question Generation Endpoint
 @chat_ns.route('/generate-questions')
 class GenerateQuestions(Resource):
@@ -207,137 +804,286 @@ class GenerateQuestions(Resource):
     def post(self):
         """Generate interview questions using AI"""
         try:
-            # Check if API key is available
-            api_key = os.getenv('OPENAI_API_KEY')
-            if not api_key:
-                return {
-                    "success": False,
-                    "error": "OpenAI API key not found in environment variables"
-                }, 500
-            
-            prompt = """
-            Generate 6 technical interview questions for a full-stack developer position (React/Node.js).
-            Create 2 easy, 2 medium, and 2 hard questions.
-            Each question should be practical and relevant to real-world development.
-            Return the questions in JSON format with the following structure:
-            [
-              {
-                "id": "1",
-                "text": "Question text here",
-                "difficulty": "easy|medium|hard",
-                "timeLimit": 20|60|120,
-                "category": "Frontend|Backend|System Design|Database|DevOps"
-              }
-            ]
-            """
-            
-            print(f"🔑 Using API key: {api_key[:10]}...")
-            
-            # Use direct API call approach to avoid client initialization issues
-            print("🌐 Making direct OpenAI API call...")
-            import requests
-            
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an AI assistant that helps conduct technical interviews for full-stack developers. Provide clear, concise, and helpful responses."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 1500,
-                "temperature": 0.7
-            }
-            
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                error_text = response.text
-                print(f"❌ OpenAI API error: {response.status_code} - {error_text}")
-                return {
-                    "success": False,
-                    "error": f"OpenAI API call failed with status {response.status_code}: {error_text}"
-                }, 500
+            # Serve a pre-generated set when the bank has stock
+            questions = question_bank.take_set()
+            if questions:
+                logger.info("Serving questions from question bank")
+            else:
+                # Bank is empty: fall back to a live generation
+                questions = generate_questions_with_llm()
             
-            result = response.json()
-            questions_text = result['choices'][0]['message']['content']
-            print("✅ OpenAI API call succeeded")
-            
-            if not questions_text or questions_text.strip() == "":
-                print("❌ Empty response from OpenAI")
-                return {
-                    "success": False,
-                    "error": "OpenAI returned empty response"
-                }, 500
-            
-            print(f"📄 Response length: {len(questions_text)} characters")
-            print(f"📄 Response preview: {questions_text[:200]}...")
-            
-            # Parse the JSON response
-            import json
-            try:
-                questions = json.loads(questions_text)
-                print(f"✅ Parsed {len(questions)} questions")
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing error: {e}")
-                print(f"Raw response: {questions_text[:500]}...")
-                
-                # Try to extract JSON from the response if it's wrapped in markdown
-                try:
-                    # Look for JSON code blocks
-                    import re
-                    json_match = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', questions_text, re.DOTALL)
-                    if json_match:
-                        json_text = json_match.group(1)
-                        questions = json.loads(json_text)
-                        print(f"✅ Extracted JSON from markdown: {len(questions)} questions")
-                    else:
-                        raise Exception("No JSON found in response")
-                except Exception as extract_error:
-                    print(f"❌ Could not extract JSON: {extract_error}")
-                    return {
-                        "success": False,
-                        "error": f"Failed to parse AI response as JSON: {str(e)}. Could not extract JSON: {str(extract_error)}"
-                    }, 500
+            # Top the bank up in the background when stock runs low
+            question_bank.refill_if_low()
             
             # Ensure proper formatting
-            formatted_questions = []
-            for i, q in enumerate(questions):
-                formatted_questions.append({
-                    "id": str(i + 1),
-                    "text": q.get("text", ""),
-                    "difficulty": q.get("difficulty", "easy"),
-                    "timeLimit": 20 if q.get("difficulty") == "easy" else 60 if q.get("difficulty") == "medium" else 120,
-                    "category": q.get("category", "Frontend")
-                })
+            formatted_questions = format_questions(questions)
             
-            print(f"✅ Returning {len(formatted_questions)} formatted questions")
+            logger.debug("Returning %d formatted questions", len(formatted_questions))
             return {
                 "success": True,
                 "questions": formatted_questions
             }
             
+        except LLMError as e:
+            return llm_error_response(e)
         except Exception as e:
-            print(f"❌ Unexpected error: {e}")
+            logger.exception("Unexpected error generating questions")
             return {
                 "success": False,
                 "error": f"Failed to generate questions: {str(e)}"
             }, 500
 
+# Streaming Question Generation Endpoint
+@chat_ns.route('/generate-questions/stream')
+class GenerateQuestionsStream(Resource):
+    @chat_ns.doc('generate_questions_stream', produces=['text/event-stream'])
+    def post(self):
+        """Stream interview questions as server-sent events.
+
+        Emits a `question` event as soon as each question is complete, then a
+        `done` event with the QuestionsResponse payload (or an `error` event).
+        """
+        def generate():
+            try:
+                questions = question_bank.take_set()
+                if questions:
+                    formatted_questions = format_questions(questions)
+                    for question in formatted_questions:
+                        yield sse_event('question', question)
+                else:
+                    check_api_key()
+                    object_stream = JSONObjectStream()
+                    questions = []
+                    chunks = []
+                    for delta in llm_client.stream_chat_completion(
+                        messages=build_question_messages(),
+                        max_tokens=QUESTION_MAX_TOKENS,
+                        temperature=0.7,
+                        deadline=Deadline(LLM_DEADLINE_QUESTIONS),
+                        priority=PRIORITY_QUESTIONS
+                    ):
+                        chunks.append(delta)
+                        for question in object_stream.feed(delta):
+                            questions.append(question)
+                            yield sse_event('question', format_questions(questions)[-1])
+                    
+                    # Nothing streamed as separate objects: parse the whole completion
+                    if not questions:
+                        questions_text = ''.join(chunks)
+                        if not questions_text.strip():
+                            raise LLMError("OpenAI returned empty response")
+                        questions = parse_questions_text(questions_text)
+                        for question in format_questions(questions):
+                            yield sse_event('question', question)
+                    store_references(questions)
+                    formatted_questions = format_questions(questions)
+                
+                question_bank.refill_if_low()
+                yield sse_event('done', marshal({"success": True, "questions": formatted_questions}, questions_response_model))
+                
+            except LLMError as e:
+                yield sse_event('error', marshal({"success": False, "error": str(e)}, questions_response_model))
+            except Exception as e:
+                yield sse_event('error', marshal({"success": False, "error": f"Failed to generate questions: {str(e)}"}, questions_response_model))
+        
+        return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+# Answer Scoring
+SCORE_MODEL = "gpt-3.5-turbo"
+
+# Bump when the scoring prompt or response handling changes to invalidate cached scores
+SCORE_PROMPT_VERSION = "2"
+
+SCORE_STAGE_DURATION = metrics.Histogram(
+    'score_stage_duration_seconds', 'Time spent in each stage of scoring one answer', ('stage',)
+)
+
+def score_answer_with_llm(question, answer):
+    """Score an answer with OpenAI and return the score response data"""
+    messages, truncated = build_score_messages(question, answer)
+    if truncated:
+        logger.info("Truncated long answer for scoring", extra={'chars': len(str(answer))})
+    
+    # Use the shared pooled client
+    with SCORE_STAGE_DURATION.time(stage='openai'):
+        response = llm_client.chat_completion(
+            messages=messages,
+            max_tokens=800,
+            temperature=0.7,
+            model=SCORE_MODEL,
+            deadline=Deadline(LLM_DEADLINE_SCORE),
+            hedge_after=SCORE_HEDGE_AFTER or None,
+            priority=PRIORITY_INTERACTIVE
+        )
+    if response.status_code != 200:
+        raise LLMError(f"OpenAI API call failed with status {response.status_code}: {response.text}")
+    
+    with SCORE_STAGE_DURATION.time(stage='parse'):
+        result = response.json()
+        return parse_score_text(result['choices'][0]['message']['content'])
+
+def parse_score_text(result_text):
+    """Turn the scoring reply text from OpenAI into the score response data"""
+    # Parse the JSON response
+    try:
+        result = json.loads(result_text)
+        
+        # Validate and clean the response
+        score = max(0, min(100, result.get('score', 0)))
+        feedback = result.get('feedback', 'No feedback provided.')
+        
+        # Enhanced response with detailed scoring
+        response_data = {
+            "success": True,
+            "score": score,
+            "feedback": feedback,
+            "detailed_scores": {
+                "technical_accuracy": result.get('technical_accuracy', 0),
+                "problem_solving": result.get('problem_solving', 0),
+                "communication": result.get('communication', 0),
+                "relevance": result.get('relevance', 0),
+                "depth_of_knowledge": result.get('depth_of_knowledge', 0)
+            },
+            "strengths": result.get('strengths', []),
+            "areas_for_improvement": result.get('areas_for_improvement', []),
+            "suggestions": result.get('suggestions', [])
+        }
+        
+        return response_data
+        
+    except json.JSONDecodeError as e:
+        logger.warning("Score response is not valid JSON: %s", e)
+        
+        # Try to extract basic score and feedback if JSON parsing fails
+        score_match = re.search(r'"score":\s*(\d+)', result_text)
+        feedback_match = re.search(r'"feedback":\s*"([^"]+)"', result_text)
+        
+        if score_match and feedback_match:
+            return {
+                "success": True,
+                "score": int(score_match.group(1)),
+                "feedback": feedback_match.group(1),
+                "detailed_scores": {},
+                "strengths": [],
+                "areas_for_improvement": [],
+                "suggestions": []
+            }
+        else:
+            raise LLMError(f"Failed to parse scoring response: {str(e)}")
+
+def normalize_text(text):
+    """Casefold and collapse whitespace so trivially different inputs share a cache key"""
+    return ' '.join(str(text).casefold().split())
+
+# Initialize score cache (in-process LRU plus optional shared SQLite layer)
+score_cache = ResultCache(
+    namespace='score-answer',
+    version=SCORE_PROMPT_VERSION,
+    max_entries=int(os.getenv('SCORE_CACHE_MAX_ENTRIES', 2000)),
+    ttl=int(os.getenv('SCORE_CACHE_TTL', 7 * 24 * 3600)),
+    db_path=storage.data_path('score_cache.db') if os.getenv('SCORE_CACHE_SHARED', 'true').lower() == 'true' else None
+)
+
+# Initialize local pre-scoring engine for junk answers
+answer_prefilter = AnswerPrefilter()
+
+PREFILTER_RESULTS = metrics.Counter(
+    'score_prefilter_total', 'Answers by the pre-filter rule that scored them ("llm" when none did)', ('rule',)
+)
+
+def prefilter_answer(answer):
+    """Score empty, gibberish, too-short and non-answers locally.
+
+    Returns the score response data, or None if the answer needs the LLM.
+    """
+    return prefilter_answers([answer])[0]
+
+def prefilter_answers(answers):
+    """Run the pre-filter over a batch; returns score response data or None per answer"""
+    results = []
+    for classified in answer_prefilter.classify_many(answers):
+        PREFILTER_RESULTS.inc(rule=classified[0] if classified else 'llm')
+        results.append(dict(classified[1], scorer='prefilter') if classified else None)
+    return results
+
+# Trust a local score without asking the LLM at or above this confidence.
+# Off by default: check it with benchmarks/bench_local_scorer.py first
+LOCAL_SCORER_FAST_PATH = os.getenv('LOCAL_SCORER_FAST_PATH', 'false').lower() == 'true'
+LOCAL_SCORER_MIN_CONFIDENCE = float(os.getenv('LOCAL_SCORER_MIN_CONFIDENCE', 0.85))
+
+# Answer with the local score when OpenAI fails or is unavailable
+LOCAL_SCORER_FALLBACK = os.getenv('LOCAL_SCORER_FALLBACK', 'true').lower() == 'true'
+
+LOCAL_SCORES = metrics.Counter(
+    'score_local_total', 'Answers scored by the local scorer, by why it was used', ('outcome',)
+)
+
+def score_answer_locally(question, answer):
+    """Score an answer with the local scorer; returns None if that fails"""
+    if not LOCAL_SCORER_FAST_PATH and not LOCAL_SCORER_FALLBACK:
+        return None
+    try:
+        with SCORE_STAGE_DURATION.time(stage='local'):
+            return dict(local_scorer.score(question, answer), scorer='local')
+    except Exception as e:
+        logger.warning("Local scoring failed: %s", e)
+        return None
+
+def score_answer(question, answer):
+    """Score an answer: pre-filters first, then the score cache, the local scorer and OpenAI"""
+    with SCORE_STAGE_DURATION.time(stage='prefilter'):
+        prefiltered = prefilter_answer(answer)
+    if prefiltered is not None:
+        return prefiltered
+    
+    return score_answer_with_cache(question, answer)
+
+def score_answer_with_cache(question, answer):
+    """Score an answer that passed the pre-filters.
+
+    Consults the score cache first, then takes a confident local score
+    (fast path), then asks OpenAI, falling back to the local score if the
+    OpenAI call fails.
+    """
+    # Serve repeated (question, answer) pairs from the score cache
+    cache_key = score_cache.make_key(
+        normalize_text(question.get('text', '')),
+        normalize_text(question.get('difficulty', '')),
+        normalize_text(question.get('category', '')),
+        normalize_text(answer),
+        SCORE_MODEL
+    )
+    with SCORE_STAGE_DURATION.time(stage='cache'):
+        cached = score_cache.get(cache_key)
+    if cached is not None:
+        return dict(cached, scorer='llm')
+    
+    # Identical answers scored at the same time (double submits, retries) share one scoring
+    result, _ = score_flights.do(cache_key, lambda: score_uncached_answer(question, answer, cache_key))
+    return result
+
+def score_uncached_answer(question, answer, cache_key):
+    """Score an answer missing from the score cache and cache the OpenAI score"""
+    local = score_answer_locally(question, answer) if LOCAL_SCORER_FAST_PATH else None
+    if local is not None and local['confidence'] >= LOCAL_SCORER_MIN_CONFIDENCE:
+        LOCAL_SCORES.inc(outcome='fast_path')
+        return local
+    
+    try:
+        response_data = score_answer_with_llm(question, answer)
+    except (LLMError, requests.RequestException) as e:
+        if LOCAL_SCORER_FALLBACK and local is None:
+            local = score_answer_locally(question, answer)
+        if not LOCAL_SCORER_FALLBACK or local is None:
+            raise
+        logger.warning("Scoring with the local scorer, OpenAI failed: %s", e)
+        LOCAL_SCORES.inc(outcome='fallback')
+        return local
+    score_cache.set(cache_key, response_data)
+    return dict(response_data, scorer='llm')
+
+score_flights = SingleFlight('score', timeout=LLM_DEADLINE_SCORE + 5)
+
 # Answer Scoring Endpoint
 @chat_ns.route('/score-answer')
 class ScoreAnswer(Resource):
@@ -355,263 +1101,254 @@ class ScoreAnswer(Resource):
             question = data['question']
             answer = data['answer']
             
-            # Handle empty or missing answers
-            if not answer or answer.strip() == "":
-                return {
-                    "success": True,
-                    "score": 0,
-                    "feedback": "No answer provided. Please provide a response to receive a score.",
-                    "detailed_scores": {
-                        "technical_accuracy": 0,
-                        "problem_solving": 0,
-                        "communication": 0,
-                        "relevance": 0,
-                        "depth_of_knowledge": 0
-                    },
-                    "strengths": [],
-                    "areas_for_improvement": ["Provide a complete answer to the question"],
-                    "suggestions": ["Take time to read the question carefully and provide a thoughtful response"]
-                }
-            
-            # Detect and penalize nonsensical answers
-            answer_lower = answer.lower().strip()
+            result = score_answer(question, answer)
+            if isinstance(data.get('summary_candidate'), dict):
+                result = dict(result, summary_job_id=speculate_summary(data['summary_candidate'], answer, result['score']))
+            return result
             
-            # Check for random gibberish patterns
-            import re
+        except LLMError as e:
+            return llm_error_response(e)
             
-            # Pattern 1: Random character sequences (like fdkjvbvvkbvsd)
-            random_pattern = re.compile(r'^[a-z]{10,}$')
-            if random_pattern.match(answer_lower) and len(answer_lower) > 8:
-                return {
-                    "success": True,
-                    "score": 5,
-                    "feedback": "Answer appears to be random characters or gibberish. Please provide a meaningful response to the technical question.",
-                    "detailed_scores": {
-                        "technical_accuracy": 0,
-                        "problem_solving": 0,
-                        "communication": 1,
-                        "relevance": 0,
-                        "depth_of_knowledge": 0
-                    },
-                    "strengths": [],
-                    "areas_for_improvement": ["Provide a coherent technical answer"],
-                    "suggestions": ["Read the question carefully and provide a relevant technical response"]
-                }
-            
-            # Pattern 2: Repeated characters (like aaaaa, bbbbb)
-            repeated_pattern = re.compile(r'^(.)\1{4,}$')
-            if repeated_pattern.match(answer_lower):
-                return {
-                    "success": True,
-                    "score": 5,
-                    "feedback": "Answer appears to be repeated characters. Please provide a meaningful response to the technical question.",
-                    "detailed_scores": {
-                        "technical_accuracy": 0,
-                        "problem_solving": 0,
-                        "communication": 1,
-                        "relevance": 0,
-                        "depth_of_knowledge": 0
-                    },
-                    "strengths": [],
-                    "areas_for_improvement": ["Provide a coherent technical answer"],
-                    "suggestions": ["Read the question carefully and provide a relevant technical response"]
-                }
-            
-            # Pattern 3: Very short answers (less than 10 characters) that aren't technical
-            if len(answer.strip()) < 10:
-                # Check if it contains any technical keywords
-                technical_keywords = ['react', 'javascript', 'node', 'html', 'css', 'api', 'database', 'server', 'client', 'frontend', 'backend', 'function', 'variable', 'component', 'state', 'props', 'hook', 'async', 'await', 'promise', 'json', 'http', 'rest', 'graphql', 'sql', 'nosql', 'mongodb', 'mysql', 'postgresql', 'redis', 'docker', 'kubernetes', 'aws', 'azure', 'git', 'github', 'ci', 'cd', 'testing', 'jest', 'cypress', 'selenium', 'typescript', 'webpack', 'babel', 'npm', 'yarn', 'package', 'module', 'import', 'export', 'class', 'object', 'array', 'string', 'number', 'boolean', 'null', 'undefined', 'error', 'exception', 'try', 'catch', 'finally', 'if', 'else', 'for', 'while', 'loop', 'recursion', 'algorithm', 'data structure', 'array', 'object', 'function', 'method', 'property', 'attribute', 'element', 'dom', 'bom', 'event', 'listener', 'callback', 'closure', 'scope', 'hoisting', 'prototype', 'inheritance', 'polymorphism', 'encapsulation', 'abstraction', 'solid', 'dry', 'kiss', 'yagni', 'mvc', 'mvp', 'mvvm', 'flux', 'redux', 'mobx', 'rxjs', 'observable', 'subject', 'behavior', 'replay', 'async', 'await', 'promise', 'then', 'catch', 'finally', 'resolve', 'reject', 'pending', 'fulfilled', 'rejected', 'settled', 'race', 'all', 'allsettled', 'any', 'finally', 'finally', 'finally']
-                
-                has_technical_content = any(keyword in answer_lower for keyword in technical_keywords)
-                
-                if not has_technical_content:
-                    return {
-                        "success": True,
-                        "score": 10,
-                        "feedback": "Answer is too short and doesn't contain technical content. Please provide a more detailed response explaining your technical knowledge.",
-                        "detailed_scores": {
-                            "technical_accuracy": 0,
-                            "problem_solving": 0,
-                            "communication": 2,
-                            "relevance": 0,
-                            "depth_of_knowledge": 0
-                        },
-                        "strengths": [],
-                        "areas_for_improvement": ["Provide a more detailed technical answer"],
-                        "suggestions": ["Expand your answer with technical details and examples"]
-                    }
-            
-            # Pattern 4: Check for common non-answers
-            non_answers = ['idk', 'dunno', 'no idea', 'dont know', "don't know", 'not sure', 'maybe', 'probably', 'i think', 'i guess', 'not really', 'kind of', 'sort of', 'a bit', 'a little', 'somewhat', 'somehow', 'somewhere', 'sometime', 'someone', 'something', 'anything', 'everything', 'nothing', 'whatever', 'anyway', 'anyhow', 'somehow', 'someway', 'somewhere', 'sometime', 'someone', 'something', 'anything', 'everything', 'nothing', 'whatever', 'anyway', 'anyhow']
-            
-            if answer_lower in non_answers:
-                return {
-                    "success": True,
-                    "score": 15,
-                    "feedback": "Answer indicates uncertainty. Please provide a more confident response based on your technical knowledge.",
-                    "detailed_scores": {
-                        "technical_accuracy": 0,
-                        "problem_solving": 0,
-                        "communication": 3,
-                        "relevance": 0,
-                        "depth_of_knowledge": 0
-                    },
-                    "strengths": [],
-                    "areas_for_improvement": ["Provide a more confident technical answer"],
-                    "suggestions": ["Draw from your technical knowledge and experience to provide a more detailed response"]
-                }
-            
-            prompt = f"""
-            You are an expert technical interviewer evaluating a candidate's answer for a full-stack developer position.
-            
-            QUESTION DETAILS:
-            Question: {question.get('text', '')}
-            Difficulty Level: {question.get('difficulty', '')}
-            Category: {question.get('category', '')}
-            
-            CANDIDATE'S ANSWER:
-            {answer}
-            
-            EVALUATION CRITERIA:
-            Please evaluate this answer based on the following criteria (each worth 20 points, total 100):
-            
-            1. TECHNICAL ACCURACY (20 points):
-               - Correctness of technical concepts
-               - Understanding of the technology
-               - Accuracy of implementation details
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to score answer: {str(e)}"
+            }, 500
+
+# Batch Answer Scoring Endpoint
+@chat_ns.route('/score-answers')
+class ScoreAnswers(Resource):
+    @chat_ns.doc('score_answers')
+    @chat_ns.expect(score_batch_request_model)
+    @chat_ns.marshal_with(score_batch_response_model)
+    def post(self):
+        """Score several interview answers in one request"""
+        try:
+            data = request.get_json()
             
-            2. PROBLEM-SOLVING APPROACH (20 points):
-               - Logical thinking process
-               - Step-by-step reasoning
-               - Consideration of edge cases
-               - Alternative solutions mentioned
+            if not data or not isinstance(data.get('items'), list) or not data['items']:
+                return {"success": False, "error": "Missing items to score"}, 400
             
-            3. COMMUNICATION CLARITY (20 points):
-               - Clear explanation of concepts
-               - Well-structured response
-               - Use of appropriate technical terminology
-               - Ability to explain complex ideas simply
+            items = data['items']
+            max_items = int(os.getenv('SCORE_BATCH_MAX_ITEMS', 50))
+            if len(items) > max_items:
+                return {"success": False, "error": f"Too many items: at most {max_items} answers per batch"}, 400
             
-            4. RELEVANCE TO QUESTION (20 points):
-               - Directly addresses the question asked
-               - Stays on topic
-               - Provides relevant examples
-               - Shows understanding of the context
+            # Run the local pre-filters over the whole batch first
+            results = [None] * len(items)
+            valid = []
+            for i, item in enumerate(items):
+                if not isinstance(item, dict) or 'question' not in item or 'answer' not in item:
+                    results[i] = {"success": False, "error": "Missing question or answer data"}
+                elif not isinstance(item['answer'], str):
+                    results[i] = {"success": False, "error": "Answer must be a string"}
+                else:
+                    valid.append(i)
+            pending = []
+            for i, prefiltered in zip(valid, prefilter_answers([items[i]['answer'] for i in valid])):
+                if prefiltered is not None:
+                    results[i] = prefiltered
+                else:
+                    pending.append(i)
             
-            5. DEPTH OF KNOWLEDGE (20 points):
-               - Demonstrates deep understanding
-               - Shows practical experience
-               - Mentions best practices
-               - Shows awareness of industry standards
+            # Fan the remaining answers out to OpenAI with bounded concurrency
+            route = metrics.current_route()
+            def score_item(i):
+                try:
+                    # Attribute token usage in the pool threads to this route
+                    with metrics.attributed_to(route):
+                        return score_answer_with_cache(items[i]['question'], items[i]['answer'])
+                except LLMError as e:
+                    return {"success": False, "error": str(e)}
+                except Exception as e:
+                    return {"success": False, "error": f"Failed to score answer: {str(e)}"}
             
-            SCORING GUIDELINES:
-            - 90-100: Exceptional - Demonstrates mastery, provides excellent examples, shows deep understanding
-            - 80-89: Good - Solid understanding, good examples, minor gaps in knowledge
-            - 70-79: Satisfactory - Basic understanding, some good points, room for improvement
-            - 60-69: Below Average - Limited understanding, some correct points, significant gaps
-            - 40-59: Poor - Minimal understanding, many incorrect points, needs significant improvement
-            - 0-39: Very Poor - Little to no understanding, mostly incorrect, requires extensive learning
+            if pending:
+                concurrency = min(int(os.getenv('SCORE_BATCH_CONCURRENCY', 4)), len(pending))
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    for i, result in zip(pending, executor.map(score_item, pending)):
+                        results[i] = result
             
-            Return your evaluation in this exact JSON format:
-            {{
-                "score": 85,
-                "feedback": "Detailed feedback explaining the score and areas for improvement",
-                "technical_accuracy": 18,
-                "problem_solving": 17,
-                "communication": 16,
-                "relevance": 19,
-                "depth_of_knowledge": 15,
-                "strengths": ["List specific strengths shown in the answer"],
-                "areas_for_improvement": ["List specific areas that need improvement"],
-                "suggestions": ["Provide specific suggestions for improvement"]
-            }}
-            """
+            # Pre-filtered answers, plus local fast-path and fallback scores; invalid items are not counted
+            scored_locally = sum(1 for i in valid if results[i].get('scorer') in ('prefilter', 'local'))
             
-            # Use direct API call approach
-            import requests
-            headers = {
-                "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "system", "content": "You are an expert technical interviewer. Evaluate answers objectively and provide constructive feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": 800,
-                "temperature": 0.7
+            return {
+                "success": True,
+                "results": results,
+                "scored_locally": scored_locally
             }
             
-            response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data, timeout=30)
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"OpenAI API call failed with status {response.status_code}: {response.text}"
-                }, 500
-            
-            result = response.json()
-            result_text = result['choices'][0]['message']['content']
-            
-            # Parse the JSON response
-            import json
-            try:
-                result = json.loads(result_text)
-                
-                # Validate and clean the response
-                score = max(0, min(100, result.get('score', 0)))
-                feedback = result.get('feedback', 'No feedback provided.')
-                
-                # Enhanced response with detailed scoring
-                response_data = {
-                    "success": True,
-                    "score": score,
-                    "feedback": feedback,
-                    "detailed_scores": {
-                        "technical_accuracy": result.get('technical_accuracy', 0),
-                        "problem_solving": result.get('problem_solving', 0),
-                        "communication": result.get('communication', 0),
-                        "relevance": result.get('relevance', 0),
-                        "depth_of_knowledge": result.get('depth_of_knowledge', 0)
-                    },
-                    "strengths": result.get('strengths', []),
-                    "areas_for_improvement": result.get('areas_for_improvement', []),
-                    "suggestions": result.get('suggestions', [])
-                }
-                
-                return response_data
-                
-            except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing error in score response: {e}")
-                print(f"Raw response: {result_text[:500]}...")
-                
-                # Try to extract basic score and feedback if JSON parsing fails
-                import re
-                score_match = re.search(r'"score":\s*(\d+)', result_text)
-                feedback_match = re.search(r'"feedback":\s*"([^"]+)"', result_text)
-                
-                if score_match and feedback_match:
-                    return {
-                        "success": True,
-                        "score": int(score_match.group(1)),
-                        "feedback": feedback_match.group(1),
-                        "detailed_scores": {},
-                        "strengths": [],
-                        "areas_for_improvement": [],
-                        "suggestions": []
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to parse scoring response: {str(e)}"
-                    }, 500
-            
         except Exception as e:
             return {
                 "success": False,
-                "error": f"Failed to score answer: {str(e)}"
+                "error": f"Failed to score answers: {str(e)}"
             }, 500
 
+# Score Cache Endpoint
+@chat_ns.route('/score-cache')
+class ScoreCache(Resource):
+    @chat_ns.doc('score_cache_stats')
+    @chat_ns.marshal_with(cache_stats_model)
+    def get(self):
+        """Score cache hit/miss counters"""
+        return score_cache.stats()
+
+    @chat_ns.doc('score_cache_invalidate')
+    @chat_ns.marshal_with(cache_stats_model)
+    def delete(self):
+        """Drop all cached scores"""
+        score_cache.invalidate()
+        return score_cache.stats()
+
+# Summary Generation
+def summary_candidate(data):
+    """Return (candidate, stored candidate id) for a summary request body.
+
+    Returns (None, None) when the body names no candidate and raises
+    KeyError when ``candidate_id`` is not in the store.
+    """
+    if not data:
+        return None, None
+    if data.get('candidate_id'):
+        stored = candidate_store.get(str(data['candidate_id']))
+        if stored is None:
+            raise KeyError(data['candidate_id'])
+        return summary_input(stored), stored['id']
+    return data.get('candidate'), None
+
+def generate_summary_with_llm(candidate):
+    """Request a candidate summary from OpenAI and return its text"""
+    # Use the shared pooled client
+    response = llm_client.chat_completion(
+        messages=build_summary_messages(candidate),
+        max_tokens=500,
+        temperature=0.7,
+        deadline=Deadline(LLM_DEADLINE_SUMMARY),
+        priority=PRIORITY_SUMMARY
+    )
+    if response.status_code != 200:
+        raise LLMError(f"OpenAI API call failed with status {response.status_code}: {response.text}")
+    
+    result = response.json()
+    summary = result['choices'][0]['message']['content']
+    
+    if not summary or summary.strip() == "":
+        raise LLMError("OpenAI returned empty summary")
+    
+    return summary
+
+# Speculative Summaries
+# Summaries are generated in the background as soon as the final answer is
+# scored, keyed by a hash of the summary prompt, so the summary request that
+# follows returns the finished summary or waits for the in-flight job
+SUMMARY_MODEL = "gpt-3.5-turbo"
+SUMMARY_JOBS_ENABLED = os.getenv('SUMMARY_JOBS_ENABLED', 'true').lower() == 'true'
+
+# Longest a summary request waits for an in-flight job before generating itself
+SUMMARY_JOB_WAIT = float(os.getenv('SUMMARY_JOB_WAIT', LLM_DEADLINE_SUMMARY))
+
+# Seconds between keep-alive comments while a summary stream waits for a job
+SUMMARY_STREAM_HEARTBEAT = float(os.getenv('SUMMARY_STREAM_HEARTBEAT', 5))
+
+SUMMARY_REQUESTS = metrics.Counter(
+    'summary_requests_total', 'Summary requests by where the summary came from', ('source',)
+)
+
+def summary_key(candidate):
+    """Return the job id of a candidate's summary: a hash of its prompt and model"""
+    prompt = json.dumps([SUMMARY_MODEL, build_summary_messages(candidate)], sort_keys=True)
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def run_summary_job(payload):
+    """Generate a summary in a job worker, saving it on the stored candidate if there is one"""
+    summary = generate_summary_with_llm(payload['candidate'])
+    if payload.get('candidate_id'):
+        candidate_store.update_summary(payload['candidate_id'], summary)
+    return {'summary': summary}
+
+summary_jobs = JobQueue('summary', run_summary_job)
+
+def submit_summary_job(candidate, candidate_id=None):
+    """Start generating a summary in the background; returns the job id, or None if jobs are off"""
+    if not SUMMARY_JOBS_ENABLED or not os.getenv('OPENAI_API_KEY'):
+        return None
+    try:
+        return summary_jobs.submit(summary_key(candidate), {'candidate': candidate, 'candidate_id': candidate_id})['id']
+    except Exception:
+        # Speculation must never fail the request that triggered it
+        logger.exception("Failed to queue summary job")
+        return None
+
+# What the interview client stores for a blank answer
+NO_ANSWER_TEXT = "No answer provided"
+
+def speculate_summary(summary_candidate, answer, score):
+    """Queue the summary of an interview whose final answer was just scored.
+
+    ``summary_candidate`` holds the earlier answers; the summary request that
+    follows adds this one and the rounded average as the final score, so the
+    job is queued under the key that request will look up.
+    """
+    answers = [
+        {'answer': previous.get('answer', ''), 'score': previous.get('score', 0)}
+        for previous in summary_candidate.get('answers') or [] if isinstance(previous, dict)
+    ] + [{'answer': str(answer or '').strip() or NO_ANSWER_TEXT, 'score': score}]
+    candidate = {
+        'name': summary_candidate.get('name'),
+        'email': summary_candidate.get('email'),
+        'answers': answers,
+        'questions': [
+            {'text': question.get('text', '')}
+            for question in summary_candidate.get('questions') or [] if isinstance(question, dict)
+        ],
+        # Rounded half up, as the interview client computes it
+        'finalScore': math.floor(sum(item['score'] or 0 for item in answers) / len(answers) + 0.5)
+    }
+    return submit_summary_job(candidate)
+
+def wait_for_summary_job(candidate, interval, heartbeat=None):
+    """Generator that waits for a candidate's background summary job.
+
+    Waits up to SUMMARY_JOB_WAIT for a queued or running job, yielding
+    ``heartbeat`` after every ``interval`` seconds of waiting, and returns
+    (summary, source), or (None, 'generated') if there is no job. A failed
+    or still unfinished job counts as none.
+    """
+    if not SUMMARY_JOBS_ENABLED:
+        return None, 'generated'
+    key = summary_key(candidate)
+    job = summary_jobs.get(key)
+    if job is None:
+        return None, 'generated'
+    source = 'hit' if job['status'] == DONE else 'attached'
+    deadline = time.monotonic() + SUMMARY_JOB_WAIT
+    while job is not None and job['status'] in (QUEUED, RUNNING):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        job = summary_jobs.wait(key, min(remaining, interval))
+        if job is not None and job['status'] in (QUEUED, RUNNING):
+            yield heartbeat
+    if job is not None and job['status'] == DONE:
+        return job['result']['summary'], source
+    return None, 'generated'
+
+def finished_summary(candidate):
+    """Return (summary, source) from a background job, or (None, 'generated') if there is none"""
+    waiting = wait_for_summary_job(candidate, SUMMARY_JOB_WAIT)
+    while True:
+        try:
+            next(waiting)
+        except StopIteration as done:
+            return done.value
+
+summary_flights = SingleFlight('summary', timeout=LLM_DEADLINE_SUMMARY + 5)
+
+def remember_summary(candidate, summary):
+    """Keep a summary generated by a request, so repeated requests are served from it"""
+    if SUMMARY_JOBS_ENABLED:
+        summary_jobs.complete(summary_key(candidate), {'summary': summary})
+
 # Summary Generation Endpoint
 @chat_ns.route('/generate-summary')
 class GenerateSummary(Resource):
@@ -623,81 +1360,33 @@ class GenerateSummary(Resource):
         try:
             data = request.get_json()
             
-            if not data or 'candidate' not in data:
+            try:
+                candidate, candidate_id = summary_candidate(data)
+            except KeyError:
+                return {"success": False, "error": "Candidate not found"}, 404
+            if not candidate:
                 return {"success": False, "error": "Missing candidate data"}, 400
             
-            candidate = data['candidate']
-            
-            # Format the interview data
-            interview_responses = ""
-            answers = candidate.get('answers', [])
-            questions = candidate.get('questions', [])
-            
-            for i, answer in enumerate(answers):
-                # Safely get question text, handle case where questions list might be shorter
-                if i < len(questions):
-                    question_text = questions[i].get('text', f'Question {i+1}')
+            summary, source = finished_summary(candidate)
+            if summary is None:
+                # Identical requests in flight at the same time share one OpenAI call
+                summary, shared = summary_flights.do(summary_key(candidate), lambda: generate_summary_with_llm(candidate))
+                if shared:
+                    source = 'attached'
                 else:
-                    question_text = f'Question {i+1}'
-                
-                interview_responses += f"Q{i+1}: {question_text}\n"
-                interview_responses += f"A{i+1}: {answer.get('answer', '')}\n"
-                interview_responses += f"Score: {answer.get('score', 0)}%\n\n"
-            
-            prompt = f"""
-            Generate a professional summary for this candidate based on their interview performance.
-            
-            Candidate: {candidate.get('name', 'Unknown')}
-            Email: {candidate.get('email', 'Unknown')}
-            Questions answered: {len(candidate.get('answers', []))}/{len(candidate.get('questions', []))}
-            Overall score: {candidate.get('finalScore', 'Not calculated')}%
-            
-            Interview responses:
-            {interview_responses}
-            
-            Provide a concise, professional summary (2-3 sentences) highlighting:
-            - Technical strengths
-            - Areas for improvement
-            - Overall assessment
-            """
-            
-            # Use direct API call approach
-            import requests
-            headers = {
-                "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-                "Content-Type": "application/json"
-            }
-            data = {
-                "model": "gpt-3.5-turbo",
-                "messages": [
-                    {"role": "system", "content": "You are an expert HR professional. Generate professional, objective candidate summaries."},
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": 500,
-                "temperature": 0.7
-            }
-            
-            response = requests.post("https://api.openai.com/v1/chat/completions", headers=headers, json=data, timeout=30)
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"OpenAI API call failed with status {response.status_code}: {response.text}"
-                }, 500
-            
-            result = response.json()
-            summary = result['choices'][0]['message']['content']
-            
-            if not summary or summary.strip() == "":
-                return {
-                    "success": False,
-                    "error": "OpenAI returned empty summary"
-                }, 500
+                    remember_summary(candidate, summary)
+            SUMMARY_REQUESTS.inc(source=source)
+            if candidate_id:
+                candidate_store.update_summary(candidate_id, summary)
             
             return {
                 "success": True,
-                "summary": summary
+                "summary": summary,
+                "source": source
             }
             
+        except LLMError as e:
+            return llm_error_response(e)
         except Exception as e:
             return {
                 "success": False,
@@ -705,6 +1394,309 @@ class GenerateSummary(Resource):
             }, 500
 
 
+# Streaming Summary Generation Endpoint
+@chat_ns.route('/generate-summary/stream')
+class GenerateSummaryStream(Resource):
+    @chat_ns.doc('generate_summary_stream', produces=['text/event-stream'])
+    @chat_ns.expect(summary_request_model)
+    def post(self):
+        """Stream a candidate summary as server-sent events.
+
+        Emits `token` events with content deltas, then a `done` event with the
+        SummaryResponse payload (or an `error` event).
+        """
+        data = request.get_json(silent=True)
+        
+        try:
+            candidate, candidate_id = summary_candidate(data)
+        except KeyError:
+            return {"success": False, "error": "Candidate not found"}, 404
+        if not candidate:
+            return {"success": False, "error": "Missing candidate data"}, 400
+        
+        def generate():
+            call = None
+            # Sent before any waiting, so the client and proxies see the stream open
+            yield sse_comment('summary')
+            try:
+                # Keep-alive comments while a background job is still running
+                summary, source = yield from wait_for_summary_job(
+                    candidate, SUMMARY_STREAM_HEARTBEAT, heartbeat=sse_comment('waiting')
+                )
+                if summary is None:
+                    # Only the first of identical requests in flight streams from OpenAI
+                    call = summary_flights.begin(summary_key(candidate))
+                    if not call.leader:
+                        found, summary = call.wait()
+                        if found:
+                            source = 'attached'
+                if summary is not None:
+                    SUMMARY_REQUESTS.inc(source=source)
+                    if candidate_id:
+                        candidate_store.update_summary(candidate_id, summary)
+                    yield sse_event('token', {"content": summary})
+                    yield sse_event('done', marshal({"success": True, "summary": summary, "source": source}, summary_response_model))
+                    return
+                
+                check_api_key()
+                chunks = []
+                for delta in llm_client.stream_chat_completion(
+                    messages=build_summary_messages(candidate),
+                    max_tokens=500,
+                    temperature=0.7,
+                    deadline=Deadline(LLM_DEADLINE_SUMMARY),
+                    priority=PRIORITY_SUMMARY
+                ):
+                    chunks.append(delta)
+                    yield sse_event('token', {"content": delta})
+                
+                summary = ''.join(chunks)
+                if not summary.strip():
+                    raise LLMError("OpenAI returned empty summary")
+                call.finish(summary)
+                call = None
+                remember_summary(candidate, summary)
+                SUMMARY_REQUESTS.inc(source='generated')
+                if candidate_id:
+                    candidate_store.update_summary(candidate_id, summary)
+                
+                yield sse_event('done', marshal({"success": True, "summary": summary, "source": 'generated'}, summary_response_model))
+                
+            except LLMError as e:
+                if call is not None and call.leader:
+                    call.fail(e)
+                yield sse_event('error', marshal({"success": False, "error": str(e)}, summary_response_model))
+            except Exception as e:
+                if call is not None and call.leader:
+                    call.fail(e)
+                yield sse_event('error', marshal({"success": False, "error": f"Failed to generate summary: {str(e)}"}, summary_response_model))
+            except GeneratorExit:
+                # The client went away mid-stream; waiting requests call OpenAI themselves
+                if call is not None and call.leader:
+                    call.abandon()
+                raise
+        
+        return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+
+# Summary Job Endpoints
+summary_jobs_stats_model = api.model('SummaryJobsStats', {
+    'queue': fields.String(description='Queue name', example='summary'),
+    'jobs': fields.Raw(description='Jobs per status, across all workers', example={'queued': 0, 'running': 1, 'done': 12, 'failed': 0}),
+    'workers': fields.Integer(description='Job threads running in the serving worker', example=2),
+    'max_workers': fields.Integer(description='Job threads per worker', example=2)
+})
+
+@chat_ns.route('/summary-jobs')
+class SummaryJobs(Resource):
+    @chat_ns.doc('summary_jobs_stats')
+    @chat_ns.marshal_with(summary_jobs_stats_model)
+    def get(self):
+        """Background summary job counts"""
+        return summary_jobs.stats()
+
+@chat_ns.route('/summary-jobs/<string:job_id>')
+class SummaryJob(Resource):
+    @chat_ns.doc('summary_job_status')
+    @chat_ns.marshal_with(summary_job_response_model)
+    def get(self, job_id):
+        """Status of a background summary job, with the summary once done"""
+        job = summary_jobs.get(job_id)
+        if job is None:
+            return {"success": False, "error": "Summary job not found"}, 404
+        result = job.pop('result') or {}
+        return {"success": True, "job": dict(job, summary=result.get('summary'))}
+
+# Candidate Store Endpoints
+CANDIDATE_SYNC_MAX_ITEMS = int(os.getenv('CANDIDATE_SYNC_MAX_ITEMS', 500))
+
+candidate_filter_parser = (
+    api.parser()
+    .add_argument('status', location='args', type=str, help='Comma-separated interview statuses (not_started, in_progress, paused, completed)')
+    .add_argument('email', location='args', type=str, help='Exact email, case-insensitive')
+    .add_argument('search', location='args', type=str, help='Name or email prefix, case-insensitive')
+    .add_argument('min_score', location='args', type=float, help='Lowest final score')
+    .add_argument('max_score', location='args', type=float, help='Highest final score')
+    .add_argument('sort', location='args', type=str, default='createdAt', help='createdAt, updatedAt, finalScore, name or email')
+    .add_argument('order', location='args', type=str, default='desc', help='asc or desc')
+)
+
+candidate_list_parser = (
+    candidate_filter_parser.copy()
+    .add_argument('limit', location='args', type=int, default=50, help='Page size (at most 200)')
+    .add_argument('cursor', location='args', type=str, help='next_cursor of the previous page')
+    .add_argument('include_total', location='args', type=str, default='true', help='Set to false to skip counting all matches')
+)
+
+candidate_export_parser = (
+    candidate_filter_parser.copy()
+    .add_argument('format', location='args', type=str, default='ndjson', help='ndjson (full candidates) or csv (summary columns)')
+)
+
+def speculate_stored_summaries(candidates):
+    """Queue summaries for stored candidates that completed their interview without one"""
+    for candidate in candidates:
+        if candidate.get('interviewStatus') == 'completed' and not candidate.get('summary'):
+            submit_summary_job(summary_input(candidate), candidate['id'])
+
+def candidate_filters():
+    """Return the list filters and sort order given in the query string"""
+    args = candidate_filter_parser.parse_args()
+    return {
+        'status': [value.strip() for value in args['status'].split(',') if value.strip()] if args['status'] else None,
+        'email': args['email'],
+        'search': args['search'],
+        'min_score': args['min_score'],
+        'max_score': args['max_score'],
+        'sort': args['sort'],
+        'order': args['order'].lower()
+    }
+
+@candidates_ns.route('/')
+class CandidateList(Resource):
+    @candidates_ns.doc('list_candidates')
+    @candidates_ns.expect(candidate_list_parser)
+    @candidates_ns.marshal_with(candidate_list_response_model)
+    def get(self):
+        """List candidates one page at a time, filtered and sorted on indexed columns"""
+        try:
+            args = candidate_list_parser.parse_args()
+            page = candidate_store.list(
+                limit=args['limit'],
+                cursor=args['cursor'],
+                include_total=args['include_total'].lower() == 'true',
+                **candidate_filters()
+            )
+            return dict(page, success=True)
+        except InvalidQuery as e:
+            return {"success": False, "error": str(e)}, 400
+        except Exception as e:
+            return {"success": False, "error": f"Failed to list candidates: {str(e)}"}, 500
+
+    @candidates_ns.doc('sync_candidates')
+    @candidates_ns.expect(candidate_sync_request_model)
+    @candidates_ns.marshal_with(candidate_sync_response_model)
+    def post(self):
+        """Insert or replace candidates by id, e.g. to upload a browser's local candidates"""
+        try:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data.get('candidates'), list):
+                return {"success": False, "error": "Missing candidates list"}, 400
+            if len(data['candidates']) > CANDIDATE_SYNC_MAX_ITEMS:
+                return {"success": False, "error": f"At most {CANDIDATE_SYNC_MAX_ITEMS} candidates per request"}, 400
+            candidates = candidate_store.upsert(data['candidates'])
+            speculate_stored_summaries(candidates)
+            return {"success": True, "candidates": candidates}
+        except InvalidQuery as e:
+            return {"success": False, "error": str(e)}, 400
+        except Exception as e:
+            return {"success": False, "error": f"Failed to store candidates: {str(e)}"}, 500
+
+@candidates_ns.route('/stats')
+class CandidateStats(Resource):
+    @candidates_ns.doc('candidate_stats')
+    @candidates_ns.marshal_with(candidate_stats_response_model)
+    def get(self):
+        """Candidate counts per interview status"""
+        return {"success": True, "counts": candidate_store.stats()}
+
+@candidates_ns.route('/export')
+class CandidateExport(Resource):
+    @candidates_ns.doc('export_candidates', produces=['application/x-ndjson', 'text/csv'])
+    @candidates_ns.expect(candidate_export_parser)
+    def get(self):
+        """Stream every matching candidate as NDJSON or CSV.
+
+        Takes the same filters and sort order as the list endpoint. NDJSON
+        lines are full candidates; CSV rows have the summary columns.
+        """
+        export_format = (candidate_export_parser.parse_args()['format'] or 'ndjson').lower()
+        if export_format not in ('ndjson', 'csv'):
+            return {"success": False, "error": "Invalid format; use ndjson or csv"}, 400
+        try:
+            filters = candidate_filters()
+            # Validate the filters before the response starts
+            candidate_store.list(limit=1, include_total=False, **filters)
+        except InvalidQuery as e:
+            return {"success": False, "error": str(e)}, 400
+
+        def generate_ndjson():
+            for candidate in candidate_store.iter_export(full=True, **filters):
+                yield json.dumps(candidate) + '\n'
+
+        def generate_csv():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(SUMMARY_FIELDS)
+            for candidate in candidate_store.iter_export(**filters):
+                writer.writerow([candidate[field] for field in SUMMARY_FIELDS])
+                if buffer.tell() >= 64 * 1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+
+        if export_format == 'csv':
+            return Response(
+                stream_with_context(generate_csv()), mimetype='text/csv',
+                headers=dict(SSE_HEADERS, **{'Content-Disposition': 'attachment; filename=candidates.csv'})
+            )
+        return Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson', headers=SSE_HEADERS)
+
+@candidates_ns.route('/<string:candidate_id>')
+class CandidateItem(Resource):
+    @candidates_ns.doc('get_candidate')
+    @candidates_ns.marshal_with(candidate_response_model)
+    def get(self, candidate_id):
+        """Return a candidate with its full interview data"""
+        candidate = candidate_store.get(candidate_id)
+        if candidate is None:
+            return {"success": False, "error": "Candidate not found"}, 404
+        return {"success": True, "candidate": candidate}
+
+    @candidates_ns.doc('put_candidate')
+    @candidates_ns.expect(candidate_put_request_model)
+    @candidates_ns.marshal_with(candidate_response_model)
+    def put(self, candidate_id):
+        """Insert or replace a candidate"""
+        try:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data.get('candidate'), dict):
+                return {"success": False, "error": "Missing candidate data"}, 400
+            candidate = candidate_store.upsert([dict(data['candidate'], id=candidate_id)])[0]
+            speculate_stored_summaries([candidate])
+            return {"success": True, "candidate": candidate}
+        except InvalidQuery as e:
+            return {"success": False, "error": str(e)}, 400
+        except Exception as e:
+            return {"success": False, "error": f"Failed to store candidate: {str(e)}"}, 500
+
+    @candidates_ns.doc('delete_candidate')
+    @candidates_ns.marshal_with(candidate_response_model)
+    def delete(self, candidate_id):
+        """Delete a candidate"""
+        if not candidate_store.delete(candidate_id):
+            return {"success": False, "error": "Candidate not found"}, 404
+        return {"success": True}
+
+
+def start_background_work():
+    """Start the background work of a serving process.
+
+    Called once per worker by the gunicorn ``post_worker_init`` hook rather
+    than at import, so scripts and tools importing this module never start
+    OpenAI calls.
+    """
+    # Stock the bank before the first interview asks for questions
+    question_bank.refill_if_low()
+    if SUMMARY_JOBS_ENABLED:
+        # Pick up jobs queued or running when a previous worker stopped
+        summary_jobs.start()
+
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 7078))
+    # With the reloader the app is served by a child process; start there only
+    if os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_work()
     app.run(debug=True, host='0.0.0.0', port=port)
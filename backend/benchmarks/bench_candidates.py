@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Candidate store query latency on a large synthetic dashboard
+
+Fills a throwaway candidate store with --candidates synthetic candidates,
+then times the dashboard's list queries (first page, filtered and sorted
+pages, a deep page reached by cursor, search and email lookups) and a full
+export, and shows the query plan of each list query:
+
+    python3 benchmarks/bench_candidates.py --candidates 50000
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import BACKEND_DIR, print_table, summarize
+
+sys.path.insert(0, BACKEND_DIR)
+
+from candidate_store import CandidateStore, STATUSES
+
+
+QUERIES = [
+    ('newest first', {}),
+    ('completed by score', {'status': ['completed'], 'sort': 'finalScore'}),
+    ('in progress, oldest first', {'status': ['in_progress', 'paused'], 'order': 'asc'}),
+    ('score 80-100', {'min_score': 80, 'max_score': 100, 'sort': 'finalScore'}),
+    ('by name', {'sort': 'name', 'order': 'asc'}),
+    ('search prefix', {'search': 'cand12'}),
+    ('email lookup', {'email': 'CANDIDATE777@EXAMPLE.COM'})
+]
+
+
+def synthetic_candidate(i, rng):
+    status = rng.choice(STATUSES)
+    return {
+        'id': f'candidate_{i}',
+        'name': f'Cand{i} Example',
+        'email': f'candidate{i}@example.com',
+        'phone': '5551234567',
+        'interviewStatus': status,
+        'finalScore': rng.randint(0, 100) if status == 'completed' else None,
+        'chatHistory': [
+            {'id': f'm{j}', 'type': 'ai' if j % 2 == 0 else 'user', 'content': 'Lorem ipsum dolor sit amet ' * 8,
+             'isQuestion': j % 2 == 0}
+            for j in range(12)
+        ]
+    }
+
+
+class TracedStore(CandidateStore):
+    """Candidate store that records the SQL it runs while ``statements`` is a list"""
+
+    statements = None
+
+    def _connect(self):
+        conn = super()._connect()
+        if self.statements is not None:
+            conn.set_trace_callback(self.statements.append)
+        return conn
+
+
+def query_plan(store, filters):
+    """Return the SQLite query plan details of a list query"""
+    store.statements = []
+    store.list(limit=50, include_total=False, **filters)
+    sql = next(statement for statement in store.statements if statement.lstrip().startswith('SELECT'))
+    store.statements = None
+    conn = store._connect()
+    try:
+        return '; '.join(row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+    finally:
+        conn.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--candidates', type=int, default=20000, help='Synthetic candidates to store (default: 20000)')
+    arg_parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+    arg_parser.add_argument('--seed', type=int, default=7)
+    args = arg_parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        store = TracedStore(db_path=os.path.join(directory, 'candidates.db'))
+        started = time.perf_counter()
+        for start in range(0, args.candidates, 500):
+            store.upsert([synthetic_candidate(i, rng) for i in range(start, min(start + 500, args.candidates))])
+        seconds = time.perf_counter() - started
+        print(f"stored {args.candidates} candidates in {seconds:.2f}s ({args.candidates / seconds:.0f}/s)")
+
+        results = {}
+        for name, filters in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                store.list(limit=50, **filters)
+                samples.append((time.perf_counter() - started, True))
+            results[f'{name} (page 1 + total)'] = summarize(samples, sum(latency for latency, _ in samples))
+
+        # Walk every page of the default view, as a deep-paging client would
+        samples, cursor = [], None
+        while True:
+            started = time.perf_counter()
+            page = store.list(limit=50, cursor=cursor, include_total=False)
+            samples.append((time.perf_counter() - started, True))
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        results['every page by cursor'] = summarize(samples, sum(latency for latency, _ in samples))
+        print_table(results, 'List queries (rps is sequential queries per second)')
+
+        started = time.perf_counter()
+        exported = sum(1 for _ in store.iter_export(full=True))
+        seconds = time.perf_counter() - started
+        print(f"\nexported {exported} full candidates in {seconds:.2f}s ({exported / seconds:.0f}/s)")
+
+        print("\nQuery plans")
+        for name, filters in QUERIES:
+            print(f"  {name:<28} {query_plan(store, filters)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: single-pass ContactExtractor vs. the previous three line scans
+
+Checks that both produce identical name/email/phone on every resume in
+dummy-test-resume/ and on synthetic texts, then times them on large texts.
+Email validation runs offline for both so the numbers measure extraction only.
+
+Usage: python3 benchmarks/bench_contact_extraction.py [--repeat N]
+"""
+import os
+import re
+import sys
+import glob
+import random
+import argparse
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from email_validator import validate_email, EmailNotValidError
+from contact_extractor import ContactExtractor
+from resume_parser import ResumeParser
+
+
+def validate_offline(email):
+    validate_email(email, check_deliverability=False)
+
+
+# Reference implementation: the previous ResumeParser._extract_* methods
+# (debug printing removed), kept here to check equivalence and measure speedup
+def legacy_extract_name(text):
+    lines = text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if line.lower().startswith('name:'):
+            name = line[5:].strip()
+            if name and len(name) < 100:
+                return name
+    for i, line in enumerate(lines[:5]):
+        line = line.strip()
+        if len(line) > 0 and len(line) < 100:
+            words = line.split()
+            if 2 <= len(words) <= 4:
+                if all(word[0].isupper() for word in words if word):
+                    if not any(word.lower() in ['resume', 'cv', 'curriculum', 'vitae'] for word in words):
+                        return line
+    email = legacy_extract_email(text)
+    if email and '@' in email:
+        local_part = email.split('@')[0]
+        if '.' in local_part:
+            name_parts = local_part.split('.')
+            if len(name_parts) == 2:
+                return f"{name_parts[0].capitalize()} {name_parts[1].capitalize()}"
+        else:
+            if len(local_part) > 2:
+                return local_part.capitalize()
+    return None
+
+
+def legacy_extract_email(text):
+    lines = text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if line.lower().startswith('email:'):
+            email = line[6:].strip()
+            if email:
+                try:
+                    validate_offline(email)
+                    return email
+                except EmailNotValidError:
+                    pass
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails = re.findall(email_pattern, text)
+    if emails:
+        try:
+            validate_offline(emails[0])
+            return emails[0]
+        except EmailNotValidError:
+            pass
+    return None
+
+
+def legacy_extract_phone(text):
+    lines = text.split('\n')
+    for line in lines:
+        line = line.strip()
+        if line.lower().startswith('phone:'):
+            phone = line[6:].strip()
+            if phone:
+                phone_str = re.sub(r'[^\d+]', '', phone)
+                if len(phone_str) >= 10:
+                    return phone_str
+    phone_patterns = [
+        r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',
+        r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',
+    ]
+    for pattern in phone_patterns:
+        matches = re.findall(pattern, text)
+        if matches:
+            phone_str = ''.join(matches[0]) if isinstance(matches[0], tuple) else matches[0]
+            phone_str = re.sub(r'[^\d+]', '', phone_str)
+            if len(phone_str) >= 10:
+                return phone_str
+    return None
+
+
+def legacy_extract(text):
+    return (legacy_extract_name(text), legacy_extract_email(text), legacy_extract_phone(text))
+
+
+def single_pass_extract(extractor, text):
+    contacts = extractor.extract(text)
+    return (contacts['name'], contacts['email'], contacts['phone'])
+
+
+def resume_texts():
+    """Full text of every sample resume"""
+    parser = ResumeParser()
+    texts = {}
+    for path in sorted(glob.glob(os.path.join(BACKEND_DIR, '..', 'dummy-test-resume', '*'))):
+        texts[os.path.basename(path)] = parser.parse_resume(path)['text']
+    return texts
+
+
+def synthetic_text(rng, lines):
+    """Resume-like text with prefixed lines, emails and phones at random places"""
+    words = ['React', 'node', 'Senior', 'Engineer', 'built', 'APIs', 'with', 'Python', 'and', 'SQL']
+    out = []
+    for _ in range(lines):
+        roll = rng.random()
+        if roll < 0.01:
+            out.append(f"  {rng.choice(['Name', 'NAME', 'name'])}: {rng.choice(words)} {rng.choice(words)}")
+        elif roll < 0.02:
+            out.append(f"Email: {rng.choice(['', 'bad@', 'jane.doe@example.com', 'x@y.io'])}")
+        elif roll < 0.03:
+            out.append(f"phone: {rng.choice(['123', '+1 (555) 123-4567', '555.123.4567'])}")
+        elif roll < 0.04:
+            out.append(f"reach me at {rng.choice(['john@corp.dev', 'call 555-987-6543'])}")
+        else:
+            out.append(' '.join(rng.choice(words) for _ in range(rng.randint(0, 12))))
+    return '\n'.join(out)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=20, help='timing repetitions per text size')
+    args = arg_parser.parse_args()
+
+    extractor = ContactExtractor(validate=validate_offline)
+    rng = random.Random(42)
+
+    # Equivalence
+    mismatches = 0
+    samples = resume_texts()
+    samples.update({f"synthetic-{i}": synthetic_text(rng, rng.randint(1, 400)) for i in range(500)})
+    for label, text in samples.items():
+        expected, actual = legacy_extract(text), single_pass_extract(extractor, text)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {label}: legacy={expected} single-pass={actual}")
+    print(f"equivalence: {len(samples) - mismatches}/{len(samples)} texts identical")
+
+    # Speed, on the sample resumes repeated into long documents
+    base = '\n'.join(text for label, text in samples.items() if not label.startswith('synthetic-'))
+    print(f"{'lines':>8} {'legacy ms':>10} {'single ms':>10} {'speedup':>8}")
+    for multiplier in (1, 20, 200):
+        text = '\n'.join([base] * multiplier)
+        legacy = min(timeit.repeat(lambda: legacy_extract(text), number=1, repeat=args.repeat))
+        single = min(timeit.repeat(lambda: single_pass_extract(extractor, text), number=1, repeat=args.repeat))
+        print(f"{text.count(chr(10)) + 1:>8} {legacy * 1000:>10.2f} {single * 1000:>10.2f} {legacy / single:>7.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
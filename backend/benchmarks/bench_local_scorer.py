@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Local scorer agreement with labelled LLM scores
+
+Loads a JSONL file of labelled answers, one object per line:
+
+    {"question": {"text": "...", "referenceAnswer": "...", "keywords": ["..."]},
+     "answer": "...", "llm_score": 72}
+
+stores the reference answers in a throwaway local scorer and scores every
+answer locally. Reports, for the answers the fast path would take (local
+confidence at least --min-confidence), how many there are and how far the
+local score is from the LLM score. Exits with status 1 when the mean
+absolute difference exceeds --max-error points, so run it against
+recorded scores before turning LOCAL_SCORER_FAST_PATH on:
+
+    python3 benchmarks/bench_local_scorer.py labels.jsonl
+
+With --label, answers without ``llm_score`` are first scored through the
+configured API (OPENAI_API_KEY, OPENAI_BASE_URL) and the completed file is
+written to --write, so a set of answers only has to be labelled once.
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from local_scorer import LocalScorer
+
+
+def load_labels(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def label_with_llm(items):
+    """Fill in missing ``llm_score`` values through the configured API"""
+    from app import score_answer_with_llm
+
+    for item in items:
+        if item.get('llm_score') is None:
+            item['llm_score'] = score_answer_with_llm(item['question'], item['answer'])['score']
+    return items
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('labels', help='JSONL file of labelled answers')
+    arg_parser.add_argument('--min-confidence', type=float,
+                            default=float(os.getenv('LOCAL_SCORER_MIN_CONFIDENCE', 0.85)),
+                            help='Confidence the fast path requires (default: LOCAL_SCORER_MIN_CONFIDENCE or 0.85)')
+    arg_parser.add_argument('--max-error', type=float, default=10.0,
+                            help='Largest acceptable mean absolute difference on fast-path answers (points)')
+    arg_parser.add_argument('--label', action='store_true', help='Score unlabelled answers through the configured API first')
+    arg_parser.add_argument('--write', help='Where --label writes the completed labels')
+    args = arg_parser.parse_args()
+
+    items = load_labels(args.labels)
+    if args.label:
+        label_with_llm(items)
+        if args.write:
+            with open(args.write, 'w', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(item) + '\n')
+    items = [item for item in items if item.get('llm_score') is not None]
+    if not items:
+        print("no labelled answers")
+        return 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        scorer = LocalScorer(db_path=os.path.join(directory, 'reference_answers.db'))
+        scorer.add_references([item['question'] for item in items])
+        rows = []
+        for item in items:
+            local = scorer.score(item['question'], item['answer'])
+            rows.append((local['score'], local['confidence'], item['llm_score']))
+
+    fast = [(local, llm) for local, confidence, llm in rows if confidence >= args.min_confidence]
+    every = [(local, llm) for local, _, llm in rows]
+    print(f"{'':<22} {'answers':>8} {'mean |diff|':>12} {'max |diff|':>11} {'within 10':>10}")
+    for name, pairs in (('fast path', fast), ('all answers', every)):
+        if not pairs:
+            print(f"{name:<22} {0:>8}")
+            continue
+        diffs = [abs(local - llm) for local, llm in pairs]
+        print(f"{name:<22} {len(pairs):>8} {sum(diffs) / len(diffs):>12.1f} {max(diffs):>11} "
+              f"{sum(1 for diff in diffs if diff <= 10) / len(diffs):>10.0%}")
+    print(f"\nfast path would skip OpenAI for {len(fast)}/{len(rows)} answers ({len(fast) / len(rows):.0%})")
+
+    if fast and sum(abs(local - llm) for local, llm in fast) / len(fast) > args.max_error:
+        print(f"FAIL: fast-path scores differ from the LLM by more than {args.max_error:g} points on average")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
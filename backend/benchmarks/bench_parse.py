@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Resume parsing throughput benchmark
+
+Parses the resumes in dummy-test-resume/ and synthetic PDFs of several
+sizes, inline (one process, like PARSE_POOL_WORKERS=0) and through the
+ParsePool, both contacts-only and with the full text. Reports per-file
+p50/p95/p99 latency and files per second for each document group:
+
+    python3 benchmarks/bench_parse.py --pages 1,10,40 --repeat 5 --workers 4
+    python3 benchmarks/bench_parse.py --output base.json
+    python3 benchmarks/bench_parse.py --compare base.json   # exit 1 on regression
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import BACKEND_DIR, add_result_arguments, finish_results, print_table, resume_files, summarize, synthetic_pdf
+
+sys.path.insert(0, BACKEND_DIR)
+
+from parse_pool import ParsePool
+from resume_parser import ResumeParser
+
+
+def document_groups(page_counts):
+    """Return {group name: [(file_ext, bytes), ...]}"""
+    groups = {}
+    samples = [(os.path.splitext(path)[1].lower(), open(path, 'rb').read()) for path in resume_files()]
+    if samples:
+        groups[f"dummy-test-resume ({len(samples)} files)"] = samples
+    for pages in page_counts:
+        groups[f"synthetic {pages}-page pdf"] = [('.pdf', synthetic_pdf(pages))]
+    return groups
+
+
+def run_group(parse, documents, repeat, concurrency):
+    """Parse every document ``repeat`` times; returns (samples, wall seconds)"""
+    jobs = [document for _ in range(repeat) for document in documents]
+
+    def parse_one(document):
+        file_ext, content = document
+        started = time.perf_counter()
+        try:
+            parse(content, file_ext)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(parse_one, jobs))
+    return samples, time.perf_counter() - started
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--pages', default='1,10,40', help='Page counts of the synthetic PDFs (default: 1,10,40)')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Times each document is parsed per mode (default: 3)')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='ParsePool processes (default: CPU count)')
+    arg_parser.add_argument('--modes', default='inline,pool', help='Comma-separated modes to run (default: inline,pool)')
+    add_result_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    page_counts = [int(pages) for pages in args.pages.split(',') if pages.strip()]
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    groups = document_groups(page_counts)
+
+    parser = ResumeParser()
+    pool = ParsePool(max_workers=args.workers, max_queue=args.workers * 4) if 'pool' in modes else None
+    results = {}
+    try:
+        if pool is not None:
+            # Start the pool processes before timing anything
+            pool.parse(groups[next(iter(groups))][0][1], parser, contacts_only=True, file_ext=groups[next(iter(groups))][0][0])
+
+        for mode in modes:
+            for contacts_only in (True, False):
+                if mode == 'inline':
+                    def parse(content, file_ext):
+                        return parser.parse_resume(content, contacts_only=contacts_only, file_ext=file_ext)
+                    concurrency = 1
+                else:
+                    def parse(content, file_ext):
+                        return pool.parse(content, parser, contacts_only=contacts_only, file_ext=file_ext)
+                    concurrency = args.workers
+
+                for group, documents in groups.items():
+                    samples, seconds = run_group(parse, documents, args.repeat, concurrency)
+                    name = f"{mode}/{'contacts' if contacts_only else 'text'}/{group}"
+                    results[name] = summarize(samples, seconds)
+                    print(f"  {name}: {results[name]['rps']} files/s", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print_table(results, f"Resume parsing ({args.workers} pool workers, {args.repeat} repeats; rps = files/s)")
+    config = {'pages': page_counts, 'repeat': args.repeat, 'workers': args.workers, 'modes': modes}
+    return finish_results(args, 'parse', config, results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
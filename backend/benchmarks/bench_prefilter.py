@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Answer pre-filter: rejection rate on a labelled corpus and per-answer cost
+
+Runs the rule-table engine (answer_prefilter.py) and the previous inline
+ScoreAnswer checks over a corpus of junk and genuine answers. Checks that
+the engine scores every answer the old checks caught identically, and
+reports how many junk answers each one rejects locally, how many genuine
+answers were wrongly rejected, and microseconds per answer.
+
+Usage: python3 benchmarks/bench_prefilter.py [--repeat N]
+"""
+import os
+import re
+import sys
+import random
+import string
+import argparse
+import timeit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from answer_prefilter import AnswerPrefilter
+
+
+# Reference implementation: the previous checks in ScoreAnswer.post, kept
+# here to check equivalence and measure the speedup
+def legacy_prefilter(answer):
+    def response(score, feedback, communication, improvement, suggestion):
+        return {
+            "success": True, "score": score, "feedback": feedback,
+            "detailed_scores": {"technical_accuracy": 0, "problem_solving": 0, "communication": communication,
+                                "relevance": 0, "depth_of_knowledge": 0},
+            "strengths": [], "areas_for_improvement": [improvement], "suggestions": [suggestion]
+        }
+
+    if not answer or answer.strip() == "":
+        return response(0, "No answer provided. Please provide a response to receive a score.", 0,
+                        "Provide a complete answer to the question",
+                        "Take time to read the question carefully and provide a thoughtful response")
+    answer_lower = answer.lower().strip()
+    random_pattern = re.compile(r'^[a-z]{10,}$')
+    if random_pattern.match(answer_lower) and len(answer_lower) > 8:
+        return response(5, "Answer appears to be random characters or gibberish. Please provide a meaningful response to the technical question.", 1,
+                        "Provide a coherent technical answer", "Read the question carefully and provide a relevant technical response")
+    repeated_pattern = re.compile(r'^(.)\1{4,}$')
+    if repeated_pattern.match(answer_lower):
+        return response(5, "Answer appears to be repeated characters. Please provide a meaningful response to the technical question.", 1,
+                        "Provide a coherent technical answer", "Read the question carefully and provide a relevant technical response")
+    if len(answer.strip()) < 10:
+        technical_keywords = ['react', 'javascript', 'node', 'html', 'css', 'api', 'database', 'server', 'client', 'frontend', 'backend', 'function', 'variable', 'component', 'state', 'props', 'hook', 'async', 'await', 'promise', 'json', 'http', 'rest', 'graphql', 'sql', 'nosql', 'mongodb', 'mysql', 'postgresql', 'redis', 'docker', 'kubernetes', 'aws', 'azure', 'git', 'github', 'ci', 'cd', 'testing', 'jest', 'cypress', 'selenium', 'typescript', 'webpack', 'babel', 'npm', 'yarn', 'package', 'module', 'import', 'export', 'class', 'object', 'array', 'string', 'number', 'boolean', 'null', 'undefined', 'error', 'exception', 'try', 'catch', 'finally', 'if', 'else', 'for', 'while', 'loop', 'recursion', 'algorithm', 'data structure', 'array', 'object', 'function', 'method', 'property', 'attribute', 'element', 'dom', 'bom', 'event', 'listener', 'callback', 'closure', 'scope', 'hoisting', 'prototype', 'inheritance', 'polymorphism', 'encapsulation', 'abstraction', 'solid', 'dry', 'kiss', 'yagni', 'mvc', 'mvp', 'mvvm', 'flux', 'redux', 'mobx', 'rxjs', 'observable', 'subject', 'behavior', 'replay', 'async', 'await', 'promise', 'then', 'catch', 'finally', 'resolve', 'reject', 'pending', 'fulfilled', 'rejected', 'settled', 'race', 'all', 'allsettled', 'any', 'finally', 'finally', 'finally']
+        if not any(keyword in answer_lower for keyword in technical_keywords):
+            return response(10, "Answer is too short and doesn't contain technical content. Please provide a more detailed response explaining your technical knowledge.", 2,
+                            "Provide a more detailed technical answer", "Expand your answer with technical details and examples")
+    non_answers = ['idk', 'dunno', 'no idea', 'dont know', "don't know", 'not sure', 'maybe', 'probably', 'i think', 'i guess', 'not really', 'kind of', 'sort of', 'a bit', 'a little', 'somewhat', 'somehow', 'somewhere', 'sometime', 'someone', 'something', 'anything', 'everything', 'nothing', 'whatever', 'anyway', 'anyhow', 'somehow', 'someway', 'somewhere', 'sometime', 'someone', 'something', 'anything', 'everything', 'nothing', 'whatever', 'anyway', 'anyhow']
+    if answer_lower in non_answers:
+        return response(15, "Answer indicates uncertainty. Please provide a more confident response based on your technical knowledge.", 3,
+                        "Provide a more confident technical answer", "Draw from your technical knowledge and experience to provide a more detailed response")
+    return None
+
+
+JUNK = [
+    '', '   ', 'idk', 'IDK', 'dunno', 'no idea', 'not sure', 'maybe', 'whatever', 'nothing',
+    'fdkjvbvvkbvsd', 'asdfghjklqwerty', 'aaaaaaa', 'zzzzzzzzzzzz', '..........', '???', '12345',
+    'ok', 'yes', 'no', 'hmm', 'lol',
+    "I don't know", "I don't know.", 'i dont know!', 'I do not know', 'No idea.', 'Not sure...',
+    'no clue', 'Dunno!!', 'whatever.', 'skip', 'pass', 'n/a',
+    '1234567890 1234', '!!!! ???? !!!!', '-- -- -- -- --',
+    'test test test test', 'blah blah blah blah blah', 'answer answer answer answer'
+]
+
+GENUINE = [
+    'The virtual DOM is an in-memory tree React diffs against the previous render.',
+    'let and const are block scoped while var is function scoped and hoisted.',
+    'Use cursor based pagination with a stable sort key and a capped page size.',
+    'Memoize components with React.memo and keep state close to where it is used.',
+    'A token bucket in Redis shared by all servers, refilled lazily on each request.',
+    'Expand then contract: add columns, dual write, backfill, switch reads, drop old columns.',
+    'Closures capture variables from the enclosing scope.',
+    'REST API', 'SQL joins', 'useEffect', 'Promises', 'CSS grid', 'git rebase', 'Docker',
+    'O(n log n)', 'I think a hash map gives O(1) lookups on average.',
+    'Probably an index on the foreign key column would fix the slow join.',
+    'Not sure about the exact syntax, but I would debounce the input handler.'
+]
+
+
+def synthetic_corpus(rng, count):
+    """Random keyboard mash (junk) mixed with genuine answers"""
+    samples = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            samples.append((''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(10, 30))), True))
+        else:
+            samples.append((rng.choice(GENUINE), False))
+    return samples
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--repeat', type=int, default=200, help='Timing repetitions over the corpus')
+    args = arg_parser.parse_args()
+
+    engine = AnswerPrefilter(disabled=[])
+    corpus = [(answer, True) for answer in JUNK] + [(answer, False) for answer in GENUINE]
+
+    # Genuine answers the old checks rejected (e.g. 'useEffect') are
+    # deliberately sent to the LLM now, so only junk has to match
+    mismatches = 0
+    for answer, is_junk in corpus:
+        expected = legacy_prefilter(answer) if is_junk else None
+        actual = engine.classify(answer)
+        if expected is not None and (actual is None or actual[1] != expected):
+            mismatches += 1
+            print(f"MISMATCH {answer!r}: legacy={expected and expected['score']} engine={actual and actual[1]['score']}")
+    caught_by_legacy = sum(1 for answer, is_junk in corpus if is_junk and legacy_prefilter(answer) is not None)
+    print(f"equivalence: {caught_by_legacy - mismatches}/{caught_by_legacy} legacy junk rejections scored identically")
+
+    print(f"\n{'':<10} {'junk rejected':>15} {'genuine rejected':>18}")
+    junk = [answer for answer, is_junk in corpus if is_junk]
+    genuine = [answer for answer, is_junk in corpus if not is_junk]
+    for label, classify in (('legacy', legacy_prefilter), ('engine', engine.classify)):
+        junk_rejected = sum(1 for answer in junk if classify(answer) is not None)
+        genuine_rejected = [answer for answer in genuine if classify(answer) is not None]
+        print(f"{label:<10} {junk_rejected:>6}/{len(junk):<3} {junk_rejected / len(junk):>5.0%} "
+              f"{len(genuine_rejected):>9}/{len(genuine):<3} {len(genuine_rejected) / len(genuine):>4.0%}")
+        for answer in genuine_rejected:
+            print(f"           wrongly rejected: {answer!r}")
+
+    by_rule = {}
+    for answer in junk:
+        classified = engine.classify(answer)
+        rule = classified[0] if classified else 'passed to LLM'
+        by_rule[rule] = by_rule.get(rule, 0) + 1
+    print('\nengine rejections by rule: ' + ', '.join(f"{rule}={count}" for rule, count in sorted(by_rule.items())))
+
+    rng = random.Random(7)
+    timing_corpus = [answer for answer, _ in corpus] + [answer for answer, _ in synthetic_corpus(rng, 500)]
+    legacy = timeit.timeit(lambda: [legacy_prefilter(answer) for answer in timing_corpus], number=args.repeat)
+    single = timeit.timeit(lambda: [engine.classify(answer) for answer in timing_corpus], number=args.repeat)
+    batch = timeit.timeit(lambda: engine.classify_many(timing_corpus), number=args.repeat)
+    per_answer = 1e6 / (len(timing_corpus) * args.repeat)
+    print(f"\n{'':<16} {'us/answer':>10} {'speedup':>8}")
+    print(f"{'legacy':<16} {legacy * per_answer:>10.2f} {1:>7.1f}x")
+    print(f"{'engine':<16} {single * per_answer:>10.2f} {legacy / single:>7.1f}x")
+    print(f"{'engine (batch)':<16} {batch * per_answer:>10.2f} {legacy / batch:>7.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Score prompt size and score equivalence: compact prompts vs. the previous prompt
+
+Builds the scoring prompt for a fixed set of answers with the previous
+inline template and with prompts.py, and reports estimated prompt tokens
+per answer. With --live, both prompts are also sent to the API configured by
+OPENAI_API_KEY / OPENAI_BASE_URL at temperature 0, and the script reports
+the score difference per answer and the prompt tokens the API counted:
+
+    python3 benchmarks/bench_prompts.py
+    python3 benchmarks/bench_prompts.py --live --repeat 3 --tolerance 5   # exit 1 if scores drift
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from dotenv import load_dotenv
+
+from prompts import build_score_messages, estimate_message_tokens
+
+
+# Reference implementation: the scoring messages ScoreAnswer sent before
+# prompts.py, kept here to measure the savings and check equivalence
+def legacy_score_messages(question, answer):
+    prompt = f"""
+    You are an expert technical interviewer evaluating a candidate's answer for a full-stack developer position.
+
+    QUESTION DETAILS:
+    Question: {question.get('text', '')}
+    Difficulty Level: {question.get('difficulty', '')}
+    Category: {question.get('category', '')}
+
+    CANDIDATE'S ANSWER:
+    {answer}
+
+    EVALUATION CRITERIA:
+    Please evaluate this answer based on the following criteria (each worth 20 points, total 100):
+
+    1. TECHNICAL ACCURACY (20 points):
+       - Correctness of technical concepts
+       - Understanding of the technology
+       - Accuracy of implementation details
+
+    2. PROBLEM-SOLVING APPROACH (20 points):
+       - Logical thinking process
+       - Step-by-step reasoning
+       - Consideration of edge cases
+       - Alternative solutions mentioned
+
+    3. COMMUNICATION CLARITY (20 points):
+       - Clear explanation of concepts
+       - Well-structured response
+       - Use of appropriate technical terminology
+       - Ability to explain complex ideas simply
+
+    4. RELEVANCE TO QUESTION (20 points):
+       - Directly addresses the question asked
+       - Stays on topic
+       - Provides relevant examples
+       - Shows understanding of the context
+
+    5. DEPTH OF KNOWLEDGE (20 points):
+       - Demonstrates deep understanding
+       - Shows practical experience
+       - Mentions best practices
+       - Shows awareness of industry standards
+
+    SCORING GUIDELINES:
+    - 90-100: Exceptional - Demonstrates mastery, provides excellent examples, shows deep understanding
+    - 80-89: Good - Solid understanding, good examples, minor gaps in knowledge
+    - 70-79: Satisfactory - Basic understanding, some good points, room for improvement
+    - 60-69: Below Average - Limited understanding, some correct points, significant gaps
+    - 40-59: Poor - Minimal understanding, many incorrect points, needs significant improvement
+    - 0-39: Very Poor - Little to no understanding, mostly incorrect, requires extensive learning
+
+    Return your evaluation in this exact JSON format:
+    {{
+        "score": 85,
+        "feedback": "Detailed feedback explaining the score and areas for improvement",
+        "technical_accuracy": 18,
+        "problem_solving": 17,
+        "communication": 16,
+        "relevance": 19,
+        "depth_of_knowledge": 15,
+        "strengths": ["List specific strengths shown in the answer"],
+        "areas_for_improvement": ["List specific areas that need improvement"],
+        "suggestions": ["Provide specific suggestions for improvement"]
+    }}
+    """
+    return [
+        {"role": "system", "content": "You are an expert technical interviewer. Evaluate answers objectively and provide constructive feedback."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+CLOSURE = {'text': 'What is a closure in JavaScript and when would you use one?', 'difficulty': 'easy', 'category': 'Frontend'}
+PAGINATION = {'text': 'How would you design a REST API for paginated search results?', 'difficulty': 'medium', 'category': 'Backend'}
+MIGRATION = {'text': "How would you migrate a monolith's database schema without downtime?", 'difficulty': 'hard', 'category': 'Database'}
+
+ANSWERS = [
+    ('closure/strong', CLOSURE,
+     "A closure is a function bundled with the variables of the scope it was created in, so it can still read them "
+     "after the outer function returned. I use them for private state, e.g. a counter factory, for callbacks that "
+     "need context, and React hooks rely on them, which is also why stale closures happen with useEffect."),
+    ('closure/average', CLOSURE, "A closure is when a function uses a variable from outside of it. Useful for callbacks."),
+    ('closure/wrong', CLOSURE, "A closure is how you close a database connection in Node so it does not leak."),
+    ('pagination/strong', PAGINATION,
+     "I would use cursor based pagination: sort by a stable key such as created_at plus id, return an opaque next "
+     "cursor with each page and cap the page size. Offset pagination gets slower on deep pages and skips rows when "
+     "data changes, so I would only offer it for small admin lists. Total counts are expensive, so make them optional."),
+    ('pagination/average', PAGINATION, "Use page and limit query parameters and return the results with the total count."),
+    ('migration/strong', MIGRATION,
+     "Expand and contract. First add the new columns or tables without removing anything, then deploy code that "
+     "writes to both, backfill old rows in small batches, verify, switch reads to the new schema behind a flag and "
+     "only drop the old columns one release later. Every step is backwards compatible so rollbacks stay safe."),
+    ('migration/weak', MIGRATION, "Take a backup, put up a maintenance page at night and run the migration scripts."),
+    ('migration/long', MIGRATION,
+     ("Expand then contract: add the new schema next to the old one, dual write, backfill in batches, switch reads "
+      "and drop the old columns later. ") * 60)
+]
+
+
+def score_of(response):
+    try:
+        return json.loads(response.json()['choices'][0]['message']['content'])['score']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--live', action='store_true', help='Score the answers with both prompts through the API')
+    arg_parser.add_argument('--repeat', type=int, default=1, help='Scoring calls per answer and prompt; scores are averaged')
+    arg_parser.add_argument('--tolerance', type=float, default=5, help='Largest mean score difference accepted (default: 5 points)')
+    args = arg_parser.parse_args()
+
+    print(f"{'answer':<20} {'legacy tok':>10} {'compact tok':>11} {'saved':>6}")
+    total_legacy = total_compact = 0
+    for name, question, answer in ANSWERS:
+        legacy = estimate_message_tokens(legacy_score_messages(question, answer))
+        compact, truncated = build_score_messages(question, answer)
+        compact = estimate_message_tokens(compact)
+        total_legacy += legacy
+        total_compact += compact
+        print(f"{name:<20} {legacy:>10} {compact:>11} {1 - compact / legacy:>6.0%}{'  (answer truncated)' if truncated else ''}")
+    print(f"{'total':<20} {total_legacy:>10} {total_compact:>11} {1 - total_compact / total_legacy:>6.0%}")
+
+    if not args.live:
+        return 0
+
+    load_dotenv()
+    from llm_client import LLMClient
+    client = LLMClient()
+    differences = []
+    usage = {'legacy': 0, 'compact': 0}
+    print(f"\n{'answer':<20} {'legacy':>7} {'compact':>8} {'diff':>6}")
+    for name, question, answer in ANSWERS:
+        scores = {}
+        for label, messages in (('legacy', legacy_score_messages(question, answer)),
+                                ('compact', build_score_messages(question, answer)[0])):
+            samples = []
+            for _ in range(args.repeat):
+                response = client.chat_completion(messages=messages, max_tokens=800, temperature=0)
+                usage[label] += (response.json().get('usage') or {}).get('prompt_tokens', 0) if response.status_code == 200 else 0
+                if score_of(response) is not None:
+                    samples.append(score_of(response))
+            scores[label] = statistics.mean(samples) if samples else None
+        if scores['legacy'] is None or scores['compact'] is None:
+            print(f"{name:<20} {'-':>7} {'-':>8}  scoring failed")
+            continue
+        differences.append(scores['compact'] - scores['legacy'])
+        print(f"{name:<20} {scores['legacy']:>7.1f} {scores['compact']:>8.1f} {differences[-1]:>+6.1f}")
+
+    mean_difference = statistics.mean(abs(d) for d in differences) if differences else float('inf')
+    print(f"\nmean |diff| {mean_difference:.1f} points (tolerance {args.tolerance:g}); "
+          f"prompt tokens reported: legacy {usage['legacy']}, compact {usage['compact']}")
+    return 0 if mean_difference <= args.tolerance else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Load test: replay interview sessions against the backend
+
+Each session does what the frontend does for one candidate: parse a resume,
+generate questions, score six answers and generate the summary. Sessions
+run concurrently against the backend under gunicorn, which talks to the
+local mock OpenAI server (see mock_openai.py), and the script reports
+p50/p95/p99 latency and requests per second per endpoint:
+
+    python3 benchmarks/bench_sessions.py --sessions 40 --concurrency 8 --latency 0.5
+    python3 benchmarks/bench_sessions.py --output base.json
+    python3 benchmarks/bench_sessions.py --compare base.json   # exit 1 on regression
+
+Use --url to target a backend that is already running (it must be pointed
+at a mock or a real OpenAI key itself).
+"""
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import BackendServer, add_result_arguments, finish_results, print_table, resume_files, summarize, synthetic_pdf
+from mock_openai import add_mock_arguments, mock_config_from_args, start_mock_server
+
+
+ANSWERS = [
+    "The virtual DOM is an in-memory tree React diffs against the previous render so it only touches the real DOM where something changed.",
+    "let and const are block scoped, var is function scoped and hoisted; const cannot be reassigned but objects it points to can still change.",
+    "I would use cursor based pagination with a stable sort key, return a next cursor and cap the page size so deep pages stay cheap.",
+    "Memoize expensive components with React.memo, keep state close to where it is used and split contexts so updates do not fan out.",
+    "Use a shared store like Redis with a token bucket per key, refilled lazily on each request, and fall back to a local limit if Redis is down.",
+    "Expand then contract: add new columns, dual write, backfill in batches, switch reads, and only drop the old columns after a release.",
+    "I am not sure, I have not worked with that before.",
+    "idk",
+    "Closures capture variables from the enclosing scope, which is how hooks like useState keep their values between renders.",
+    "I would add an index on the filter columns, check the query plan with EXPLAIN, and cache hot results with a short TTL."
+]
+
+ENDPOINTS = ('parse', 'generate-questions', 'score-answer', 'generate-summary')
+
+
+class Recorder:
+    """Collects (latency, ok) samples per endpoint from all session threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {name: [] for name in ENDPOINTS + ('session',)}
+
+    def add(self, name, latency, ok):
+        with self._lock:
+            self.samples[name].append((latency, ok))
+
+
+def timed(recorder, name, send):
+    """Send one request, record its latency and return the JSON body (None on failure)"""
+    started = time.perf_counter()
+    try:
+        response = send()
+        ok = response.status_code == 200
+        body = response.json() if ok else None
+    except (requests.RequestException, ValueError):
+        ok, body = False, None
+    recorder.add(name, time.perf_counter() - started, ok)
+    return body
+
+
+def run_session(index, base_url, documents, recorder, think_time, local, speculate=True):
+    """Replay one interview session; returns True if every step succeeded"""
+    session = getattr(local, 'session', None)
+    if session is None:
+        session = local.session = requests.Session()
+    rng = random.Random(index)
+    api = f"{base_url}/api/v1"
+    started = time.perf_counter()
+
+    filename, content = documents[index % len(documents)]
+    parsed = timed(recorder, 'parse', lambda: session.post(f"{api}/resume/parse", files={'file': (filename, content)}))
+    time.sleep(think_time)
+
+    generated = timed(recorder, 'generate-questions', lambda: session.post(f"{api}/chat/generate-questions", json={}))
+    questions = (generated or {}).get('questions') or []
+    time.sleep(think_time)
+
+    data = (parsed or {}).get('data') or {}
+    name = data.get('name') or f"Candidate {index}"
+    email = data.get('email') or f"candidate{index}@example.com"
+    asked = [{'text': question.get('text', '')} for question in questions[:6]]
+
+    answers = []
+    for i, question in enumerate(questions[:6]):
+        # Tie answers to the candidate so sessions do not all hit the score cache
+        answer = f"{rng.choice(ANSWERS)} (candidate {index})"
+        body = {'question': question, 'answer': answer}
+        if speculate and i == len(asked) - 1:
+            # As the interview client does: the final answer starts the summary
+            body['summary_candidate'] = {'name': name, 'email': email, 'answers': answers, 'questions': asked}
+        scored = timed(recorder, 'score-answer', lambda: session.post(f"{api}/chat/score-answer", json=body))
+        answers.append({'answer': answer, 'score': (scored or {}).get('score') or 0})
+        time.sleep(think_time)
+
+    candidate = {
+        'name': name,
+        'email': email,
+        'answers': answers,
+        'questions': asked,
+        # Rounded half up, like the client's Math.round
+        'finalScore': math.floor(sum(answer['score'] for answer in answers) / len(answers) + 0.5) if answers else 0
+    }
+    summary = timed(recorder, 'generate-summary', lambda: session.post(
+        f"{api}/chat/generate-summary", json={'candidate': candidate}
+    ))
+
+    ok = all(body is not None for body in (parsed, generated, summary)) and len(answers) == 6
+    recorder.add('session', time.perf_counter() - started, ok)
+    return ok
+
+
+def load_documents(synthetic_pages):
+    documents = [(os.path.basename(path), open(path, 'rb').read()) for path in resume_files()]
+    if synthetic_pages:
+        documents.append((f"synthetic-{synthetic_pages}p.pdf", synthetic_pdf(synthetic_pages)))
+    if not documents:
+        raise SystemExit("No resumes found in dummy-test-resume/ and --synthetic-pages is 0")
+    return documents
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sessions', type=int, default=20, help='Interview sessions to replay (default: 20)')
+    arg_parser.add_argument('--concurrency', type=int, default=4, help='Sessions running at once (default: 4)')
+    arg_parser.add_argument('--think-time', type=float, default=0.0, help='Pause between steps of a session in seconds')
+    arg_parser.add_argument('--workers', type=int, default=2, help='gunicorn workers for the started backend (default: 2)')
+    arg_parser.add_argument('--synthetic-pages', type=int, default=10, help='Also upload a synthetic PDF with this many pages; 0 disables it')
+    arg_parser.add_argument('--no-question-bank', action='store_true', help='Generate every question set with OpenAI')
+    arg_parser.add_argument('--no-speculative-summary', action='store_true', help='Do not start the summary with the final answer')
+    arg_parser.add_argument('--url', help='Benchmark a backend that is already running at this URL')
+    add_mock_arguments(arg_parser)
+    add_result_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    documents = load_documents(args.synthetic_pages)
+    config = dict(vars(args), documents=[name for name, _ in documents])
+    for option in ('output', 'compare', 'tolerance', 'url'):
+        config.pop(option)
+
+    mock = None
+    server = None
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        mock = start_mock_server(**mock_config_from_args(args))
+        env = {'QUESTION_BANK_ENABLED': 'false'} if args.no_question_bank else None
+        server = BackendServer(mock.base_url, workers=args.workers, env=env).__enter__()
+        base_url = server.url
+
+    recorder = Recorder()
+    local = threading.local()
+    try:
+        print(f"Replaying {args.sessions} sessions against {base_url} with concurrency {args.concurrency}...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            outcomes = list(executor.map(
+                lambda index: run_session(index, base_url, documents, recorder, args.think_time, local,
+                                          speculate=not args.no_speculative_summary),
+                range(args.sessions)
+            ))
+        seconds = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.__exit__(None, None, None)
+
+    results = {name: summarize(samples, seconds) for name, samples in recorder.samples.items()}
+    print_table(results, f"{sum(outcomes)}/{len(outcomes)} sessions completed in {seconds:.1f}s")
+    if mock is not None:
+        stats = mock.config.stats
+        print(
+            f"\nMock OpenAI: {stats['requests']} requests, {stats['errors']} failed, "
+            f"{stats['prompt_tokens']} prompt + {stats['completion_tokens']} completion tokens"
+        )
+    return finish_results(args, 'sessions', config, results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Shared helpers for the benchmark scripts: latency statistics, result files
+and regression checks, synthetic PDFs and a throwaway backend server
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import platform
+import tempfile
+import subprocess
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCHMARKS_DIR)
+RESUME_DIR = os.path.join(os.path.dirname(BACKEND_DIR), 'dummy-test-resume')
+
+
+def percentile(sorted_values, fraction):
+    """Return the ``fraction`` percentile of sorted values (nearest rank)"""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples, seconds):
+    """Summarize (latency, ok) samples collected over ``seconds`` of wall time"""
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    return {
+        'count': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / seconds, 2) if seconds > 0 else 0.0,
+        'p50_ms': _ms(percentile(latencies, 0.50)),
+        'p95_ms': _ms(percentile(latencies, 0.95)),
+        'p99_ms': _ms(percentile(latencies, 0.99)),
+        'max_ms': _ms(latencies[-1] if latencies else None)
+    }
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def print_table(results, title):
+    """Print per-name summaries as an aligned table"""
+    print(f"\n{title}")
+    print(f"{'name':<44} {'count':>6} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, row in results.items():
+        print(
+            f"{name:<44} {row['count']:>6} {row['errors']:>4} {row['rps']:>8} "
+            f"{_fmt(row['p50_ms'])} {_fmt(row['p95_ms'])} {_fmt(row['p99_ms'])} {_fmt(row['max_ms'])}"
+        )
+
+
+def _fmt(value):
+    return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+
+def save_results(path, benchmark, config, results):
+    """Write results (with the run configuration) as JSON for later comparison"""
+    with open(path, 'w') as f:
+        json.dump({
+            'benchmark': benchmark,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'config': config,
+            'results': results
+        }, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def compare_results(path, results, tolerance):
+    """Compare p95 latency and throughput against a saved run.
+
+    Prints every change and returns the names that regressed by more than
+    ``tolerance`` (a fraction, e.g. 0.2 for 20%).
+    """
+    with open(path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f"\nComparison with {path} (tolerance {tolerance:.0%})")
+    for name, row in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        checks = [
+            ('p95_ms', before.get('p95_ms'), row.get('p95_ms'), False),
+            ('rps', before.get('rps'), row.get('rps'), True)
+        ]
+        for metric, old, new, higher_is_better in checks:
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            marker = '  REGRESSION' if regressed else ''
+            print(f"  {name:<44} {metric:<7} {old:>9} -> {new:>9} ({change:+.1%}){marker}")
+            if regressed:
+                regressions.append(f"{name} {metric}")
+    return regressions
+
+
+def add_result_arguments(arg_parser):
+    """Add the --output/--compare/--tolerance options shared by the benchmarks"""
+    arg_parser.add_argument('--output', help='Write results as JSON to this file')
+    arg_parser.add_argument('--compare', help='Compare with results saved by an earlier --output run')
+    arg_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95/rps regression as a fraction (default: 0.2)')
+
+
+def finish_results(args, benchmark, config, results):
+    """Save and compare results as requested; returns the exit status"""
+    if args.output:
+        save_results(args.output, benchmark, config, results)
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+def resume_files():
+    """Return the sample resumes in dummy-test-resume/"""
+    if not os.path.isdir(RESUME_DIR):
+        return []
+    return sorted(
+        os.path.join(RESUME_DIR, name) for name in os.listdir(RESUME_DIR)
+        if os.path.splitext(name)[1].lower() in ('.pdf', '.docx')
+    )
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def synthetic_pdf(pages, lines_per_page=45, seed=0):
+    """Return the bytes of a text PDF with ``pages`` pages of resume-like content.
+
+    Contact details are on the first page only, so contact extraction can
+    stop early while full-text parsing has to read every page.
+    """
+    import random
+    rng = random.Random(seed)
+    words = (
+        'developed maintained designed scalable services react node typescript postgres redis '
+        'kubernetes pipelines latency throughput customers migrated reduced improved led team '
+        'api frontend backend architecture testing monitoring incidents reliability'
+    ).split()
+
+    page_lines = []
+    for page in range(pages):
+        lines = []
+        if page == 0:
+            lines += ['Jordan Example', 'jordan.example@gmail.com', '+1 (555) 010-2030', '']
+        for _ in range(lines_per_page - len(lines)):
+            lines.append(' '.join(rng.choice(words) for _ in range(rng.randint(6, 12))).capitalize() + '.')
+        page_lines.append(lines)
+
+    objects = []
+    page_ids = []
+    font_id = 3
+    next_id = 4
+    for lines in page_lines:
+        stream = 'BT /F1 10 Tf 12 TL 50 760 Td\n' + ''.join(f"({_pdf_escape(line)}) Tj T*\n" for line in lines) + 'ET'
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        objects.append((content_id, f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"))
+        objects.append((page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        )))
+        page_ids.append(page_id)
+
+    objects.append((1, "<< /Type /Catalog /Pages 2 0 R >>"))
+    objects.append((2, f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"))
+    objects.append((font_id, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"))
+    objects.sort()
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = {}
+    for object_id, body in objects:
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for object_id in range(1, len(objects) + 1):
+        out += f"{offsets[object_id]:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('latin-1')
+    return bytes(out)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class BackendServer:
+    """Runs the backend under gunicorn (gunicorn.conf.py) with a throwaway DATA_DIR"""
+
+    def __init__(self, openai_base_url, workers=2, env=None):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.data_dir = tempfile.mkdtemp(prefix='bench-data-')
+        self.env = dict(
+            os.environ,
+            OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'sk-benchmark'),
+            OPENAI_BASE_URL=openai_base_url,
+            PORT=str(self.port),
+            GUNICORN_WORKERS=str(workers),
+            DATA_DIR=self.data_dir,
+            LOG_LEVEL='WARNING',
+            **(env or {})
+        )
+        self.process = None
+
+    def __enter__(self):
+        import requests
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+            cwd=BACKEND_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Backend exited with status {self.process.returncode}")
+            try:
+                if requests.get(f"{self.url}/api/v1/health/", timeout=1).status_code == 200:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.25)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Backend did not become healthy within 60s")
+
+    def __exit__(self, *exc_info):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
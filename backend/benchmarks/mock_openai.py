@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions API
+
+Answers POST /v1/chat/completions with canned question, score and summary
+payloads (streamed when the request asks for it) after a configurable
+latency, and fails a configurable share of requests:
+
+    python3 benchmarks/mock_openai.py --port 8900 --latency 0.8 --jitter 0.3 \\
+        --error-rate 0.05 --error-status 429 --retry-after 1
+
+Point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:8900/v1.
+The benchmarks start it in-process through ``start_mock_server``.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+QUESTIONS = [
+    {"text": "What is the virtual DOM and why does React use it?", "difficulty": "easy", "category": "Frontend",
+     "referenceAnswer": "The virtual DOM is an in-memory tree of the UI. React diffs it against the previous render and only updates the real DOM nodes that changed, which avoids slow layout work.",
+     "keywords": ["in-memory tree", "diff", "previous render", "real DOM"]},
+    {"text": "Explain the difference between let, const and var.", "difficulty": "easy", "category": "Frontend",
+     "referenceAnswer": "let and const are block scoped while var is function scoped and hoisted. const bindings cannot be reassigned, although the object they point to can still change.",
+     "keywords": ["block scoped", "function scoped", "hoisted", "reassigned"]},
+    {"text": "How would you design a REST API for paginated search results?", "difficulty": "medium", "category": "Backend",
+     "referenceAnswer": "Use cursor based pagination with a stable sort key, return a next cursor with each page and cap the page size so deep pages stay cheap.",
+     "keywords": ["cursor", "stable sort", "next cursor", "page size"]},
+    {"text": "How do you prevent unnecessary re-renders in a large React app?", "difficulty": "medium", "category": "Frontend",
+     "referenceAnswer": "Memoize expensive components with React.memo and useMemo, keep state close to where it is used and split contexts so updates do not fan out.",
+     "keywords": ["React.memo", "useMemo", "state", "context"]},
+    {"text": "Design a rate limiter shared by several application servers.", "difficulty": "hard", "category": "Backend",
+     "referenceAnswer": "Keep a token bucket per key in a shared store such as Redis, refill it lazily on each request with an atomic script, and fall back to a local limit if the store is down.",
+     "keywords": ["token bucket", "Redis", "atomic", "fallback"]},
+    {"text": "How would you migrate a monolith's database schema without downtime?", "difficulty": "hard", "category": "Full-stack",
+     "referenceAnswer": "Expand then contract: add new columns, dual write, backfill in batches, switch reads over, and only drop the old columns in a later release.",
+     "keywords": ["expand", "dual write", "backfill", "contract"]}
+]
+
+SCORE = {
+    "score": 72,
+    "feedback": "Solid answer that covers the main idea; an example would make it stronger.",
+    "technical_accuracy": 15,
+    "problem_solving": 14,
+    "communication": 15,
+    "relevance": 16,
+    "depth_of_knowledge": 12,
+    "strengths": ["Correct core explanation"],
+    "areas_for_improvement": ["Mention trade-offs"],
+    "suggestions": ["Walk through a concrete example"]
+}
+
+SUMMARY = (
+    "The candidate shows a solid grasp of frontend fundamentals and explains concepts clearly. "
+    "Answers on system design were shallower and would benefit from discussing trade-offs. "
+    "Recommended for a second-round technical interview."
+)
+
+
+def canned_content(messages):
+    """Pick the canned payload matching the prompt of a chat request"""
+    prompt = ' '.join(message.get('content') or '' for message in messages).lower()
+    if 'summary' in prompt and 'candidate' in prompt:
+        return SUMMARY
+    if 'question' in prompt and ('generate' in prompt or 'create' in prompt) and 'evaluat' not in prompt:
+        return json.dumps(QUESTIONS)
+    return json.dumps(SCORE)
+
+
+class MockConfig:
+    """Latency and error distribution of the mock server"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500, retry_after=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def draw(self):
+        """Return (delay in seconds, whether to fail) for one request"""
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            fail = self._random.random() < self.error_rate
+            self.stats['requests'] += 1
+            if fail:
+                self.stats['errors'] += 1
+        return delay, fail
+
+    def count_tokens(self, prompt_tokens, completion_tokens):
+        with self._lock:
+            self.stats['prompt_tokens'] += prompt_tokens
+            self.stats['completion_tokens'] += completion_tokens
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b'%x\r\n' % len(data) + data + b'\r\n')
+
+    def do_POST(self):
+        config = self.server.config
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        delay, fail = config.draw()
+        time.sleep(delay)
+        if fail:
+            headers = {'Retry-After': str(config.retry_after)} if config.retry_after is not None else None
+            self._send_json(config.error_status, {"error": {"message": "Mock failure", "type": "mock_error"}}, headers)
+            return
+
+        messages = body.get('messages') or []
+        content = canned_content(messages)
+        prompt_tokens = sum(len(message.get('content') or '') for message in messages) // 4
+        completion_tokens = len(content) // 4
+        config.count_tokens(prompt_tokens, completion_tokens)
+
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for start in range(0, len(content), 16):
+                event = {"choices": [{"delta": {"content": content[start:start + 16]}}]}
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            if (body.get('stream_options') or {}).get('include_usage'):
+                # Like OpenAI: one last chunk with no choices and the usage
+                event = {"choices": [], "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }}
+                self._write_chunk(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            self._write_chunk(b'data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        self._send_json(200, {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "model": body.get('model'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections (e.g. on shutdown) are not errors
+        if isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def start_mock_server(port=0, **config):
+    """Serve the mock in a background thread; returns the server (``server.base_url``, ``server.config``)"""
+    server = MockOpenAIServer(('127.0.0.1', port), MockOpenAIHandler)
+    server.config = MockConfig(**config)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, name='mock-openai', daemon=True).start()
+    return server
+
+
+def add_mock_arguments(arg_parser):
+    """Add the mock latency and error options to a benchmark's argument parser"""
+    arg_parser.add_argument('--latency', type=float, default=0.5, help='Mean OpenAI latency in seconds (default: 0.5)')
+    arg_parser.add_argument('--jitter', type=float, default=0.1, help='Standard deviation of the latency (default: 0.1)')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests that fail (default: 0)')
+    arg_parser.add_argument('--error-status', type=int, default=500, help='Status of failed requests (default: 500)')
+    arg_parser.add_argument('--retry-after', type=float, help='Retry-After header sent with failures')
+    arg_parser.add_argument('--seed', type=int, default=1, help='Random seed for latency and errors (default: 1)')
+
+
+def mock_config_from_args(args):
+    return {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'error_status': args.error_status,
+        'retry_after': args.retry_after,
+        'seed': args.seed
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--port', type=int, default=8900, help='Port to listen on (default: 8900)')
+    add_mock_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    server = start_mock_server(args.port, **mock_config_from_args(args))
+    print(f"Mock OpenAI API at {server.base_url} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(json.dumps(server.config.stats), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import os
+import time
+import logging
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from parse_pool import ParsePoolFull
+
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+
+def _read_limited(read, max_file_bytes):
+    """Call ``read`` and reject the result if it is larger than ``max_file_bytes``"""
+    data = read()
+    if max_file_bytes and len(data) > max_file_bytes:
+        raise ValueError(f"File is larger than {max_file_bytes} bytes")
+    return data
+
+
+def iter_zip_items(fileobj, name, max_file_bytes=None):
+    """Yield (name, load) for every resume in the zip archive ``name``.
+
+    Members are named ``<archive name>/<member path>``. ``load`` reads the
+    member only when called, so an archive is never unpacked into memory
+    all at once. Directories, macOS metadata and unsupported file types are
+    skipped; an unreadable archive yields a single failing item.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as e:
+        def load(error=e):
+            raise ValueError(f"Not a valid zip archive: {error}")
+        yield name, load
+        return
+
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                continue
+            if os.path.splitext(info.filename)[1].lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            # Reads stop at the declared size, so checking it up front is enough
+            def load(info=info):
+                if max_file_bytes and info.file_size > max_file_bytes:
+                    raise ValueError(f"File is larger than {max_file_bytes} bytes")
+                return archive.read(info)
+            yield f"{name}/{info.filename}", load
+
+
+def iter_path_items(paths, max_file_bytes=None):
+    """Yield (name, load) for resume files, directories (recursively) and zip archives"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    yield from iter_path_items([os.path.join(root, filename)], max_file_bytes)
+            continue
+
+        file_ext = os.path.splitext(path)[1].lower()
+        if file_ext == '.zip':
+            with open(path, 'rb') as archive:
+                yield from iter_zip_items(archive, path, max_file_bytes=max_file_bytes)
+        elif file_ext in SUPPORTED_EXTENSIONS:
+            def load(path=path):
+                with open(path, 'rb') as f:
+                    return _read_limited(f.read, max_file_bytes)
+            yield path, load
+
+
+def ingest(items, pool, parser, contacts_only=False, max_files=None, email_checker=None):
+    """Parse (name, load) items over ``pool``, yielding results as they finish.
+
+    Yields one record per file, ``{"file", "success", "data"}`` or
+    ``{"file", "success": False, "error"}``, in completion order. A failing
+    file never affects the others. The last record is ``{"summary": ...}``
+    with counts and throughput for the whole run. With ``email_checker`` (an
+    email_validation.DeliverabilityChecker) the emails of each group of
+    finished files are checked together.
+    """
+    started = time.perf_counter()
+    counts = {'files': 0, 'succeeded': 0, 'failed': 0}
+    failures = []
+    # Keep a few jobs queued per process without loading every file up front
+    window = max(pool.max_workers, 1) * 2
+    pending = {}
+
+    def record(name, result=None, error=None):
+        counts['files'] += 1
+        if error is None:
+            counts['succeeded'] += 1
+            return {'file': name, 'success': True, 'data': result}
+        counts['failed'] += 1
+        failures.append(name)
+        return {'file': name, 'success': False, 'error': str(error) or type(error).__name__}
+
+    def finish(futures):
+        parsed = []
+        for future in futures:
+            name = pending.pop(future)
+            try:
+                parsed.append((name, future.result()))
+            except Exception as e:
+                yield record(name, error=e)
+        if parsed and email_checker is not None:
+            try:
+                results = email_checker.filter_results([result for _, result in parsed])
+                parsed = [(name, result) for (name, _), result in zip(parsed, results)]
+            except Exception as e:
+                logger.warning("Email deliverability check failed: %s", e)
+        for name, result in parsed:
+            yield record(name, result=result)
+
+    for index, (name, load) in enumerate(items):
+        if max_files is not None and index >= max_files:
+            yield record(name, error=f"Skipped: more than {max_files} files in one run")
+            continue
+        try:
+            file_ext = os.path.splitext(name)[1].lower()
+            data = load()
+            while True:
+                try:
+                    future = pool.submit(data, parser, contacts_only=contacts_only, file_ext=file_ext)
+                    break
+                except ParsePoolFull as e:
+                    # The pool is shared with other runs: wait for room instead of failing the file
+                    if pending:
+                        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+                        yield from finish(done)
+                    else:
+                        time.sleep(e.retry_after)
+        except Exception as e:
+            yield record(name, error=e)
+            continue
+        pending[future] = name
+
+        while len(pending) >= window:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            yield from finish(done)
+
+    while pending:
+        done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+        yield from finish(done)
+
+    seconds = time.perf_counter() - started
+    yield {
+        'summary': dict(
+            counts,
+            seconds=round(seconds, 3),
+            files_per_second=round(counts['files'] / seconds, 2) if seconds > 0 else 0.0,
+            failures=failures
+        )
+    }
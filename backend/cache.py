@@ -0,0 +1,269 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import metrics
+import storage
+
+
+class ResultCache:
+    """Two-level TTL/LRU cache for JSON-serializable results.
+
+    Entries live in a bounded in-process LRU and, when ``db_path`` is set,
+    in a SQLite table shared by all workers on the host. Keys are
+    content-addressed: a SHA-256 over the canonical JSON of the key parts
+    and the cache ``version``, so bumping the version invalidates every
+    entry written by older code.
+
+    The on-disk layer is kept cheap for hot paths: a hit refreshes the
+    entry's LRU timestamp only when it is more than ``touch_interval``
+    seconds old, and each worker trims expired and excess entries once
+    every ``trim_interval`` sets, so the table may briefly hold up to
+    ``trim_interval`` entries per worker over ``max_disk_entries``.
+    """
+
+    def __init__(self, namespace, version, max_entries=1000, ttl=86400,
+                 db_path=None, max_disk_entries=50000, touch_interval=60.0, trim_interval=100):
+        """Initialize the cache; pass ``db_path=None`` for memory only"""
+        self.namespace = namespace
+        self.version = str(version)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.touch_interval = touch_interval
+        self.trim_interval = trim_interval
+
+        self._sets_since_trim = 0
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._generation = None
+        self._generation_checked_at = 0.0
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'saved': 0
+        }
+
+        if self.db_path:
+            self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed
+                    ON cache_entries (namespace, accessed_at);
+                CREATE TABLE IF NOT EXISTS cache_generations (
+                    namespace TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL
+                );
+            """)
+            # Entries written under another version can never be hit again
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND version != ?",
+                (self.namespace, self.version)
+            )
+            row = conn.execute(
+                "SELECT generation FROM cache_generations WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+            self._generation = row['generation'] if row else 0
+        finally:
+            conn.close()
+
+    def _sync_generation(self, now):
+        """Drop the memory layer if another worker invalidated the namespace.
+
+        The shared generation counter is read at most once per second so the
+        memory layer stays cheap.
+        """
+        if not self.db_path or now - self._generation_checked_at < 1.0:
+            return
+        self._generation_checked_at = now
+        generation = self._read_generation()
+        with self._lock:
+            if generation != self._generation:
+                self._memory.clear()
+            self._generation = generation
+
+    @storage.blocking
+    def _read_generation(self):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT generation FROM cache_generations WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row['generation'] if row else 0
+
+    def make_key(self, *parts):
+        """Return the content-addressed key for ``parts``"""
+        payload = json.dumps([self.namespace, self.version, parts], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key, saved=0):
+        """Return the cached value for ``key``, or None on a miss.
+
+        ``saved`` is added to the ``saved`` counter on a hit, e.g. the size
+        of the input whose processing the hit avoided.
+        """
+        now = time.time()
+        self._sync_generation(now)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats['memory_hits'] += 1
+                    self._stats['saved'] += saved
+                    metrics.CACHE_LOOKUPS.inc(cache=self.namespace, result='memory_hit')
+                    return json.loads(value)
+                del self._memory[key]
+
+        if self.db_path:
+            row = self._read_disk(key, now)
+            if row is not None:
+                self._remember(key, row['value'], row['expires_at'])
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                    self._stats['saved'] += saved
+                metrics.CACHE_LOOKUPS.inc(cache=self.namespace, result='disk_hit')
+                return json.loads(row['value'])
+
+        with self._lock:
+            self._stats['misses'] += 1
+        metrics.CACHE_LOOKUPS.inc(cache=self.namespace, result='miss')
+        return None
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` in every layer"""
+        now = time.time()
+        expires_at = now + self.ttl
+        serialized = json.dumps(value)
+        self._remember(key, serialized, expires_at)
+
+        with self._lock:
+            self._stats['sets'] += 1
+            self._sets_since_trim += 1
+            trim = self._sets_since_trim >= self.trim_interval
+            if trim:
+                self._sets_since_trim = 0
+
+        if self.db_path:
+            self._write_disk(key, serialized, expires_at, now, trim)
+
+    @storage.blocking
+    def _read_disk(self, key, now):
+        """Return the unexpired row for ``key``, refreshing its LRU timestamp if due"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value, expires_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None or row['expires_at'] <= now:
+                return None
+            # Hits only need the write lock once per touch_interval
+            if now - row['accessed_at'] >= self.touch_interval:
+                conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key)
+                )
+            return row
+        finally:
+            conn.close()
+
+    @storage.blocking
+    def _write_disk(self, key, serialized, expires_at, now, trim):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(namespace, key, version, value, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, self.version, serialized, expires_at, now)
+            )
+            if trim:
+                self._trim_disk(conn, now)
+        finally:
+            conn.close()
+
+    def _remember(self, key, serialized, expires_at):
+        with self._lock:
+            self._memory[key] = (expires_at, serialized)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def _trim_disk(self, conn, now):
+        """Drop expired entries and the least recently used ones over the bound"""
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache_entries WHERE namespace = ? "
+            "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_disk_entries)
+        )
+
+    def invalidate(self):
+        """Drop every entry in this namespace from all layers"""
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+                conn.execute(
+                    "INSERT INTO cache_generations (namespace, generation) VALUES (?, 1) "
+                    "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                    (self.namespace,)
+                )
+            finally:
+                conn.close()
+
+    def stats(self):
+        """Return hit/miss counters for this worker and entry counts"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+
+        stats['disk_entries'] = 0
+        if self.db_path:
+            conn = self._connect()
+            try:
+                stats['disk_entries'] = conn.execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0]
+            finally:
+                conn.close()
+
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = round((stats['memory_hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        stats.update({
+            'namespace': self.namespace,
+            'version': self.version,
+            'shared': bool(self.db_path)
+        })
+        return stats
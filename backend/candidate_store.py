@@ -0,0 +1,362 @@
+import json
+import time
+import uuid
+import base64
+import binascii
+from datetime import datetime, timezone
+
+import storage
+
+
+STATUSES = ('not_started', 'in_progress', 'paused', 'completed')
+
+# Sort keys accepted by ``list``, mapped to the indexed expression they order by.
+# Every order ends with the id so pages are stable when sort values tie.
+SORT_COLUMNS = {
+    'createdAt': 'created_at',
+    'updatedAt': 'updated_at',
+    'finalScore': 'IFNULL(final_score, -1)',
+    'name': 'name',
+    'email': 'email'
+}
+
+MAX_PAGE_SIZE = 200
+
+# Columns included in list and export rows; the full payload is only
+# returned for a single candidate or an NDJSON export
+SUMMARY_FIELDS = ('id', 'name', 'email', 'phone', 'interviewStatus', 'finalScore', 'summary', 'createdAt', 'updatedAt')
+
+
+class InvalidQuery(ValueError):
+    """Raised for list filters, sort keys or cursors that cannot be used"""
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def _encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, binascii.Error):
+        raise InvalidQuery("Invalid cursor")
+    if not isinstance(values, list) or len(values) != 2:
+        raise InvalidQuery("Invalid cursor")
+    return values
+
+
+def summary_input(candidate):
+    """Return the fields the summary prompt needs from a stored candidate.
+
+    Stored candidates carry their answers and the chat history the questions
+    were asked in, rather than a separate question list.
+    """
+    answers = candidate.get('answers') or candidate.get('interviewAnswers') or []
+    questions = candidate.get('questions')
+    if not questions:
+        questions = [
+            {'text': entry.get('content', '')}
+            for entry in candidate.get('chatHistory') or []
+            if isinstance(entry, dict) and entry.get('isQuestion')
+        ]
+    return {
+        'name': candidate.get('name'),
+        'email': candidate.get('email'),
+        'answers': answers,
+        'questions': questions,
+        'finalScore': candidate.get('finalScore')
+    }
+
+
+class CandidateStore:
+    """Candidates and their interviews, kept server-side for the interviewer dashboard.
+
+    Each candidate is stored as its full JSON payload, with the fields the
+    dashboard filters and sorts on copied into indexed columns. ``list``
+    pages with a keyset cursor over the sort index, so deep pages cost the
+    same as the first one, and ``iter_export`` walks the same index in
+    batches without holding a read transaction open while the client reads.
+    """
+
+    def __init__(self, db_path=None):
+        """Initialize the store and create its tables"""
+        self.db_path = db_path or storage.data_path('candidates.db')
+        self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS candidates (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+                    email TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+                    phone TEXT,
+                    status TEXT NOT NULL,
+                    final_score REAL,
+                    summary TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates (email, id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates (name, id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates (status, created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_status_score ON candidates (status, IFNULL(final_score, -1), id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_final_score ON candidates (IFNULL(final_score, -1), id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_created_at ON candidates (created_at, id);
+                CREATE INDEX IF NOT EXISTS idx_candidates_updated_at ON candidates (updated_at, id);
+            """)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(candidate, now):
+        status = candidate.get('interviewStatus') or 'not_started'
+        if status not in STATUSES:
+            raise InvalidQuery(f"Invalid interviewStatus '{status}'")
+        final_score = candidate.get('finalScore')
+        if final_score is not None:
+            try:
+                final_score = float(final_score)
+            except (TypeError, ValueError):
+                raise InvalidQuery("finalScore must be a number")
+        return (
+            str(candidate['id']),
+            str(candidate.get('name') or ''),
+            str(candidate.get('email') or ''),
+            candidate.get('phone'),
+            status,
+            final_score,
+            candidate.get('summary'),
+            now,
+            now,
+            json.dumps(candidate)
+        )
+
+    def upsert(self, candidates):
+        """Insert or replace candidates by id; returns the stored candidates.
+
+        Candidates without an id get one. ``createdAt`` is kept from the
+        first time a candidate was stored.
+        """
+        now = time.time()
+        rows = []
+        for candidate in candidates:
+            if not isinstance(candidate, dict):
+                raise InvalidQuery("Each candidate must be an object")
+            candidate = dict(candidate)
+            candidate.pop('createdAt', None)
+            candidate.pop('updatedAt', None)
+            candidate['id'] = str(candidate.get('id') or f"candidate_{uuid.uuid4().hex}")
+            rows.append(self._row(candidate, now))
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(
+                    "INSERT INTO candidates (id, name, email, phone, status, final_score, summary, created_at, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, email = excluded.email, phone = excluded.phone, "
+                    "status = excluded.status, final_score = excluded.final_score, summary = excluded.summary, "
+                    "updated_at = excluded.updated_at, data = excluded.data",
+                    rows
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        return self.get_many([row[0] for row in rows])
+
+    def update_summary(self, candidate_id, summary):
+        """Store a generated summary on a candidate; returns whether it exists"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute("SELECT data FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+                if row is not None:
+                    data = json.loads(row['data'])
+                    data['summary'] = summary
+                    conn.execute(
+                        "UPDATE candidates SET summary = ?, updated_at = ?, data = ? WHERE id = ?",
+                        (summary, time.time(), json.dumps(data), candidate_id)
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        return row is not None
+
+    @staticmethod
+    def _candidate(row):
+        candidate = json.loads(row['data'])
+        candidate['createdAt'] = _iso(row['created_at'])
+        candidate['updatedAt'] = _iso(row['updated_at'])
+        return candidate
+
+    @staticmethod
+    def _summary(row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'email': row['email'],
+            'phone': row['phone'],
+            'interviewStatus': row['status'],
+            'finalScore': row['final_score'],
+            'summary': row['summary'],
+            'createdAt': _iso(row['created_at']),
+            'updatedAt': _iso(row['updated_at'])
+        }
+
+    def get(self, candidate_id):
+        """Return the full candidate payload, or None"""
+        found = self.get_many([candidate_id])
+        return found[0] if found else None
+
+    def get_many(self, candidate_ids):
+        """Return the full payloads of the given candidates that exist, in order"""
+        if not candidate_ids:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT data, created_at, updated_at, id FROM candidates WHERE id IN ({','.join('?' * len(candidate_ids))})",
+                list(candidate_ids)
+            ).fetchall()
+        finally:
+            conn.close()
+        by_id = {row['id']: self._candidate(row) for row in rows}
+        return [by_id[candidate_id] for candidate_id in candidate_ids if candidate_id in by_id]
+
+    def delete(self, candidate_id):
+        """Delete a candidate; returns whether it existed"""
+        conn = self._connect()
+        try:
+            return conn.execute("DELETE FROM candidates WHERE id = ?", (candidate_id,)).rowcount > 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _where(status=None, email=None, search=None, min_score=None, max_score=None):
+        clauses, params = [], []
+        if status:
+            statuses = [status] if isinstance(status, str) else list(status)
+            unknown = [value for value in statuses if value not in STATUSES]
+            if unknown:
+                raise InvalidQuery(f"Invalid status '{unknown[0]}'")
+            clauses.append(f"status IN ({','.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if email:
+            # The column is NOCASE, so this is a case-insensitive index lookup
+            clauses.append("email = ?")
+            params.append(email.strip())
+        if search:
+            # Name or email prefix match; a trailing '%' keeps LIKE on the NOCASE indexes
+            pattern = search.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("(name LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        # Written against the score index expression; unscored candidates sort as -1
+        if min_score is not None:
+            clauses.append("IFNULL(final_score, -1) >= ?")
+            params.append(max(min_score, 0))
+        if max_score is not None:
+            clauses.append("IFNULL(final_score, -1) BETWEEN 0 AND ?")
+            params.append(max_score)
+        return clauses, params
+
+    def list(self, status=None, email=None, search=None, min_score=None, max_score=None,
+             sort='createdAt', order='desc', limit=50, cursor=None, include_total=True, full=False):
+        """Return one page of candidates matching the filters.
+
+        Returns ``{'candidates', 'total', 'next_cursor'}``; pass
+        ``next_cursor`` back as ``cursor`` to get the following page, it is
+        None on the last page. ``total`` counts every match and is None
+        when ``include_total`` is false. Rows are summaries unless ``full``.
+        ``limit`` is capped at MAX_PAGE_SIZE.
+        """
+        return self._page(
+            status=status, email=email, search=search, min_score=min_score, max_score=max_score,
+            sort=sort, order=order, limit=max(1, min(int(limit), MAX_PAGE_SIZE)), cursor=cursor,
+            include_total=include_total, full=full
+        )
+
+    def _page(self, status=None, email=None, search=None, min_score=None, max_score=None,
+              sort='createdAt', order='desc', limit=50, cursor=None, include_total=True, full=False):
+        """Return one page of ``list`` without capping ``limit``"""
+        if sort not in SORT_COLUMNS:
+            raise InvalidQuery(f"Invalid sort '{sort}'; use one of {', '.join(SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise InvalidQuery("Invalid order; use asc or desc")
+        column = SORT_COLUMNS[sort]
+        direction = 'DESC' if order == 'desc' else 'ASC'
+
+        clauses, params = self._where(status, email, search, min_score, max_score)
+        page_clauses, page_params = list(clauses), list(params)
+        if cursor:
+            after_value, after_id = _decode_cursor(cursor)
+            page_clauses.append(f"({column}, id) {'<' if order == 'desc' else '>'} (?, ?)")
+            page_params.extend([after_value, after_id])
+
+        where = f"WHERE {' AND '.join(page_clauses)}" if page_clauses else ''
+        columns = 'id, name, email, phone, status, final_score, summary, created_at, updated_at'
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {columns}{', data' if full else ''}, {column} AS sort_value FROM candidates {where} "
+                f"ORDER BY {column} {direction}, id {direction} LIMIT ?",
+                page_params + [limit + 1]
+            ).fetchall()
+            total = None
+            if include_total:
+                count_where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+                total = conn.execute(f"SELECT COUNT(*) FROM candidates {count_where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor([rows[-1]['sort_value'], rows[-1]['id']])
+        return {
+            'candidates': [self._candidate(row) if full else self._summary(row) for row in rows],
+            'total': total,
+            'next_cursor': next_cursor
+        }
+
+    def iter_export(self, batch_size=500, full=False, **filters):
+        """Yield every matching candidate in list order, one batch query of ``batch_size`` rows at a time.
+
+        Batches are not capped at MAX_PAGE_SIZE, which only limits pages
+        returned to API clients.
+        """
+        cursor = None
+        while True:
+            page = self._page(limit=max(1, int(batch_size)), cursor=cursor, include_total=False, full=full, **filters)
+            yield from page['candidates']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    def stats(self):
+        """Return candidate counts per interview status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM candidates GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        counts = {status: 0 for status in STATUSES}
+        counts.update({row['status']: row['count'] for row in rows})
+        return counts
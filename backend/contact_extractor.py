@@ -0,0 +1,141 @@
+import re
+from email_validator import EmailNotValidError
+
+from email_validation import validate_syntax
+
+
+# Lines that may carry an explicit "Name:", "Email:" or "Phone:" prefix.
+# Matches are re-checked with the exact prefix rule in ContactExtractor.
+PREFIX_LINE_RE = re.compile(r'^[^\S\n]*(name|email|phone):[^\n]*', re.IGNORECASE | re.MULTILINE)
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_RE = re.compile(r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})')
+PHONE_CLEAN_RE = re.compile(r'[^\d+]')
+
+NON_NAME_WORDS = frozenset(['resume', 'cv', 'curriculum', 'vitae'])
+
+# How much each extraction source is trusted
+CONFIDENCE = {
+    'name_prefix': 0.95,
+    'name_heading': 0.75,
+    'name_from_email': 0.4,
+    'email_prefix': 0.95,
+    'email_pattern': 0.85,
+    'phone_prefix': 0.9,
+    'phone_pattern': 0.7
+}
+
+
+class ContactExtractor:
+    """Extracts name, email and phone from resume text in a single pass.
+
+    Prefixed lines are located with one precompiled multi-line pattern, the
+    first lines are scanned once for a name heading, and the email and phone
+    patterns run at most once each. ``validate`` is called with a candidate
+    email and must raise EmailNotValidError if it is not usable; the default
+    checks syntax only, without network access.
+    """
+
+    def __init__(self, validate=None):
+        """Initialize the extractor with an optional email validator"""
+        self.validate = validate or validate_syntax
+
+    def extract(self, text, heading=True):
+        """Return name, email, phone and a confidence score for each.
+
+        Pass ``heading=False`` for text that does not start the document, so
+        its first lines are not taken as a name heading.
+        """
+        prefixed = {'name': None, 'email': None, 'phone': None}
+
+        for match in PREFIX_LINE_RE.finditer(text):
+            line = match.group(0).strip()
+            lowered = line.lower()
+
+            if lowered.startswith('name:'):
+                if prefixed['name'] is None:
+                    name = line[5:].strip()  # Remove "Name:" prefix
+                    if name and len(name) < 100:
+                        prefixed['name'] = name
+            elif lowered.startswith('email:'):
+                if prefixed['email'] is None:
+                    email = line[6:].strip()  # Remove "email:" prefix
+                    if email and self._is_valid(email):
+                        prefixed['email'] = email
+            elif lowered.startswith('phone:'):
+                if prefixed['phone'] is None:
+                    phone = PHONE_CLEAN_RE.sub('', line[6:].strip())  # Remove "Phone:" prefix
+                    if len(phone) >= 10:  # Minimum phone number length
+                        prefixed['phone'] = phone
+
+            # Explicit prefixes win over everything else, so stop once all are known
+            if prefixed['name'] and prefixed['email'] and prefixed['phone']:
+                break
+
+        email, email_source = self._resolve_email(text, prefixed['email'])
+        phone, phone_source = self._resolve_phone(text, prefixed['phone'])
+        name, name_source = self._resolve_name(text, prefixed['name'], email, heading)
+
+        return {
+            'name': name,
+            'email': email,
+            'phone': phone,
+            'confidence': {
+                'name': CONFIDENCE[name_source] if name_source else 0.0,
+                'email': CONFIDENCE[email_source] if email_source else 0.0,
+                'phone': CONFIDENCE[phone_source] if phone_source else 0.0
+            }
+        }
+
+    def _is_valid(self, email):
+        try:
+            self.validate(email)
+            return True
+        except EmailNotValidError:
+            return False
+
+    def _resolve_email(self, text, prefixed_email):
+        # First, the first valid explicit "Email:" line
+        if prefixed_email:
+            return prefixed_email, 'email_prefix'
+
+        # Then the first email-looking token anywhere in the text
+        match = EMAIL_RE.search(text)
+        if match and self._is_valid(match.group(0)):
+            return match.group(0), 'email_pattern'
+
+        return None, None
+
+    def _resolve_phone(self, text, prefixed_phone):
+        if prefixed_phone:
+            return prefixed_phone, 'phone_prefix'
+
+        match = PHONE_RE.search(text)
+        if match:
+            return ''.join(match.groups()), 'phone_pattern'
+
+        return None, None
+
+    def _resolve_name(self, text, prefixed_name, email, heading=True):
+        if prefixed_name:
+            return prefixed_name, 'name_prefix'
+
+        # Look for a title-case heading of 2-4 words in the first few lines
+        for line in text.split('\n', 5)[:5] if heading else ():
+            line = line.strip()
+            if 0 < len(line) < 100:
+                words = line.split()
+                if 2 <= len(words) <= 4 and all(word[0].isupper() for word in words):
+                    if not any(word.lower() in NON_NAME_WORDS for word in words):
+                        return line, 'name_heading'
+
+        # Derive a name from the email (common pattern: firstname.lastname@domain.com)
+        if email and '@' in email:
+            local_part = email.split('@')[0]
+            if '.' in local_part:
+                name_parts = local_part.split('.')
+                if len(name_parts) == 2:
+                    return f"{name_parts[0].capitalize()} {name_parts[1].capitalize()}", 'name_from_email'
+            elif len(local_part) > 2:  # Avoid very short names
+                return local_part.capitalize(), 'name_from_email'
+
+        return None, None
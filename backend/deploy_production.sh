@@ -24,13 +24,10 @@ PORT=${PORT:-7078}
 
 echo "🌐 Starting server on port $PORT using Python module..."
 
+# Worker class: gevent (high concurrency, default) or sync
+export GUNICORN_WORKER_CLASS=${GUNICORN_WORKER_CLASS:-gevent}
+export PORT
+
 # Run with Gunicorn using Python module execution (works regardless of PATH)
-python3 -m gunicorn --bind 0.0.0.0:$PORT \
-         --workers 4 \
-         --timeout 120 \
-         --keep-alive 2 \
-         --max-requests 1000 \
-         --max-requests-jitter 100 \
-         --access-logfile - \
-         --error-logfile - \
-         wsgi:app
+# Workers, timeouts and request recycling are set in gunicorn.conf.py
+python3 -m gunicorn -c gunicorn.conf.py wsgi:app
@@ -3,7 +3,7 @@ export default {
     {
       name: "swipe-interview-api",
       script: "python3",
-      args: "-m gunicorn --bind 0.0.0.0:7078 --workers 4 --timeout 120 wsgi:app",
+      args: "-m gunicorn -c gunicorn.conf.py wsgi:app",
       cwd: "/root/assignment-101/backend",
       interpreter: "none",
       instances: 1,
@@ -15,6 +15,7 @@ export default {
         FLASK_ENV: "production",
         FLASK_DEBUG: "False",
         PORT: 7078,
+        GUNICORN_WORKER_CLASS: "gevent",
       },
       error_file: "./logs/err.log",
       out_file: "./logs/out.log",
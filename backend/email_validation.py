@@ -0,0 +1,211 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import dns.resolver
+from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
+from email_validator.deliverability import validate_email_deliverability
+
+import metrics
+import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+DNS_LOOKUPS = metrics.Counter(
+    'email_dns_lookups_total', 'Email domain deliverability lookups by outcome', ('result',)
+)
+
+
+def validate_syntax(email):
+    """Check an email address offline; raises EmailNotValidError if it is not usable.
+
+    The result's ``ascii_domain`` is the IDNA form of the domain, which is
+    what DNS lookups and the deliverability cache use.
+    """
+    return validate_email(email, check_deliverability=False)
+
+
+def _domain_key(email):
+    """Return the domain of an email in the form it is cached and resolved under.
+
+    Internationalized domains are converted to their ASCII (IDNA) form, so
+    ``bücher.example`` and ``xn--bcher-kva.example`` share one cache entry
+    and one lookup. Addresses that fail the syntax check fall back to the
+    lowercased text after the last ``@``.
+    """
+    try:
+        return validate_syntax(email).ascii_domain
+    except EmailNotValidError:
+        return email.rsplit('@', 1)[-1].lower()
+
+
+def _resolve_domain(domain, timeout):
+    """Return (deliverable, reason) for an ASCII domain; deliverable is None when unknown"""
+    try:
+        # A resolver of our own, so the timeout does not change dnspython's default resolver
+        resolver = dns.resolver.Resolver()
+        resolver.lifetime = timeout
+        info = validate_email_deliverability(domain, domain, dns_resolver=resolver)
+    except EmailUndeliverableError as e:
+        return False, str(e)
+    except Exception as e:
+        return None, f"lookup failed: {e}"
+    if 'unknown-deliverability' in info:
+        return None, info['unknown-deliverability']
+    return True, None
+
+
+class DeliverabilityChecker:
+    """Opt-in check that candidate email domains can receive mail.
+
+    Results are kept per ASCII domain (see ``_domain_key``), in memory and
+    in a SQLite table shared by all workers, with separate lifetimes for
+    deliverable, undeliverable and unknown (timed out) domains. ``check`` resolves every uncached domain of
+    a batch concurrently and gives the whole batch at most ``budget``
+    seconds; domains still unresolved by then count as unknown, and unknown
+    domains are treated as deliverable.
+    """
+
+    def __init__(self, enabled=None, db_path=None, ttl=None, negative_ttl=None, unknown_ttl=None,
+                 timeout=None, budget=None, max_workers=None):
+        """Initialize the checker from arguments or environment variables"""
+        self.enabled = enabled if enabled is not None else os.getenv('EMAIL_CHECK_DELIVERABILITY', 'false').lower() == 'true'
+        self.db_path = db_path or storage.data_path('email_domains.db')
+        self.ttl = ttl if ttl is not None else int(os.getenv('EMAIL_DELIVERABILITY_TTL', 24 * 3600))
+        self.negative_ttl = negative_ttl if negative_ttl is not None else int(os.getenv('EMAIL_DELIVERABILITY_NEGATIVE_TTL', 3600))
+        self.unknown_ttl = unknown_ttl if unknown_ttl is not None else int(os.getenv('EMAIL_DELIVERABILITY_UNKNOWN_TTL', 300))
+        self.timeout = timeout or float(os.getenv('EMAIL_DNS_TIMEOUT', 2))
+        self.budget = budget or float(os.getenv('EMAIL_DELIVERABILITY_BUDGET', 3))
+        self.max_workers = max_workers or int(os.getenv('EMAIL_DNS_CONCURRENCY', 8))
+
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._executor = None
+        if self.enabled:
+            self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS email_domains (
+                    domain TEXT PRIMARY KEY,
+                    deliverable INTEGER,
+                    reason TEXT,
+                    checked_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+            """)
+        finally:
+            conn.close()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='email-dns')
+            return self._executor
+
+    def _cached(self, domains, now):
+        """Return {domain: deliverable} for the domains with an unexpired result"""
+        found = {}
+        with self._lock:
+            for domain in domains:
+                entry = self._memory.get(domain)
+                if entry is not None and entry[1] > now:
+                    found[domain] = entry[0]
+        for domain in found:
+            metrics.CACHE_LOOKUPS.inc(cache='email-domain', result='memory_hit')
+
+        missing = [domain for domain in domains if domain not in found]
+        if missing:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"SELECT domain, deliverable, expires_at FROM email_domains "
+                    f"WHERE domain IN ({','.join('?' * len(missing))}) AND expires_at > ?",
+                    missing + [now]
+                ).fetchall()
+            finally:
+                conn.close()
+            with self._lock:
+                for row in rows:
+                    deliverable = None if row['deliverable'] is None else bool(row['deliverable'])
+                    found[row['domain']] = deliverable
+                    self._memory[row['domain']] = (deliverable, row['expires_at'])
+            for domain in missing:
+                metrics.CACHE_LOOKUPS.inc(cache='email-domain', result='disk_hit' if domain in found else 'miss')
+        return found
+
+    def _store(self, results, now):
+        """Cache {domain: (deliverable, reason)} with the lifetime of each outcome"""
+        rows = []
+        for domain, (deliverable, reason) in results.items():
+            ttl = self.unknown_ttl if deliverable is None else self.ttl if deliverable else self.negative_ttl
+            rows.append((domain, None if deliverable is None else int(deliverable), reason, now, now + ttl))
+        with self._lock:
+            if len(self._memory) > 10000:
+                self._memory.clear()
+            for domain, deliverable, _, _, expires_at in rows:
+                self._memory[domain] = (None if deliverable is None else bool(deliverable), expires_at)
+        conn = self._connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO email_domains (domain, deliverable, reason, checked_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+        finally:
+            conn.close()
+
+    def check(self, emails):
+        """Return {email: False} for emails whose domain cannot receive mail.
+
+        Every other email maps to True. Checks nothing (all True) when the
+        checker is disabled.
+        """
+        emails = [email for email in emails if email]
+        if not self.enabled or not emails:
+            return {email: True for email in emails}
+
+        keys = {email: _domain_key(email) for email in emails}
+        domains = sorted(set(keys.values()))
+        now = time.time()
+        deliverable = self._cached(domains, now)
+
+        missing = [domain for domain in domains if domain not in deliverable]
+        if missing:
+            executor = self._get_executor()
+            futures = {executor.submit(_resolve_domain, domain, min(self.timeout, self.budget)): domain for domain in missing}
+            done, not_done = wait(futures, timeout=self.budget)
+            resolved = {futures[future]: future.result() for future in done}
+            for future in not_done:
+                resolved[futures[future]] = (None, 'batch budget exhausted')
+            for result, _ in resolved.values():
+                DNS_LOOKUPS.inc(result='unknown' if result is None else 'deliverable' if result else 'undeliverable')
+            self._store(resolved, now)
+            deliverable.update({domain: result for domain, (result, _) in resolved.items()})
+
+        return {email: deliverable.get(keys[email]) is not False for email in emails}
+
+    def filter_results(self, results):
+        """Drop undeliverable emails from parse results, checking them in one batch.
+
+        Returns new result dicts; the given ones (which may be cached) are
+        not modified.
+        """
+        checked = self.check([result.get('email') for result in results if result.get('email')])
+        filtered = []
+        for result in results:
+            email = result.get('email')
+            if email and not checked.get(email, True):
+                logger.info("Dropped undeliverable email from parse result")
+                result = dict(result, email=None, confidence=dict(result.get('confidence') or {}, email=0.0))
+            filtered.append(result)
+        return filtered
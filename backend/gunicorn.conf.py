@@ -0,0 +1,62 @@
+"""
+Gunicorn configuration for production deployment
+
+The default worker class is ``gevent``: each worker process serves many
+requests concurrently and yields while waiting on OpenAI, so slow LLM calls
+no longer block /health or /resume/parse. CPU-bound resume parsing is moved
+out of the cooperative workers into a process pool (see parse_pool.py).
+
+Set GUNICORN_WORKER_CLASS=sync to fall back to one request per worker.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 7078)}"
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 2))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+accesslog = '-'
+errorlog = '-'
+
+if worker_class == 'gevent':
+    # Size the upstream keep-alive pool for many in-flight LLM calls per worker
+    os.environ.setdefault('LLM_POOL_MAXSIZE', str(worker_connections))
+
+
+def _metrics():
+    """Import the metrics module in the master with the same .env the workers load"""
+    from dotenv import load_dotenv
+    load_dotenv()
+    import metrics
+    return metrics
+
+
+def on_starting(server):
+    """Drop metric snapshots left by a previous run before any worker starts"""
+    _metrics().reset_directory()
+
+
+def post_worker_init(worker):
+    """Start the app's background work once the worker has loaded it"""
+    import sys
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.start_background_work()
+
+
+def worker_exit(server, worker):
+    """Stop the parse pool processes owned by an exiting worker and save its last metrics"""
+    import sys
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.parse_pool.shutdown()
+        app_module.bulk_parse_pool.shutdown()
+        app_module.metrics.flush()
+
+
+def child_exit(server, worker):
+    """Fold an exited worker's metric counters into the archive snapshot"""
+    _metrics().mark_process_dead(worker.pid)
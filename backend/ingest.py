@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Bulk resume ingestion from the command line
+
+Parses resume files, directories of resumes and zip archives over a process
+pool and writes one JSON line per file (in completion order) followed by a
+summary line:
+
+    python3 ingest.py resumes/ export.zip --workers 4 --output results.ndjson
+
+Exits with status 1 if any file failed.
+"""
+import os
+import sys
+import json
+import argparse
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bulk_ingest import iter_path_items, ingest
+from email_validation import DeliverabilityChecker
+from logging_config import configure_logging
+from parse_pool import ParsePool
+from resume_parser import ResumeParser
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='Parse many resumes and write NDJSON results.')
+    arg_parser.add_argument('paths', nargs='+', help='Resume files (PDF or DOCX), directories or ZIP archives')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Parsing processes (default: CPU count)')
+    arg_parser.add_argument('--include-text', action='store_true', help='Also return the full resume text')
+    arg_parser.add_argument('--max-file-bytes', type=int, default=20 * 1024 * 1024, help='Skip files larger than this')
+    arg_parser.add_argument('--output', help='Write results to this file instead of stdout')
+    arg_parser.add_argument('--check-deliverability', action='store_true', help='Drop emails whose domain cannot receive mail (DNS lookups)')
+    args = arg_parser.parse_args(argv)
+
+    # Keep stdout clean for the NDJSON results
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    configure_logging(stream=sys.stderr)
+
+    pool = ParsePool(max_workers=args.workers)
+    output = open(args.output, 'w') if args.output else sys.stdout
+    summary = None
+    try:
+        records = ingest(
+            iter_path_items(args.paths, max_file_bytes=args.max_file_bytes),
+            pool,
+            ResumeParser(),
+            contacts_only=not args.include_text,
+            email_checker=DeliverabilityChecker(enabled=True if args.check_deliverability else None)
+        )
+        for record in records:
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+            summary = record.get('summary', summary)
+    finally:
+        pool.shutdown()
+        if output is not sys.stdout:
+            output.close()
+
+    print(
+        f"Parsed {summary['files']} files in {summary['seconds']}s "
+        f"({summary['files_per_second']} files/s), {summary['failed']} failed",
+        file=sys.stderr
+    )
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import logging
+import threading
+
+import metrics
+import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+JOBS = metrics.Counter(
+    'background_jobs_total', 'Background jobs finished by queue and result', ('queue', 'result')
+)
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+class JobQueue:
+    """Persistent queue of keyed background jobs run by in-process worker threads.
+
+    Jobs live in a SQLite table shared by all workers, keyed by the caller:
+    submitting a key that is already queued, running or done returns the
+    existing job instead of adding a duplicate. Each process runs up to
+    ``workers`` threads, started by ``start`` or the first ``submit``, which
+    claim jobs from the shared table under a lease. A job whose lease runs
+    out (its process died) is claimed again by any started worker, so queued
+    work survives restarts once ``start`` is called at startup.
+    ``handler`` is called with the job payload and returns a JSON-serializable
+    result; results are kept for ``result_ttl`` seconds.
+    """
+
+    def __init__(self, name, handler, db_path=None, workers=None, lease=None, max_attempts=None,
+                 result_ttl=None, poll_interval=1.0):
+        """Initialize the queue from arguments or environment variables"""
+        prefix = f"{name.upper()}_JOB"
+        self.name = name
+        self.handler = handler
+        self.db_path = db_path or storage.data_path('jobs.db')
+        self.workers = workers or int(os.getenv(f'{prefix}_WORKERS', 2))
+        self.lease = lease or float(os.getenv(f'{prefix}_LEASE', 120))
+        self.max_attempts = max_attempts or int(os.getenv(f'{prefix}_MAX_ATTEMPTS', 2))
+        self.result_ttl = result_ttl or float(os.getenv(f'{prefix}_RESULT_TTL', 3600))
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads = []
+        self._finished = threading.Condition()
+        self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    queue TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_until REAL,
+                    expires_at REAL,
+                    PRIMARY KEY (queue, key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (queue, status, created_at);
+            """)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _job(row):
+        return {
+            'id': row['key'],
+            'status': row['status'],
+            'result': json.loads(row['result']) if row['result'] is not None else None,
+            'error': row['error'],
+            'attempts': row['attempts'],
+            'created_at': row['created_at'],
+            'started_at': row['started_at'],
+            'finished_at': row['finished_at']
+        }
+
+    def start(self):
+        """Start this process's worker threads, e.g. to resume jobs left by a restart"""
+        self._ensure_workers()
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for _ in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._run, name=f'{self.name}-jobs', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key, payload):
+        """Queue a job unless one with this key is queued, running or done; returns the job.
+
+        A failed or expired job with the same key is replaced.
+        """
+        row = self._insert(key, payload)
+        if row['status'] == QUEUED:
+            self._ensure_workers()
+            with self._wakeup:
+                self._wakeup.notify()
+        return self._job(row)
+
+    @storage.blocking
+    def _insert(self, key, payload):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute("DELETE FROM jobs WHERE queue = ? AND status IN (?, ?) AND expires_at <= ?",
+                             (self.name, DONE, FAILED, now))
+                conn.execute(
+                    "INSERT INTO jobs (queue, key, status, payload, created_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (queue, key) DO UPDATE SET status = excluded.status, payload = excluded.payload, "
+                    "result = NULL, error = NULL, attempts = 0, created_at = excluded.created_at, "
+                    "started_at = NULL, finished_at = NULL, lease_until = NULL, expires_at = NULL "
+                    "WHERE jobs.status = ?",
+                    (self.name, key, QUEUED, json.dumps(payload), now, FAILED)
+                )
+                row = conn.execute("SELECT * FROM jobs WHERE queue = ? AND key = ?", (self.name, key)).fetchone()
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        return row
+
+    @storage.blocking
+    def get(self, key):
+        """Return the job with this key, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE queue = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (self.name, key, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return self._job(row) if row else None
+
+    def wait(self, key, timeout):
+        """Wait up to ``timeout`` seconds for a job to finish; returns it as last seen, or None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(key)
+            remaining = deadline - time.monotonic()
+            if job is None or job['status'] in (DONE, FAILED) or remaining <= 0:
+                return job
+            # Woken early by jobs finishing in this process; jobs run by
+            # other processes are seen on the next poll
+            with self._finished:
+                self._finished.wait(min(remaining, 0.25))
+
+    def complete(self, key, result):
+        """Store the result of work done outside the queue under ``key``"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (queue, key, status, payload, result, attempts, created_at, finished_at, expires_at) "
+                "VALUES (?, ?, ?, 'null', ?, 0, ?, ?, ?)",
+                (self.name, key, DONE, json.dumps(result), now, now, now + self.result_ttl)
+            )
+        finally:
+            conn.close()
+
+    @storage.blocking
+    def _claim(self):
+        """Take the oldest queued job, or a running one whose lease ran out"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # Check without the write lock first, since idle workers poll every second
+            claimable = conn.execute(
+                "SELECT 1 FROM jobs WHERE queue = ? AND (status = ? OR (status = ? AND lease_until <= ?)) LIMIT 1",
+                (self.name, QUEUED, RUNNING, now)
+            ).fetchone()
+            if claimable is None:
+                return None
+
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Give up on jobs whose process died on every attempt
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = 'worker lost', finished_at = ?, lease_until = NULL, expires_at = ? "
+                    "WHERE queue = ? AND status = ? AND lease_until <= ? AND attempts >= ?",
+                    (FAILED, now, now + self.result_ttl, self.name, RUNNING, now, self.max_attempts)
+                )
+                row = conn.execute(
+                    "SELECT key, payload, attempts FROM jobs WHERE queue = ? AND "
+                    "(status = ? OR (status = ? AND lease_until <= ?)) ORDER BY created_at LIMIT 1",
+                    (self.name, QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, lease_until = ? "
+                        "WHERE queue = ? AND key = ?",
+                        (RUNNING, now, now + self.lease, self.name, row['key'])
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+        return row
+
+    def _finish(self, key, status, result=None, error=None):
+        self._update(key, status, result, error)
+        with self._finished:
+            self._finished.notify_all()
+
+    @storage.blocking
+    def _update(self, key, status, result, error):
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL, expires_at = ? "
+                "WHERE queue = ? AND key = ?",
+                (status, None if result is None else json.dumps(result), error,
+                 None if status == QUEUED else now, None if status == QUEUED else now + self.result_ttl,
+                 self.name, key)
+            )
+        finally:
+            conn.close()
+
+    def _run(self):
+        while True:
+            try:
+                row = self._claim()
+            except Exception:
+                logger.exception("Failed to claim background job", extra={'queue': self.name})
+                row = None
+            if row is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_interval)
+                continue
+
+            key = row['key']
+            started = time.monotonic()
+            try:
+                result = self.handler(json.loads(row['payload']))
+            except Exception as e:
+                attempts = row['attempts'] + 1
+                if attempts < self.max_attempts:
+                    logger.warning("Background job failed, retrying: %s", e, extra={'queue': self.name, 'attempts': attempts})
+                    self._finish(key, QUEUED, error=str(e))
+                    JOBS.inc(queue=self.name, result='retried')
+                else:
+                    logger.warning("Background job failed: %s", e, extra={'queue': self.name, 'attempts': attempts})
+                    self._finish(key, FAILED, error=str(e))
+                    JOBS.inc(queue=self.name, result='failed')
+                continue
+            self._finish(key, DONE, result=result)
+            JOBS.inc(queue=self.name, result='done')
+            logger.info("Background job done", extra={'queue': self.name, 'seconds': round(time.monotonic() - started, 3)})
+
+    def stats(self):
+        """Return job counts per status and this process's worker threads"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS count FROM jobs WHERE queue = ? GROUP BY status", (self.name,)
+            ).fetchall()
+        finally:
+            conn.close()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update({row['status']: row['count'] for row in rows})
+        with self._lock:
+            alive = sum(1 for thread in self._threads if thread.is_alive())
+        return {'queue': self.name, 'jobs': counts, 'workers': alive, 'max_workers': self.workers}
@@ -0,0 +1,412 @@
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from prompts import estimate_message_tokens
+from rate_limiter import PRIORITY_INTERACTIVE, RateLimitTimeout
+from resilience import CircuitBreaker, backoff_delay, parse_retry_after
+
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Upstream responses worth retrying: rate limited or temporarily unavailable
+RETRYABLE_STATUS_CODES = frozenset([408, 429, 500, 502, 503, 504])
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Raised when the upstream call fails or returns an unusable response.
+
+    The message is safe to return to API clients as-is.
+    """
+    pass
+
+
+class LLMUnavailable(LLMError):
+    """Raised without calling the upstream while the circuit breaker is open
+    or the client-side rate limit has no quota left in time"""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMDeadlineExceeded(LLMError):
+    """Raised when the endpoint's time budget ran out before a usable response"""
+    pass
+
+
+def estimate_tokens(messages, max_tokens):
+    """Roughly estimate the tokens a call uses: the estimated prompt plus the completion budget"""
+    return estimate_message_tokens(messages) + max_tokens
+
+
+def _response_usage(response):
+    """Return the usage object of a chat completion response, or an empty dict"""
+    try:
+        return response.json().get('usage') or {}
+    except ValueError:
+        return {}
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class LLMClient:
+    """Pooled, resilient HTTP client for the OpenAI chat completions API.
+
+    One instance is shared by all chat endpoints of a worker process, so
+    TCP/TLS connections to the upstream are kept alive and reused instead of
+    being re-established on every request. Calls are retried with backoff
+    (honoring Retry-After) on rate limits, 5xx responses and network errors,
+    within an optional per-call deadline, and a circuit breaker fails fast
+    while the upstream keeps failing. With a ``rate_limiter`` every attempt
+    first takes request and token quota from it, so the upstream quota is
+    shared by priority instead of being spent on 429s.
+    """
+
+    def __init__(self, base_url=None, pool_connections=None, pool_maxsize=None,
+                 connect_timeout=None, read_timeout=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, breaker=None, rate_limiter=None):
+        """Initialize the client from arguments or environment variables"""
+        self.base_url = (base_url or os.getenv('OPENAI_BASE_URL', DEFAULT_BASE_URL)).rstrip('/')
+        self.pool_connections = pool_connections or int(os.getenv('LLM_POOL_CONNECTIONS', 4))
+        self.pool_maxsize = pool_maxsize or int(os.getenv('LLM_POOL_MAXSIZE', 10))
+        self.connect_timeout = connect_timeout or float(os.getenv('LLM_CONNECT_TIMEOUT', 5))
+        self.read_timeout = read_timeout or float(os.getenv('LLM_READ_TIMEOUT', 30))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('LLM_MAX_RETRIES', 2))
+        self.backoff_base = backoff_base or float(os.getenv('LLM_BACKOFF_BASE', 0.5))
+        self.backoff_max = backoff_max or float(os.getenv('LLM_BACKOFF_MAX', 8))
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv('LLM_BREAKER_THRESHOLD', 5)),
+            reset_timeout=float(os.getenv('LLM_BREAKER_RESET', 30))
+        )
+        self.rate_limiter = rate_limiter
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._hedge_executor = None
+        self._pid = None
+        self._stats = {
+            'requests': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'retries': 0,
+            'hedged': 0,
+            'hedge_wins': 0,
+            'prompt_tokens_estimated': 0,
+            'prompt_tokens': 0
+        }
+
+    def _get_session(self):
+        """Return the session for this process, creating it after a fork"""
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self._lock:
+                if self._session is None or self._pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize
+                    )
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+                    self._hedge_executor = ThreadPoolExecutor(
+                        max_workers=self.pool_maxsize,
+                        thread_name_prefix='llm-hedge'
+                    )
+                    self._pid = pid
+        return self._session
+
+    def _headers(self):
+        return {
+            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
+            "Content-Type": "application/json"
+        }
+
+    def _timeout(self, deadline):
+        """Return the (connect, read) timeout for one attempt within ``deadline``"""
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is None:
+            return (self.connect_timeout, self.read_timeout)
+        if remaining <= 0:
+            raise LLMDeadlineExceeded(f"OpenAI call did not complete within {deadline.seconds:g}s")
+        return (min(self.connect_timeout, remaining), min(self.read_timeout, remaining))
+
+    def _post(self, data, timeout, stream=False):
+        """Send one chat completions request"""
+        session = self._get_session()
+        with self._lock:
+            self._stats['requests'] += 1
+            self._stats['in_flight'] += 1
+        metrics.OPENAI_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = session.post(
+                f"{self.base_url}/chat/completions",
+                headers=self._headers(),
+                json=data,
+                timeout=timeout,
+                stream=stream
+            )
+            status = response.status_code
+            return response
+        except requests.RequestException:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._stats['in_flight'] -= 1
+            metrics.OPENAI_REQUESTS_IN_FLIGHT.dec()
+            metrics.OPENAI_REQUEST_DURATION.observe(time.perf_counter() - started, model=data['model'], status=status)
+
+    def _acquire_quota(self, tokens, priority, deadline, block=True):
+        """Wait for rate limiter quota for one upstream request"""
+        if self.rate_limiter is None:
+            return
+        try:
+            self.rate_limiter.acquire(tokens, priority=priority, deadline=deadline, block=block)
+        except RateLimitTimeout as e:
+            raise LLMUnavailable(
+                f"OpenAI quota is exhausted, please retry in {e.retry_after}s",
+                retry_after=e.retry_after
+            ) from e
+
+    def _record_usage(self, usage, model, tokens, estimated_prompt_tokens):
+        """Record the token usage OpenAI reports next to the prompt estimate,
+        and correct the rate limiter's estimate"""
+        route = metrics.current_route()
+        for kind in ('prompt', 'completion'):
+            if usage.get(f'{kind}_tokens') is not None:
+                metrics.OPENAI_TOKENS.inc(usage[f'{kind}_tokens'], route=route, model=model, type=kind)
+        if usage.get('prompt_tokens') is not None:
+            metrics.OPENAI_PROMPT_TOKENS_ESTIMATED.inc(estimated_prompt_tokens, route=route, model=model)
+            with self._lock:
+                self._stats['prompt_tokens_estimated'] += estimated_prompt_tokens
+                self._stats['prompt_tokens'] += usage['prompt_tokens']
+            logger.debug(
+                "OpenAI token usage",
+                extra={
+                    'route': route,
+                    'estimated_prompt_tokens': estimated_prompt_tokens,
+                    'prompt_tokens': usage['prompt_tokens'],
+                    'completion_tokens': usage.get('completion_tokens')
+                }
+            )
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(tokens, usage.get('total_tokens'))
+
+    def _hedged_post(self, data, timeout, hedge_after, tokens, priority, deadline):
+        """Send a request and, if it has not answered after ``hedge_after`` seconds,
+        a duplicate; return the first successful response"""
+        self._get_session()
+        futures = [self._hedge_executor.submit(self._post, data, timeout)]
+        done, _ = wait(futures, timeout=hedge_after)
+        if done:
+            return futures[0].result()
+        # The duplicate is a real upstream request and spends quota too;
+        # without quota to spare, keep waiting for the first one instead
+        try:
+            self._acquire_quota(tokens, priority, deadline, block=False)
+        except LLMUnavailable:
+            return futures[0].result()
+        with self._lock:
+            self._stats['hedged'] += 1
+        futures.append(self._hedge_executor.submit(self._post, data, timeout))
+
+        outcome = None
+        for future in as_completed(futures):
+            if future.exception() is None and future.result().status_code == 200:
+                outcome = future
+                break
+            outcome = outcome or future
+
+        if outcome is futures[1]:
+            with self._lock:
+                self._stats['hedge_wins'] += 1
+        for future in futures:
+            if future is not outcome:
+                # Release the loser's connection whenever it finishes
+                future.add_done_callback(_close_response)
+        return outcome.result()
+
+    def _request(self, data, deadline=None, hedge_after=None, stream=False, priority=PRIORITY_INTERACTIVE):
+        """Send a request with retries, circuit breaking and rate limiting.
+
+        Returns the first non-retryable response (callers check its status),
+        or the last response once retries or the deadline are exhausted.
+        Network errors are re-raised when no retry is left.
+        """
+        tokens = estimate_tokens(data['messages'], data['max_tokens'])
+        attempt = 0
+        while True:
+            # Checked before taking quota, so calls refused by an open breaker spend none
+            if not self.breaker.allow():
+                retry_after = self.breaker.retry_after()
+                raise LLMUnavailable(
+                    f"OpenAI is temporarily unavailable, please retry in {int(retry_after) + 1}s",
+                    retry_after=int(retry_after) + 1
+                )
+            try:
+                self._acquire_quota(tokens, priority, deadline)
+                timeout = self._timeout(deadline)
+            except BaseException:
+                # No request was sent, so the half-open probe goes to the next caller
+                self.breaker.release()
+                raise
+
+            response = None
+            error = None
+            try:
+                if hedge_after and not stream:
+                    response = self._hedged_post(data, timeout, hedge_after, tokens, priority, deadline)
+                else:
+                    response = self._post(data, timeout, stream=stream)
+            except requests.RequestException as e:
+                self.breaker.record_failure()
+                error = e
+            except BaseException:
+                # Says nothing about the upstream, but must not hold the half-open probe
+                self.breaker.release()
+                raise
+            else:
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    # Rate limits and client errors still prove the upstream is up
+                    self.breaker.record_success()
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    if not stream and response.status_code == 200:
+                        # Streams record the usage sent in their last chunk
+                        self._record_usage(_response_usage(response), data['model'], tokens, tokens - data['max_tokens'])
+                    return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after=retry_after)
+            remaining = deadline.remaining() if deadline is not None else None
+            if attempt >= self.max_retries or delay > self.backoff_max or (remaining is not None and delay >= remaining):
+                if response is not None:
+                    return response
+                if isinstance(error, requests.Timeout) and deadline is not None and deadline.expired():
+                    raise LLMDeadlineExceeded(f"OpenAI call did not complete within {deadline.seconds:g}s") from error
+                raise error
+
+            logger.warning(
+                "Retrying OpenAI call in %.2fs",
+                delay,
+                extra={'attempt': attempt + 1, 'status': response.status_code if response is not None else None}
+            )
+            if response is not None:
+                response.close()
+            with self._lock:
+                self._stats['retries'] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def chat_completion(self, messages, max_tokens, temperature=0.7, model="gpt-3.5-turbo",
+                        deadline=None, hedge_after=None, priority=PRIORITY_INTERACTIVE):
+        """POST a chat completion request and return the raw response.
+
+        ``deadline`` (a resilience.Deadline) bounds all attempts together.
+        With ``hedge_after`` a duplicate request is sent if the first has not
+        answered within that many seconds; only use it for idempotent calls.
+        ``priority`` orders the call against others waiting for rate limit quota.
+        """
+        data = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature
+        }
+        return self._request(data, deadline=deadline, hedge_after=hedge_after, priority=priority)
+
+    def stream_chat_completion(self, messages, max_tokens, temperature=0.7, model="gpt-3.5-turbo",
+                               deadline=None, priority=PRIORITY_INTERACTIVE):
+        """Stream a chat completion, yielding content deltas as they arrive.
+
+        Establishing the stream is retried like ``chat_completion``; once
+        content has been yielded the stream is never restarted. The token
+        usage OpenAI sends in the last chunk is recorded like for other calls.
+        """
+        data = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True}
+        }
+        tokens = estimate_tokens(messages, max_tokens)
+
+        with self._request(data, deadline=deadline, stream=True, priority=priority) as response:
+            if response.status_code != 200:
+                raise LLMError(f"OpenAI API call failed with status {response.status_code}: {response.text}")
+
+            with self._lock:
+                self._stats['in_flight'] += 1
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith('data:'):
+                        continue
+                    payload = line[5:].strip()
+                    if payload == '[DONE]':
+                        break
+                    chunk = json.loads(payload)
+                    if chunk.get('usage'):
+                        # Sent once, after the last content chunk
+                        self._record_usage(chunk['usage'], model, tokens, tokens - max_tokens)
+                    choices = chunk.get('choices') or []
+                    delta = choices[0].get('delta', {}).get('content') if choices else None
+                    if delta:
+                        yield delta
+            except requests.RequestException:
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+            finally:
+                with self._lock:
+                    self._stats['in_flight'] -= 1
+
+    def stats(self):
+        """Return request counters, circuit breaker state and connection pool statistics"""
+        with self._lock:
+            stats = dict(self._stats)
+
+        pools = []
+        if self._session is not None and self._pid == os.getpid():
+            adapter = self._session.get_adapter(self.base_url)
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                pools.append({
+                    'host': f"{pool.scheme}://{pool.host}:{pool.port}",
+                    'connections_created': pool.num_connections,
+                    'requests_sent': pool.num_requests,
+                    'idle_connections': pool.pool.qsize() if pool.pool is not None else 0
+                })
+
+        stats.update({
+            'base_url': self.base_url,
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'connect_timeout': self.connect_timeout,
+            'read_timeout': self.read_timeout,
+            'max_retries': self.max_retries,
+            'circuit_breaker': self.breaker.stats(),
+            'rate_limited': self.rate_limiter is not None and self.rate_limiter.enabled,
+            'pools': pools
+        })
+        return stats
@@ -0,0 +1,265 @@
+import re
+import json
+import math
+import time
+import hashlib
+
+import storage
+
+
+STOPWORDS = frozenset([
+    'a', 'about', 'after', 'all', 'also', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'because', 'been',
+    'before', 'being', 'between', 'both', 'but', 'by', 'can', 'could', 'did', 'do', 'does', 'doing', 'each',
+    'for', 'from', 'had', 'has', 'have', 'having', 'how', 'i', 'if', 'in', 'into', 'is', 'it', 'its', 'just',
+    'me', 'more', 'most', 'my', 'no', 'not', 'of', 'on', 'once', 'only', 'or', 'other', 'our', 'out', 'over',
+    'own', 'same', 'should', 'so', 'some', 'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there',
+    'these', 'they', 'this', 'those', 'through', 'to', 'too', 'under', 'until', 'up', 'use', 'used', 'using',
+    'very', 'was', 'we', 'were', 'what', 'when', 'where', 'which', 'while', 'who', 'why', 'will', 'with',
+    'would', 'you', 'your', 'explain', 'describe', 'difference'
+])
+
+# Words that usually mark reasoning rather than a bare list of terms
+REASONING_MARKERS = frozenset([
+    'because', 'since', 'therefore', 'so', 'first', 'then', 'finally', 'instead', 'however', 'but',
+    'tradeoff', 'trade', 'example', 'if', 'otherwise', 'unless', 'which', 'means'
+])
+
+_TOKEN = re.compile(r"[a-z][a-z0-9+#]*|\d+")
+_WORD = re.compile(r'[a-z]+')
+_SENTENCE_END = re.compile(r'[.!?;]+(?:\s|$)')
+
+# Reference terms used as keywords when a question was stored without any
+DERIVED_KEYWORDS = 6
+
+
+def _stem(token):
+    """Fold plurals so 'closures' matches 'closure'"""
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercase content words of ``text`` with stopwords removed"""
+    return [_stem(token) for token in _TOKEN.findall(str(text or '').lower()) if token not in STOPWORDS]
+
+
+def question_hash(text):
+    """Key of a question in the reference store"""
+    normalized = ' '.join(str(text or '').lower().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+class LocalScorer:
+    """Scores answers offline against reference answers stored with each question.
+
+    Reference answers and keywords come from question generation and are
+    kept in a SQLite database shared by all workers, together with the
+    document frequency of every reference term. ``score`` compares an
+    answer with its question's reference using TF-IDF cosine similarity and
+    keyword coverage and returns the same breakdown the LLM produces, plus
+    a confidence in [0, 1] the caller uses to decide whether to trust it.
+    """
+
+    def __init__(self, db_path=None):
+        """Initialize the scorer and its reference store"""
+        self.db_path = db_path or storage.data_path('reference_answers.db')
+        self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS reference_answers (
+                    text_hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    reference_answer TEXT NOT NULL,
+                    keywords TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS term_frequencies (
+                    term TEXT PRIMARY KEY,
+                    documents INTEGER NOT NULL
+                );
+            """)
+        finally:
+            conn.close()
+
+    @storage.blocking
+    def add_references(self, questions):
+        """Store the reference answer and keywords of generated questions.
+
+        Accepts the raw question dicts returned by the LLM; questions without
+        a reference answer, or already stored, are skipped. Returns how many
+        were added.
+        """
+        added = 0
+        conn = self._connect()
+        try:
+            for question in questions:
+                if not isinstance(question, dict):
+                    continue
+                text = str(question.get('text') or '').strip()
+                reference = str(question.get('referenceAnswer') or question.get('reference_answer') or '').strip()
+                keywords = question.get('keywords') or []
+                if not text or not reference:
+                    continue
+                if not isinstance(keywords, list):
+                    keywords = [keywords]
+                keywords = [str(keyword).strip() for keyword in keywords if str(keyword).strip()]
+
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    inserted = conn.execute(
+                        "INSERT OR IGNORE INTO reference_answers (text_hash, text, reference_answer, keywords, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (question_hash(text), text, reference, json.dumps(keywords), time.time())
+                    ).rowcount
+                    if inserted:
+                        conn.executemany(
+                            "INSERT INTO term_frequencies (term, documents) VALUES (?, 1) "
+                            "ON CONFLICT (term) DO UPDATE SET documents = documents + 1",
+                            [(term,) for term in set(tokenize(reference))]
+                        )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                added += inserted
+        finally:
+            conn.close()
+        return added
+
+    @storage.blocking
+    def reference(self, question_text):
+        """Return (reference answer, keywords) for a question, or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT reference_answer, keywords FROM reference_answers WHERE text_hash = ?",
+                (question_hash(question_text),)
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return row['reference_answer'], json.loads(row['keywords'])
+
+    @storage.blocking
+    def _idf(self, terms):
+        """Smoothed inverse document frequency of ``terms`` over all references"""
+        terms = list(terms)
+        conn = self._connect()
+        try:
+            total = conn.execute("SELECT COUNT(*) FROM reference_answers").fetchone()[0]
+            frequencies = {}
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(terms), 500):
+                chunk = terms[start:start + 500]
+                frequencies.update(conn.execute(
+                    f"SELECT term, documents FROM term_frequencies WHERE term IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+        finally:
+            conn.close()
+        return {term: math.log((1 + total) / (1 + frequencies.get(term, 0))) + 1 for term in terms}
+
+    @staticmethod
+    def _vector(tokens, idf):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        return {token: count * idf[token] for token, count in counts.items()}
+
+    @staticmethod
+    def _cosine(a, b):
+        dot = sum(weight * b.get(term, 0.0) for term, weight in a.items())
+        norm = math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values()))
+        return dot / norm if norm else 0.0
+
+    def score(self, question, answer):
+        """Score ``answer`` to ``question`` (a dict with 'text').
+
+        Returns the score response data with an added ``confidence``. Without
+        a stored reference the question text stands in for it, and the
+        confidence is capped low enough that only fallback use trusts it.
+        """
+        question_text = question.get('text', '') if isinstance(question, dict) else str(question or '')
+        stored = self.reference(question_text)
+        reference, keywords = stored if stored else (question_text, [])
+
+        answer_tokens = tokenize(answer)
+        reference_tokens = tokenize(reference)
+        question_tokens = set(tokenize(question_text))
+        idf = self._idf(set(answer_tokens) | set(reference_tokens) | question_tokens)
+        reference_vector = self._vector(reference_tokens, idf)
+
+        if not keywords:
+            # Use the most distinctive reference terms as keywords
+            keywords = sorted(reference_vector, key=reference_vector.get, reverse=True)[:DERIVED_KEYWORDS]
+        answer_terms = set(answer_tokens)
+        covered = [keyword for keyword in keywords if set(tokenize(keyword)) <= answer_terms and tokenize(keyword)]
+        missing = [keyword for keyword in keywords if keyword not in covered]
+        coverage = len(covered) / len(keywords) if keywords else 0.0
+
+        # Paraphrases of a reference rarely exceed ~0.5 cosine similarity
+        similarity = min(1.0, self._cosine(self._vector(answer_tokens, idf), reference_vector) / 0.5)
+        question_overlap = len(question_tokens & answer_terms) / len(question_tokens) if question_tokens else 0.0
+        words = len(str(answer or '').split())
+        length = min(1.0, words / 40)
+        sentences = len(_SENTENCE_END.findall(str(answer or '').strip() + ' ')) or 1
+        structure = min(1.0, sentences / 3 + 0.25 * len(REASONING_MARKERS & set(_WORD.findall(str(answer or '').lower()))))
+
+        detailed_scores = {
+            "technical_accuracy": round(20 * (0.6 * similarity + 0.4 * coverage)),
+            "problem_solving": round(20 * (0.5 * coverage + 0.5 * structure)),
+            "communication": round(20 * (0.5 * length + 0.5 * structure)),
+            "relevance": round(20 * (0.5 * similarity + 0.5 * max(question_overlap, coverage))),
+            "depth_of_knowledge": round(20 * (0.7 * coverage + 0.3 * length))
+        }
+        score = sum(detailed_scores.values())
+
+        # Trust the score when both signals agree and clearly point one way.
+        # Word overlap misses correct answers phrased differently, so a poor
+        # match counts as weaker evidence than a strong one.
+        quality = 0.5 * coverage + 0.5 * similarity
+        agreement = 1 - abs(coverage - similarity)
+        decisiveness = 0.5 + (quality - 0.5 if quality >= 0.5 else (0.5 - quality) / 2)
+        evidence = min(1.0, words / 20) * (1.0 if stored else 0.5) * (min(1.0, len(keywords) / 4) if keywords else 0.5)
+        confidence = round(agreement * decisiveness * evidence, 3)
+
+        return {
+            "success": True,
+            "score": score,
+            "feedback": self._feedback(score, covered, missing),
+            "detailed_scores": detailed_scores,
+            "strengths": [f"Covers {', '.join(covered[:4])}"] if covered else [],
+            "areas_for_improvement": [f"Does not address {', '.join(missing[:4])}"] if missing else [],
+            "suggestions": ["Explain the reasoning behind your answer and give a concrete example"] if structure < 1 else [],
+            "confidence": confidence
+        }
+
+    @staticmethod
+    def _feedback(score, covered, missing):
+        if score >= 80:
+            summary = "Strong answer that covers the key points of a model answer."
+        elif score >= 60:
+            summary = "Reasonable answer that covers some of the key points."
+        elif score >= 40:
+            summary = "Partial answer with significant gaps."
+        else:
+            summary = "The answer misses most of the key points expected for this question."
+        if missing:
+            summary += f" Key points not covered: {', '.join(missing[:4])}."
+        return summary + " (Scored automatically without AI review.)"
+
+    def stats(self):
+        """Return the number of stored reference answers"""
+        conn = self._connect()
+        try:
+            return {'references': conn.execute("SELECT COUNT(*) FROM reference_answers").fetchone()[0]}
+        finally:
+            conn.close()
@@ -0,0 +1,445 @@
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+import storage
+
+
+# Latency buckets in seconds, from cache hits up to slow OpenAI calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_registry = {}
+_directory = None
+_flush_interval = 1.0
+_dirty = False
+_flusher_pid = None
+_route_override = contextvars.ContextVar('metrics_route', default=None)
+
+
+class _Metric:
+    """A named metric with a fixed set of label names"""
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        with _lock:
+            _registry[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels.get(label, '')) for label in self.labelnames)
+
+    def _snapshot(self):
+        return [[list(key), list(value) if isinstance(value, list) else value] for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """A value that only goes up; summed across workers"""
+
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _changed()
+
+
+class Gauge(_Metric):
+    """A value that goes up and down; summed across live workers"""
+
+    type = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _changed()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = value
+        _changed()
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """Counts observations into cumulative buckets; summed across workers"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            # [per-bucket counts..., +Inf count, sum]
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            else:
+                entry[len(self.buckets)] += 1
+            entry[-1] += value
+        _changed()
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+# HTTP requests
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests served', ('namespace', 'route', 'method', 'status')
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to serve a request, until the last byte of streamed responses',
+    ('namespace', 'route', 'method')
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being served', ('namespace', 'route')
+)
+
+# OpenAI calls
+OPENAI_REQUEST_DURATION = Histogram(
+    'openai_request_duration_seconds', 'Time until OpenAI answered one request (response headers for streams)',
+    ('model', 'status')
+)
+OPENAI_REQUESTS_IN_FLIGHT = Gauge(
+    'openai_requests_in_flight', 'OpenAI requests currently waiting for a response'
+)
+OPENAI_TOKENS = Counter(
+    'openai_tokens_total', 'Tokens reported in the usage of OpenAI responses', ('route', 'model', 'type')
+)
+OPENAI_PROMPT_TOKENS_ESTIMATED = Counter(
+    'openai_prompt_tokens_estimated_total', 'Prompt tokens estimated before sending OpenAI requests that reported usage',
+    ('route', 'model')
+)
+
+# Caches
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total', 'Result cache lookups by outcome (memory_hit, disk_hit or miss)', ('cache', 'result')
+)
+
+# Resume parsing
+PARSE_DURATION = Histogram(
+    'resume_parse_duration_seconds', 'Time to parse one resume, including time queued for a parse process',
+    ('file_type', 'pages')
+)
+PARSE_FAILURES = Counter(
+    'resume_parse_failures_total', 'Resumes that failed to parse', ('file_type',)
+)
+
+
+def page_bucket(pages):
+    """Return the ``pages`` label for a page count (None when unknown, e.g. DOCX)"""
+    if pages is None:
+        return 'unknown'
+    if pages <= 2:
+        return str(pages)
+    if pages <= 5:
+        return '3-5'
+    if pages <= 10:
+        return '6-10'
+    return '11+'
+
+
+def current_route():
+    """Return the route template of the request being served, or 'background'"""
+    route = _route_override.get()
+    if route is not None:
+        return route
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    return 'background'
+
+
+@contextmanager
+def attributed_to(route):
+    """Attribute metrics recorded outside the request context (e.g. in pool threads) to ``route``"""
+    token = _route_override.set(route)
+    try:
+        yield
+    finally:
+        _route_override.reset(token)
+
+
+# Multi-process export: each process writes a snapshot of its metrics to
+# <directory>/<pid>.json and /metrics merges the snapshots of all processes
+
+def default_directory():
+    return os.getenv('METRICS_DIR') or os.path.join(storage.data_dir(), 'metrics')
+
+
+def configure(directory=None, flush_interval=None):
+    """Start writing this process's metrics to ``directory`` for aggregation"""
+    global _directory, _flush_interval
+    _directory = directory or default_directory()
+    _flush_interval = flush_interval if flush_interval is not None else float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+    os.makedirs(_directory, exist_ok=True)
+
+
+def _snapshot():
+    with _lock:
+        return {
+            name: {
+                'type': metric.type,
+                'help': metric.documentation,
+                'labelnames': list(metric.labelnames),
+                'buckets': list(getattr(metric, 'buckets', ())),
+                'samples': metric._snapshot()
+            }
+            for name, metric in _registry.items()
+        }
+
+
+def _write_json(path, data):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def flush():
+    """Write this process's snapshot now"""
+    global _dirty
+    if _directory is None:
+        return
+    with _flush_lock:
+        _dirty = False
+        _write_json(os.path.join(_directory, f"{os.getpid()}.json"), _snapshot())
+
+
+def _flush_periodically():
+    while True:
+        time.sleep(_flush_interval)
+        if _dirty:
+            flush()
+
+
+def _changed():
+    """Mark this process's snapshot stale, starting its flusher thread after a fork"""
+    global _dirty, _flusher_pid
+    _dirty = True
+    # Recording never writes files itself; a background thread per process
+    # rewrites the snapshot at most once per interval
+    if _directory is not None and _flusher_pid != os.getpid():
+        with _flush_lock:
+            if _flusher_pid != os.getpid():
+                _flusher_pid = os.getpid()
+                threading.Thread(target=_flush_periodically, name='metrics-flush', daemon=True).start()
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(into, snapshot, include_gauges=True):
+    """Add the samples of ``snapshot`` to ``into``"""
+    for name, metric in snapshot.items():
+        if metric['type'] == 'gauge' and not include_gauges:
+            continue
+        merged = into.setdefault(name, dict(metric, samples={}))
+        samples = merged['samples']
+        for labels, value in metric['samples']:
+            key = tuple(labels)
+            if key not in samples:
+                samples[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                samples[key] = [a + b for a, b in zip(samples[key], value)]
+            else:
+                samples[key] += value
+    return into
+
+
+def _to_snapshot(merged):
+    return {
+        name: dict(metric, samples=[[list(key), value] for key, value in metric['samples'].items()])
+        for name, metric in merged.items()
+    }
+
+
+def collect():
+    """Return metrics merged across every process writing to the directory"""
+    if _directory is None:
+        return _merge({}, _snapshot())
+
+    flush()
+    merged = {}
+    for filename in sorted(os.listdir(_directory)):
+        if not filename.endswith('.json'):
+            continue
+        snapshot = _read_json(os.path.join(_directory, filename))
+        if snapshot is None:
+            continue
+        pid = filename[:-len('.json')]
+        # Gauges of exited processes no longer describe anything in progress
+        include_gauges = pid.isdigit() and _pid_alive(int(pid))
+        _merge(merged, snapshot, include_gauges=include_gauges)
+    return merged
+
+
+def mark_process_dead(pid, directory=None):
+    """Fold the counters of an exited process into the archive snapshot.
+
+    Called by the gunicorn master when a worker exits, so snapshots of
+    recycled workers do not pile up while their counts are kept.
+    """
+    directory = directory or default_directory()
+    path = os.path.join(directory, f"{pid}.json")
+    snapshot = _read_json(path)
+    if snapshot is None:
+        return
+    archive_path = os.path.join(directory, 'archive.json')
+    merged = _merge({}, _read_json(archive_path) or {}, include_gauges=False)
+    _merge(merged, snapshot, include_gauges=False)
+    _write_json(archive_path, _to_snapshot(merged))
+    os.unlink(path)
+
+
+def reset_directory(directory=None):
+    """Remove the snapshots of a previous run; call once before workers start"""
+    directory = directory or default_directory()
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if filename.endswith('.json') or filename.endswith('.tmp'):
+            os.unlink(os.path.join(directory, filename))
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render():
+    """Return all metrics in the Prometheus text exposition format"""
+    lines = []
+    for name, metric in sorted(collect().items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric['labelnames']
+        for key, value in sorted(metric['samples'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'] + ['+Inf'], value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _format_value(float(bound))
+                lines.append(f"{name}_bucket{_format_labels(labelnames, key, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(value[-1])}")
+            lines.append(f"{name}_count{_format_labels(labelnames, key)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def _request_labels():
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    parts = route.split('/')
+    # /api/v1/<namespace>/... -> <namespace>
+    namespace = parts[3] if route.startswith('/api/') and len(parts) > 3 and parts[3] else 'root'
+    return namespace, route
+
+
+def init_request_metrics(app):
+    """Record duration, count and in-flight requests for every route of ``app``"""
+
+    def finish(state, status):
+        # May run after the request context is gone (streamed responses)
+        if state['finished']:
+            return
+        state['finished'] = True
+        HTTP_REQUESTS_IN_FLIGHT.dec(namespace=state['namespace'], route=state['route'])
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - state['started'],
+            namespace=state['namespace'], route=state['route'], method=state['method']
+        )
+        HTTP_REQUESTS.inc(namespace=state['namespace'], route=state['route'], method=state['method'], status=status)
+
+    @app.before_request
+    def start_request_metrics():
+        namespace, route = _request_labels()
+        g.request_metrics = {
+            'namespace': namespace,
+            'route': route,
+            'method': request.method,
+            'started': time.perf_counter(),
+            'finished': False
+        }
+        HTTP_REQUESTS_IN_FLIGHT.inc(namespace=namespace, route=route)
+
+    @app.after_request
+    def record_request_metrics(response):
+        state = g.get('request_metrics')
+        if state is not None:
+            status = response.status_code
+            if response.is_streamed:
+                # Streamed bodies are still being sent: finish once the response is closed
+                state['streamed'] = True
+                response.call_on_close(lambda: finish(state, status))
+            else:
+                finish(state, status)
+        return response
+
+    @app.teardown_request
+    def abandon_request_metrics(error):
+        # Requests that never produced a response still leave the in-flight gauge
+        state = g.get('request_metrics')
+        if state is not None and not state.get('streamed'):
+            finish(state, 500)
@@ -0,0 +1,307 @@
+import os
+import math
+import time
+import signal
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; limits are then not enforced
+    resource = None
+
+import metrics
+from resume_parser import ResumeParser
+
+
+class ParsePoolFull(Exception):
+    """Raised when the parse queue is full; retry after ``retry_after`` seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__("Resume parsing is at capacity, please retry shortly")
+        self.retry_after = retry_after
+
+
+class ParseLimitExceeded(Exception):
+    """Raised for a job that exceeded its CPU, time or memory limit"""
+    pass
+
+
+class ParseOutOfMemory(ParseLimitExceeded):
+    """Raised for a job that ran out of memory; the pool's processes are then replaced"""
+    pass
+
+
+class ParseTimeout(Exception):
+    """Raised when a parse job did not finish within the pool's timeout, including time queued"""
+    pass
+
+
+class _LimitSignal(BaseException):
+    """Raised by the limit signal handlers.
+
+    A BaseException so the parser's broad ``except Exception`` fallbacks
+    cannot swallow it and keep going past the limit.
+    """
+    pass
+
+
+# Parser instance owned by each pool process
+_worker_parser = None
+
+
+def _raise_cpu_limit(signum, frame):
+    raise _LimitSignal("Resume parsing exceeded its CPU time limit")
+
+
+def _raise_time_limit(signum, frame):
+    raise _LimitSignal("Resume parsing exceeded its time limit")
+
+
+def _init_worker(memory_limit_mb):
+    """Create the parser once per pool process and apply process-wide limits"""
+    global _worker_parser
+    _worker_parser = ResumeParser()
+
+    if resource is None:
+        return
+    if memory_limit_mb:
+        # Allocations past the cap raise MemoryError in the job instead of
+        # letting one document push the host into swap
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_mb * 1024 * 1024, hard))
+    signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+    signal.signal(signal.SIGALRM, _raise_time_limit)
+
+
+def _parse_in_worker(source, contacts_only, file_ext, cpu_limit, time_limit):
+    """Parse a resume inside a pool process under per-job CPU and time limits"""
+    if resource is None:
+        return _worker_parser.parse_resume(source, contacts_only=contacts_only, file_ext=file_ext)
+
+    # RLIMIT_CPU counts the whole process lifetime, so allow this job
+    # ``cpu_limit`` seconds on top of what earlier jobs already used
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    job_soft = int(usage.ru_utime + usage.ru_stime + cpu_limit) + 1
+    if hard != resource.RLIM_INFINITY:
+        job_soft = min(job_soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (job_soft, hard))
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+    try:
+        return _worker_parser.parse_resume(source, contacts_only=contacts_only, file_ext=file_ext)
+    except _LimitSignal as e:
+        raise ParseLimitExceeded(str(e)) from None
+    except MemoryError:
+        # Raised once the job hits the process's address space cap
+        pass
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    # Raised outside the handler so the failed job's objects are freed first;
+    # otherwise sending the error back to the caller can run out of memory too
+    raise ParseOutOfMemory("Resume parsing exceeded its memory limit")
+
+
+def _observe_parse(future, file_ext, seconds):
+    """Record the duration of a finished parse job, labelled by file type and page count"""
+    file_type = (file_ext or 'unknown').lstrip('.')
+    if future.cancelled() or future.exception() is not None:
+        metrics.PARSE_FAILURES.inc(file_type=file_type)
+        return
+    pages = future.result().get('pages')
+    metrics.PARSE_DURATION.observe(
+        seconds, file_type=file_type, pages=metrics.page_bucket(len(pages) if pages is not None else None)
+    )
+
+
+class ParsePool:
+    """Runs CPU-bound resume parsing in separate processes.
+
+    pdfplumber extraction holds the GIL, so running it inside a request
+    worker would stall every other request served by that worker. Each job
+    runs under a CPU time limit and a wall-clock limit, pool processes have
+    a memory cap and are replaced after ``max_jobs_per_worker`` jobs, and at
+    most ``max_queue`` jobs wait for a free process; beyond that ``submit``
+    raises ParsePoolFull instead of queueing. With ``max_workers`` set to 0
+    parsing runs inline in the calling process without any of these limits.
+    """
+
+    def __init__(self, max_workers=None, timeout=None, max_queue=None, max_jobs_per_worker=None,
+                 cpu_limit=None, time_limit=None, memory_limit_mb=None):
+        """Initialize the pool from arguments or environment variables"""
+        self.max_workers = max_workers if max_workers is not None else int(os.getenv('PARSE_POOL_WORKERS', 2))
+        self.timeout = timeout or float(os.getenv('PARSE_TIMEOUT', 60))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv('PARSE_QUEUE_SIZE', self.max_workers * 4))
+        self.max_jobs_per_worker = max_jobs_per_worker or int(os.getenv('PARSE_MAX_JOBS_PER_WORKER', 100))
+        self.cpu_limit = cpu_limit or int(os.getenv('PARSE_CPU_LIMIT', 20))
+        self.time_limit = time_limit or float(os.getenv('PARSE_TIME_LIMIT', 30))
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else int(os.getenv('PARSE_MEMORY_LIMIT_MB', 1024))
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._avg_seconds = None
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'limit_exceeded': 0,
+            'pool_restarts': 0
+        }
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _get_executor(self):
+        """Return the executor for this process, creating it after a fork"""
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    # spawn keeps pool processes independent of the (possibly
+                    # monkey-patched) gunicorn worker they were started from
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker,
+                        initargs=(self.memory_limit_mb,),
+                        max_tasks_per_child=self.max_jobs_per_worker
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def _replace_broken_executor(self, executor):
+        """Drop an executor whose process died (e.g. killed by the OS) so the next job gets a fresh one"""
+        self._replace_executor(executor, cancel_futures=True)
+
+    def _replace_executor(self, executor, cancel_futures=False):
+        """Send new jobs to a fresh executor; ``executor`` finishes the jobs it has unless they are cancelled"""
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=cancel_futures)
+                self._executor = None
+                self._stats['pool_restarts'] += 1
+
+    def retry_after(self):
+        """Estimate how many seconds it takes for the current queue to drain"""
+        with self._lock:
+            pending = self._pending
+            avg_seconds = self._avg_seconds or 1.0
+        return max(1, math.ceil(pending / max(self.max_workers, 1) * avg_seconds))
+
+    def submit(self, source, parser, contacts_only=False, file_ext=None):
+        """Start parsing a resume and return a Future for the result.
+
+        ``source`` is a file path or the document bytes; see
+        ``ResumeParser.parse_resume``. When the pool is disabled the resume
+        is parsed inline with ``parser`` and the Future is already done.
+        Raises ParsePoolFull when the queue is full.
+        """
+        if not self.enabled:
+            future = Future()
+            started = time.perf_counter()
+            try:
+                future.set_result(parser.parse_resume(source, contacts_only=contacts_only, file_ext=file_ext))
+            except Exception as e:
+                future.set_exception(e)
+            _observe_parse(future, file_ext, time.perf_counter() - started)
+            return future
+
+        with self._lock:
+            full = self._pending >= self.max_workers + self.max_queue
+            if full:
+                self._stats['rejected'] += 1
+            else:
+                self._pending += 1
+                self._stats['submitted'] += 1
+        if full:
+            raise ParsePoolFull(self.retry_after())
+
+        if isinstance(source, memoryview):
+            # Jobs are pickled to the pool processes; memoryviews cannot be
+            source = source.tobytes()
+        args = (_parse_in_worker, source, contacts_only, file_ext, self.cpu_limit, self.time_limit)
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(*args)
+            except BrokenProcessPool:
+                self._replace_broken_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(*args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+
+        started = time.perf_counter()
+        future.add_done_callback(lambda f: self._job_done(f, executor, file_ext, time.perf_counter() - started))
+        return future
+
+    def _job_done(self, future, executor, file_ext, seconds):
+        _observe_parse(future, file_ext, seconds)
+        error = None if future.cancelled() else future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._replace_broken_executor(executor)
+        elif isinstance(error, ParseOutOfMemory):
+            # The heap of a process that hit its address space cap stays
+            # mapped, so it would fail the next jobs too
+            self._replace_executor(executor)
+        with self._lock:
+            self._pending -= 1
+            if error is None and not future.cancelled():
+                self._stats['completed'] += 1
+                # Smoothed job duration (including queue time) for Retry-After
+                self._avg_seconds = seconds if self._avg_seconds is None else 0.8 * self._avg_seconds + 0.2 * seconds
+            else:
+                self._stats['failed'] += 1
+                if isinstance(error, (ParseLimitExceeded, MemoryError)):
+                    self._stats['limit_exceeded'] += 1
+
+    def parse(self, source, parser, contacts_only=False, file_ext=None):
+        """Parse a resume, in the pool when enabled or inline with ``parser`` otherwise.
+
+        Raises ParseTimeout when the result is not there within ``timeout``
+        seconds, and ParseLimitExceeded when the job hit a limit or its
+        process died.
+        """
+        future = self.submit(source, parser, contacts_only=contacts_only, file_ext=file_ext)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # A job already running is stopped by its own time limit
+            future.cancel()
+            raise ParseTimeout(f"Resume parsing did not finish within {self.timeout:g} seconds") from None
+        except BrokenProcessPool:
+            # Usually the OS killing a process that ran out of memory
+            raise ParseLimitExceeded("Resume parsing stopped: the parsing process ran out of memory or was killed") from None
+
+    def stats(self):
+        """Return queue depth, job counters and configured limits"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._pending
+            stats['avg_seconds'] = round(self._avg_seconds, 3) if self._avg_seconds is not None else None
+        stats.update({
+            'workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'max_jobs_per_worker': self.max_jobs_per_worker,
+            'cpu_limit': self.cpu_limit,
+            'time_limit': self.time_limit,
+            'memory_limit_mb': self.memory_limit_mb
+        })
+        return stats
+
+    def shutdown(self):
+        """Stop the pool processes owned by this process"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
@@ -0,0 +1,175 @@
+import os
+import math
+import textwrap
+
+
+# Rough size of English text and JSON in GPT tokens
+CHARS_PER_TOKEN = 4
+
+# Tokens of framing OpenAI adds per chat message, and to prime the reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+# Longest candidate answer sent for scoring; longer answers keep their start and end
+SCORE_ANSWER_MAX_TOKENS = int(os.getenv('SCORE_ANSWER_MAX_TOKENS', 1000))
+
+# Longest single answer quoted in a summary prompt
+SUMMARY_ANSWER_MAX_TOKENS = int(os.getenv('SUMMARY_ANSWER_MAX_TOKENS', 250))
+
+
+def compact(template):
+    """De-indent a prompt template, strip trailing spaces and collapse blank lines"""
+    lines = [line.rstrip() for line in textwrap.dedent(template).strip('\n').splitlines()]
+    compacted = []
+    for line in lines:
+        if line or (compacted and compacted[-1]):
+            compacted.append(line)
+    return '\n'.join(compacted).strip()
+
+
+def estimate_tokens(text):
+    """Estimate the tokens in ``text``"""
+    return math.ceil(len(text or '') / CHARS_PER_TOKEN)
+
+
+def estimate_message_tokens(messages):
+    """Estimate the prompt tokens of a list of chat messages"""
+    return sum(estimate_tokens(message.get('content')) + MESSAGE_OVERHEAD_TOKENS for message in messages) + REPLY_OVERHEAD_TOKENS
+
+
+def truncate_to_budget(text, max_tokens):
+    """Shorten ``text`` to about ``max_tokens``, keeping its start and end.
+
+    Returns (text, whether it was truncated). The cut is marked in the text so
+    the model knows part of the answer is missing.
+    """
+    text = text or ''
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+
+    budget = max(0, max_tokens * CHARS_PER_TOKEN - 40)
+    head = text[:budget * 2 // 3]
+    tail = text[len(text) - budget // 3:] if budget // 3 else ''
+    # Cut on whitespace so no word is split in half
+    if ' ' in head:
+        head = head[:head.rindex(' ')]
+    if ' ' in tail:
+        tail = tail[tail.index(' ') + 1:]
+    omitted = len(text) - len(head) - len(tail)
+    return f"{head} [... {omitted} characters omitted ...] {tail}".strip(), True
+
+
+QUESTION_SYSTEM_PROMPT = (
+    "You are an AI assistant that helps conduct technical interviews for full-stack developers. "
+    "Provide clear, concise, and helpful responses."
+)
+
+QUESTION_PROMPT = compact("""
+    Generate 6 technical interview questions for a full-stack developer position (React/Node.js).
+    Create 2 easy, 2 medium, and 2 hard questions.
+    Each question should be practical and relevant to real-world development.
+    For each question also give a model answer of 2-3 sentences and 3-6 short keywords a good answer mentions.
+    Return the questions in JSON format with the following structure:
+    [{"id": "1", "text": "Question text here", "difficulty": "easy|medium|hard", "timeLimit": 20|60|120, "category": "Frontend|Backend|System Design|Database|DevOps", "referenceAnswer": "Model answer here", "keywords": ["keyword", "keyword"]}]
+""")
+
+# Static rubric, sent as the system message so it is identical on every call
+SCORE_SYSTEM_PROMPT = compact("""
+    You are an expert technical interviewer evaluating a candidate's answer for a full-stack developer position. Evaluate answers objectively and provide constructive feedback.
+
+    Score the answer on five criteria, each worth 20 points (total 100):
+    1. technical_accuracy: correctness of technical concepts, understanding of the technology, accuracy of implementation details
+    2. problem_solving: logical step-by-step reasoning, consideration of edge cases, alternative solutions mentioned
+    3. communication: clear, well-structured explanation, appropriate technical terminology, complex ideas explained simply
+    4. relevance: directly addresses the question, stays on topic, relevant examples, understanding of the context
+    5. depth_of_knowledge: deep understanding, practical experience, best practices, awareness of industry standards
+
+    Overall score guide:
+    90-100 exceptional: mastery, excellent examples, deep understanding
+    80-89 good: solid understanding, good examples, minor gaps
+    70-79 satisfactory: basic understanding, some good points, room for improvement
+    60-69 below average: limited understanding, some correct points, significant gaps
+    40-59 poor: minimal understanding, many incorrect points
+    0-39 very poor: little to no understanding, mostly incorrect
+
+    If the answer was shortened, "[... N characters omitted ...]" marks the cut; do not penalize the omission itself.
+
+    Return your evaluation in this exact JSON format:
+    {"score": 85, "feedback": "Detailed feedback explaining the score and areas for improvement", "technical_accuracy": 18, "problem_solving": 17, "communication": 16, "relevance": 19, "depth_of_knowledge": 15, "strengths": ["Specific strengths shown in the answer"], "areas_for_improvement": ["Specific areas that need improvement"], "suggestions": ["Specific suggestions for improvement"]}
+""")
+
+SCORE_PROMPT = compact("""
+    Question: {text}
+    Difficulty: {difficulty}
+    Category: {category}
+
+    Candidate's answer:
+    {answer}
+""")
+
+SUMMARY_SYSTEM_PROMPT = "You are an expert HR professional. Generate professional, objective candidate summaries."
+
+SUMMARY_PROMPT = compact("""
+    Generate a professional summary for this candidate based on their interview performance.
+
+    Candidate: {name}
+    Email: {email}
+    Questions answered: {answered}/{asked}
+    Overall score: {final_score}%
+
+    Interview responses:
+    {responses}
+
+    Provide a concise, professional summary (2-3 sentences) highlighting technical strengths, areas for improvement and an overall assessment.
+""")
+
+
+def build_question_messages():
+    """Return the chat messages that request one interview question set"""
+    return [
+        {"role": "system", "content": QUESTION_SYSTEM_PROMPT},
+        {"role": "user", "content": QUESTION_PROMPT}
+    ]
+
+
+def build_score_messages(question, answer, max_answer_tokens=None):
+    """Return (chat messages that score ``answer``, whether the answer was truncated)"""
+    answer, truncated = truncate_to_budget(
+        str(answer or '').strip(), SCORE_ANSWER_MAX_TOKENS if max_answer_tokens is None else max_answer_tokens
+    )
+    prompt = SCORE_PROMPT.format(
+        text=question.get('text', ''),
+        difficulty=question.get('difficulty', ''),
+        category=question.get('category', ''),
+        answer=answer
+    )
+    return [
+        {"role": "system", "content": SCORE_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ], truncated
+
+
+def build_summary_messages(candidate):
+    """Return the chat messages that request a candidate summary"""
+    answers = candidate.get('answers', [])
+    questions = candidate.get('questions', [])
+
+    responses = []
+    for i, answer in enumerate(answers):
+        # Questions may be missing or shorter than the answer list
+        question_text = questions[i].get('text', f'Question {i+1}') if i < len(questions) else f'Question {i+1}'
+        answer_text, _ = truncate_to_budget(str(answer.get('answer', '')).strip(), SUMMARY_ANSWER_MAX_TOKENS)
+        responses.append(f"Q{i+1}: {question_text}\nA{i+1}: {answer_text}\nScore: {answer.get('score', 0)}%")
+
+    prompt = SUMMARY_PROMPT.format(
+        name=candidate.get('name', 'Unknown'),
+        email=candidate.get('email', 'Unknown'),
+        answered=len(answers),
+        asked=len(questions),
+        final_score=candidate.get('finalScore', 'Not calculated'),
+        responses='\n\n'.join(responses)
+    )
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
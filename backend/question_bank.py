@@ -0,0 +1,334 @@
+import os
+import time
+import random
+import hashlib
+import logging
+import threading
+
+import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+CATEGORIES = ('Frontend', 'Backend', 'System Design', 'Database', 'DevOps')
+
+# Questions per difficulty in one interview set (2 easy, 2 medium, 2 hard)
+PER_DIFFICULTY = 2
+
+
+class QuestionBank:
+    """Local store of pre-generated, validated interview questions.
+
+    Questions are indexed by difficulty and category in a SQLite database
+    shared by all workers. ``take_set`` hands out a set of questions that
+    have never been served before, and ``refill_if_low`` tops the bank up
+    in a background thread using ``generator``, a callable returning a list
+    of raw question dicts (the same shape the LLM returns). Refills are
+    skipped while ``can_refill`` returns False (e.g. no API key), and a
+    refill that adds nothing keeps every worker from retrying for
+    ``refill_backoff`` seconds. The worker refilling holds a lease of
+    ``refill_lease`` seconds that it renews before every generator call, so
+    the lease only runs out if that worker dies or one call hangs. Served questions are kept for
+    ``served_retention`` seconds so regenerated duplicates are still
+    recognized, then deleted.
+    """
+
+    def __init__(self, generator, db_path=None, low_watermark=None, target=None, max_refill_calls=None,
+                 can_refill=None, refill_backoff=None, refill_lease=None, served_retention=None):
+        """Initialize the bank from arguments or environment variables"""
+        self.generator = generator
+        self.can_refill = can_refill or (lambda: True)
+        self.db_path = db_path or storage.data_path('question_bank.db')
+        self.low_watermark = low_watermark or int(os.getenv('QUESTION_BANK_LOW_WATERMARK', 4))
+        self.target = target or int(os.getenv('QUESTION_BANK_TARGET', 20))
+        self.max_refill_calls = max_refill_calls or int(os.getenv('QUESTION_BANK_MAX_REFILL_CALLS', 15))
+        self.refill_backoff = refill_backoff or float(os.getenv('QUESTION_BANK_REFILL_BACKOFF', 300))
+        self.refill_lease = refill_lease or float(os.getenv('QUESTION_BANK_REFILL_LEASE', 300))
+        self.served_retention = served_retention or float(os.getenv('QUESTION_BANK_SERVED_RETENTION', 7 * 86400))
+        self.enabled = os.getenv('QUESTION_BANK_ENABLED', 'true').lower() == 'true'
+
+        self._refill_thread = None
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS questions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text_hash TEXT NOT NULL UNIQUE,
+                    text TEXT NOT NULL,
+                    difficulty TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    served_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_questions_stock
+                    ON questions (difficulty, served_at, category);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL
+                );
+            """)
+        finally:
+            conn.close()
+
+    @staticmethod
+    def validate(question):
+        """Return a cleaned question dict, or None if it is not usable"""
+        if not isinstance(question, dict):
+            return None
+
+        text = str(question.get('text', '')).strip()
+        difficulty = str(question.get('difficulty', '')).strip().lower()
+        category = str(question.get('category', '')).strip()
+
+        if len(text) < 15 or len(text) > 500:
+            return None
+        if difficulty not in DIFFICULTIES:
+            return None
+
+        # Normalize category casing, falling back to the endpoint's default
+        matches = [c for c in CATEGORIES if c.lower() == category.lower()]
+        category = matches[0] if matches else 'Frontend'
+
+        return {'text': text, 'difficulty': difficulty, 'category': category}
+
+    @staticmethod
+    def _text_hash(text):
+        normalized = ' '.join(text.lower().split())
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def add(self, questions):
+        """Validate and store questions, returning how many were added"""
+        rows = []
+        for question in questions:
+            cleaned = self.validate(question)
+            if cleaned:
+                rows.append((
+                    self._text_hash(cleaned['text']),
+                    cleaned['text'],
+                    cleaned['difficulty'],
+                    cleaned['category'],
+                    time.time()
+                ))
+
+        conn = self._connect()
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO questions (text_hash, text, difficulty, category, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            return conn.total_changes - before
+        finally:
+            conn.close()
+
+    def stock(self):
+        """Return the number of unserved questions per difficulty"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT difficulty, COUNT(*) AS n FROM questions WHERE served_at IS NULL GROUP BY difficulty"
+            ).fetchall()
+        finally:
+            conn.close()
+        counts = {d: 0 for d in DIFFICULTIES}
+        counts.update({row['difficulty']: row['n'] for row in rows})
+        return counts
+
+    def take_set(self):
+        """Atomically take one interview set of unserved questions.
+
+        Returns None when the bank cannot supply a full set.
+        """
+        if not self.enabled:
+            return None
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            selected = []
+            for difficulty in DIFFICULTIES:
+                candidates = conn.execute(
+                    "SELECT id, text, difficulty, category FROM questions "
+                    "WHERE difficulty = ? AND served_at IS NULL ORDER BY RANDOM() LIMIT 20",
+                    (difficulty,)
+                ).fetchall()
+                picked = self._pick_varied(candidates, PER_DIFFICULTY)
+                if len(picked) < PER_DIFFICULTY:
+                    conn.execute('ROLLBACK')
+                    return None
+                selected.extend(picked)
+
+            now = time.time()
+            conn.executemany(
+                "UPDATE questions SET served_at = ? WHERE id = ?",
+                [(now, row['id']) for row in selected]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        return [
+            {'text': row['text'], 'difficulty': row['difficulty'], 'category': row['category']}
+            for row in selected
+        ]
+
+    @staticmethod
+    def _pick_varied(rows, count):
+        """Pick ``count`` rows, preferring distinct categories"""
+        picked = []
+        seen_categories = set()
+        for row in rows:
+            if row['category'] not in seen_categories:
+                picked.append(row)
+                seen_categories.add(row['category'])
+            if len(picked) == count:
+                return picked
+        for row in rows:
+            if row not in picked:
+                picked.append(row)
+            if len(picked) == count:
+                break
+        return picked
+
+    def is_low(self):
+        return min(self.stock().values()) < self.low_watermark
+
+    def refill_if_low(self):
+        """Start a background refill if stock is below the low watermark"""
+        if not self.enabled or not self.can_refill() or not self.is_low():
+            return False
+
+        with self._lock:
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return False
+            self._refill_thread = threading.Thread(target=self.refill, name='question-bank-refill', daemon=True)
+            self._refill_thread.start()
+        return True
+
+    def _acquire_lease(self, seconds):
+        """Take the cross-worker refill lease so only one worker refills at a time.
+
+        Returns the lease expiry, or None if another worker holds the lease.
+        """
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute("SELECT value FROM meta WHERE key = 'refill_lease'").fetchone()
+            now = time.time()
+            if row and row['value'] > now:
+                conn.execute('ROLLBACK')
+                return None
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('refill_lease', ?)",
+                (now + seconds,)
+            )
+            conn.execute('COMMIT')
+            return now + seconds
+        finally:
+            conn.close()
+
+    def _renew_lease(self, expires_at, seconds):
+        """Extend the lease taken with expiry ``expires_at``.
+
+        Returns the new expiry, or None if the lease ran out and was taken
+        over in the meantime.
+        """
+        renewed = time.time() + seconds
+        conn = self._connect()
+        try:
+            changed = conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'refill_lease' AND value = ?",
+                (renewed, expires_at)
+            ).rowcount
+        finally:
+            conn.close()
+        return renewed if changed else None
+
+    def _release_lease(self, expires_at, hold=0):
+        """Release the lease taken with expiry ``expires_at``, or keep it for ``hold`` more seconds to back off.
+
+        A lease that was taken over in the meantime is left alone.
+        """
+        conn = self._connect()
+        try:
+            if hold > 0:
+                conn.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'refill_lease' AND value = ?",
+                    (time.time() + hold, expires_at)
+                )
+            else:
+                conn.execute("DELETE FROM meta WHERE key = 'refill_lease' AND value = ?", (expires_at,))
+        finally:
+            conn.close()
+
+    def prune_served(self):
+        """Delete questions served longer than ``served_retention`` ago; returns how many"""
+        conn = self._connect()
+        try:
+            before = conn.total_changes
+            conn.execute(
+                "DELETE FROM questions WHERE served_at IS NOT NULL AND served_at < ?",
+                (time.time() - self.served_retention,)
+            )
+            return conn.total_changes - before
+        finally:
+            conn.close()
+
+    def refill(self):
+        """Generate questions until every difficulty reaches the target stock"""
+        lease = self._acquire_lease(self.refill_lease)
+        if lease is None:
+            return 0
+
+        added = 0
+        failures = 0
+        try:
+            self.prune_served()
+            for _ in range(self.max_refill_calls):
+                if min(self.stock().values()) >= self.target:
+                    break
+                renewed = self._renew_lease(lease, self.refill_lease)
+                if renewed is None:
+                    logger.warning("Question bank refill lease was lost, stopping the refill")
+                    break
+                lease = renewed
+                try:
+                    added += self.add(self.generator())
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    logger.warning("Question bank refill call failed: %s", e)
+                    if failures >= 3:
+                        break
+                    # Back off a little before retrying the upstream
+                    time.sleep(random.uniform(1, 3))
+        finally:
+            # A refill that got nothing keeps the lease, so no worker retries it straight away
+            self._release_lease(lease, hold=self.refill_backoff if failures and not added else 0)
+
+        logger.info("Question bank refilled", extra={'added': added})
+        return added
+
+    def stats(self):
+        """Return stock levels and configuration"""
+        return {
+            'enabled': self.enabled,
+            'stock': self.stock(),
+            'low_watermark': self.low_watermark,
+            'target': self.target,
+            'refilling': self._refill_thread is not None and self._refill_thread.is_alive()
+        }
@@ -0,0 +1,291 @@
+import os
+import math
+import time
+import random
+import threading
+
+import storage
+
+
+# Lower numbers are served first when callers wait for quota
+PRIORITY_INTERACTIVE = 0
+PRIORITY_QUESTIONS = 1
+PRIORITY_SUMMARY = 2
+PRIORITY_BACKGROUND = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_QUESTIONS: 'questions',
+    PRIORITY_SUMMARY: 'summary',
+    PRIORITY_BACKGROUND: 'background'
+}
+
+
+class RateLimitTimeout(Exception):
+    """Raised when quota will not be available within the caller's budget"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limit quota exhausted, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests and tokens per minute, shared by all workers.
+
+    Both buckets live in a SQLite database, so every gunicorn worker on the
+    host draws from the same quota. Each bucket holds at most one minute of
+    quota and refills continuously. Callers that cannot be served at once
+    join a shared queue ordered by priority, then by the tokens they need,
+    then by arrival; only the head of the queue may take quota, so
+    interactive calls overtake queued summary and background calls, and a
+    large call waiting for the bucket to refill does not hold up smaller
+    calls of the same priority. A large call that keeps being overtaken
+    gives up after ``max_wait`` like any other. A limit of 0 disables that
+    bucket.
+    """
+
+    def __init__(self, db_path=None, requests_per_minute=None, tokens_per_minute=None,
+                 max_wait=None, poll_interval=0.05):
+        """Initialize the limiter from arguments or environment variables"""
+        self.db_path = db_path or storage.data_path('rate_limiter.db')
+        self.requests_per_minute = requests_per_minute if requests_per_minute is not None else int(os.getenv('LLM_RATE_LIMIT_RPM', 3500))
+        self.tokens_per_minute = tokens_per_minute if tokens_per_minute is not None else int(os.getenv('LLM_RATE_LIMIT_TPM', 200000))
+        self.max_wait = max_wait or float(os.getenv('LLM_RATE_LIMIT_MAX_WAIT', 30))
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._stats = {
+            'acquired': 0,
+            'waited': 0,
+            'rejected': 0,
+            'wait_seconds_total': 0.0,
+            'wait_seconds_max': 0.0
+        }
+        if self.enabled:
+            self._init_db()
+
+    @property
+    def enabled(self):
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(rate_waiters)")}
+            if columns and 'tokens' not in columns:
+                # Waiters only live for one call, so the old queue is simply replaced
+                conn.execute("DROP TABLE rate_waiters")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    name TEXT PRIMARY KEY,
+                    level REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS rate_waiters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    priority INTEGER NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                DROP INDEX IF EXISTS idx_rate_waiters_order;
+                CREATE INDEX IF NOT EXISTS idx_rate_waiters_queue
+                    ON rate_waiters (priority, tokens, id);
+            """)
+        finally:
+            conn.close()
+
+    def _capacities(self):
+        return {'requests': self.requests_per_minute, 'tokens': self.tokens_per_minute}
+
+    def _load_levels(self, conn, now):
+        """Return the current bucket levels, refilled for the time elapsed"""
+        rows = {row['name']: row for row in conn.execute("SELECT name, level, updated_at FROM rate_buckets")}
+        levels = {}
+        for name, capacity in self._capacities().items():
+            if capacity <= 0:
+                continue
+            row = rows.get(name)
+            if row is None:
+                levels[name] = float(capacity)
+            else:
+                levels[name] = min(float(capacity), row['level'] + (now - row['updated_at']) * capacity / 60.0)
+        return levels
+
+    def _store_levels(self, conn, levels, now):
+        conn.executemany(
+            "INSERT OR REPLACE INTO rate_buckets (name, level, updated_at) VALUES (?, ?, ?)",
+            [(name, level, now) for name, level in levels.items()]
+        )
+
+    def _seconds_until(self, levels, needed):
+        """Return how long until every bucket holds what ``needed`` asks for"""
+        wait = 0.0
+        for name, level in levels.items():
+            if level < needed[name]:
+                wait = max(wait, (needed[name] - level) * 60.0 / self._capacities()[name])
+        return wait
+
+    @storage.blocking
+    def _try_acquire(self, needed, priority, waiter_id):
+        """Take quota if this caller may; otherwise join (or stay in) the queue.
+
+        Returns (seconds to wait before trying again, waiter id); 0 seconds
+        means the quota was taken.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Waiters whose process died stop blocking the queue once expired
+            conn.execute("DELETE FROM rate_waiters WHERE expires_at < ?", (now,))
+            head = conn.execute(
+                "SELECT id, priority, tokens FROM rate_waiters ORDER BY priority, tokens, id LIMIT 1"
+            ).fetchone()
+            levels = self._load_levels(conn, now)
+            wait = self._seconds_until(levels, needed)
+
+            if waiter_id is None:
+                # A new caller goes first if it would sort ahead of every waiter
+                is_head = head is None or (priority, needed['tokens']) < (head['priority'], head['tokens'])
+            else:
+                is_head = head['id'] == waiter_id
+            if is_head and wait == 0:
+                for name in levels:
+                    levels[name] -= needed[name]
+                self._store_levels(conn, levels, now)
+                if waiter_id is not None:
+                    conn.execute("DELETE FROM rate_waiters WHERE id = ?", (waiter_id,))
+                conn.execute('COMMIT')
+                return 0.0, None
+
+            expires_at = now + self.max_wait + 5
+            if waiter_id is None:
+                waiter_id = conn.execute(
+                    "INSERT INTO rate_waiters (priority, tokens, expires_at) VALUES (?, ?, ?)",
+                    (priority, needed['tokens'], expires_at)
+                ).lastrowid
+            else:
+                conn.execute("UPDATE rate_waiters SET expires_at = ? WHERE id = ?", (expires_at, waiter_id))
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        # Someone is ahead: poll until it is our turn
+        return (wait if is_head else self.poll_interval), waiter_id
+
+    @storage.blocking
+    def _remove_waiter(self, waiter_id):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM rate_waiters WHERE id = ?", (waiter_id,))
+        finally:
+            conn.close()
+
+    def acquire(self, tokens, priority=PRIORITY_INTERACTIVE, deadline=None, block=True):
+        """Take one request and ``tokens`` tokens of quota, waiting in line if needed.
+
+        Returns the seconds spent waiting. Raises RateLimitTimeout when the
+        quota would not be available within ``max_wait`` or the remaining
+        time of ``deadline`` (a resilience.Deadline), or at once with
+        ``block=False`` if the quota cannot be taken right away.
+        """
+        if not self.enabled:
+            return 0.0
+
+        # A single call can never need more than a full bucket
+        needed = {
+            'requests': min(1, self.requests_per_minute),
+            'tokens': min(tokens, self.tokens_per_minute)
+        }
+        started = time.monotonic()
+        waiter_id = None
+        slept = False
+        try:
+            while True:
+                wait, waiter_id = self._try_acquire(needed, priority, waiter_id)
+                waited = time.monotonic() - started
+                if wait == 0:
+                    # Only calls that had to sleep count as waiting
+                    waited = waited if slept else 0.0
+                    self._record(waited)
+                    return waited
+
+                budget = self.max_wait - waited
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining is not None:
+                    budget = min(budget, remaining)
+                if wait > budget or not block:
+                    with self._lock:
+                        self._stats['rejected'] += 1
+                    raise RateLimitTimeout(retry_after=max(1, math.ceil(wait)))
+                # Jitter keeps waiting workers from polling in lockstep
+                time.sleep(min(wait, max(self.poll_interval, 0.25)) * random.uniform(0.8, 1.2))
+                slept = True
+        finally:
+            if waiter_id is not None:
+                self._remove_waiter(waiter_id)
+
+    @storage.blocking
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the real usage of a call is known"""
+        if self.tokens_per_minute <= 0 or actual_tokens is None:
+            return
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            levels = self._load_levels(conn, now)
+            levels['tokens'] = min(float(self.tokens_per_minute), levels['tokens'] + estimated_tokens - actual_tokens)
+            self._store_levels(conn, levels, now)
+            conn.execute('COMMIT')
+        except Exception:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _record(self, waited):
+        with self._lock:
+            self._stats['acquired'] += 1
+            if waited > 0:
+                self._stats['waited'] += 1
+                self._stats['wait_seconds_total'] += waited
+                self._stats['wait_seconds_max'] = max(self._stats['wait_seconds_max'], waited)
+
+    def stats(self):
+        """Return wait counters for this worker plus shared queue depth and bucket levels"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['wait_seconds_avg'] = round(stats['wait_seconds_total'] / stats['waited'], 4) if stats['waited'] else 0.0
+        stats['wait_seconds_total'] = round(stats['wait_seconds_total'], 4)
+        stats['wait_seconds_max'] = round(stats['wait_seconds_max'], 4)
+        stats.update({
+            'enabled': self.enabled,
+            'requests_per_minute': self.requests_per_minute,
+            'tokens_per_minute': self.tokens_per_minute,
+            'queue_depth': {name: 0 for name in PRIORITY_NAMES.values()},
+            'available': {}
+        })
+
+        if self.enabled:
+            now = time.time()
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT priority, COUNT(*) AS n FROM rate_waiters WHERE expires_at >= ? GROUP BY priority", (now,)
+                ).fetchall()
+                levels = self._load_levels(conn, now)
+            finally:
+                conn.close()
+            for row in rows:
+                stats['queue_depth'][PRIORITY_NAMES.get(row['priority'], str(row['priority']))] = row['n']
+            stats['available'] = {name: int(level) for name, level in levels.items()}
+        return stats
@@ -1,194 +1,234 @@
+import io
 import os
-import re
+import time
+import logging
 import PyPDF2
 import pdfplumber
 from docx import Document
-from email_validator import validate_email, EmailNotValidError
+from contact_extractor import ContactExtractor
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extraction output changes so cached parse results are discarded
+PARSER_VERSION = '2'
+
+# Paragraphs read between early-exit checks in contacts-only DOCX parsing
+DOCX_STOP_CHECK_INTERVAL = 10
+
+# Leading bytes used to detect the type of in-memory documents
+FILE_SIGNATURES = ((b'%PDF', '.pdf'), (b'PK\x03\x04', '.docx'))
+
+
+def _open_source(source):
+    """Return an input pdfplumber, PyPDF2 and python-docx can open.
+
+    Paths are returned as-is; in-memory bytes get a fresh stream on every
+    call so independent readers never share a file position.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def _detect_file_ext(source):
+    """Return the file extension for a path or in-memory document"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.splitext(source)[1].lower()
+    head = bytes(source[:4])
+    for signature, file_ext in FILE_SIGNATURES:
+        if head.startswith(signature):
+            return file_ext
+    raise ValueError("Unsupported file type: could not detect the document type")
+
+
+def _iter_pdfplumber_pages(pdf, source, start, end):
+    """Yield pages [start, end) of an open pdfplumber document"""
+    pypdf_reader = None
+    for index in range(start, end):
+        started = time.perf_counter()
+        try:
+            page = pdf.pages[index]
+            text = page.extract_text() or ""
+            # Release parsed layout objects so long documents stay bounded in memory
+            page.flush_cache()
+            method = 'pdfplumber'
+        except MemoryError:
+            # Out of memory is a limit of the whole job, not a page to fall back on
+            raise
+        except Exception as e:
+            logger.warning("pdfplumber failed on page %d: %s", index + 1, e)
+            # Fallback to PyPDF2 for this page only
+            try:
+                if pypdf_reader is None:
+                    pypdf_reader = PyPDF2.PdfReader(_open_source(source))
+                text = pypdf_reader.pages[index].extract_text() or ""
+                method = 'PyPDF2'
+            except Exception as e2:
+                logger.warning("PyPDF2 also failed on page %d: %s", index + 1, e2)
+                text = ""
+                method = 'failed'
+        yield {'page': index + 1, 'text': text, 'method': method, 'seconds': time.perf_counter() - started}
+
+
+def _iter_pypdf_pages(source):
+    """Yield every page of a PDF using PyPDF2 only"""
+    pdf_reader = PyPDF2.PdfReader(_open_source(source))
+    for index, page in enumerate(pdf_reader.pages):
+        started = time.perf_counter()
+        text = page.extract_text() or ""
+        yield {'page': index + 1, 'text': text, 'method': 'PyPDF2', 'seconds': time.perf_counter() - started}
+
+
+class _ContactsFound:
+    """Early-exit check for contacts-only parsing.
+
+    Called with each newly read chunk of text, never the whole text read so
+    far, and remembers which fields earlier chunks provided. A title-case
+    heading only counts as the name in the first chunk, as in a full parse.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self.found = set()
+        self.first_chunk = True
+
+    def __call__(self, chunk):
+        contacts = self.extractor.extract(chunk, heading=self.first_chunk)
+        self.found.update(field for field in ('name', 'email', 'phone') if contacts[field])
+        self.first_chunk = False
+        return len(self.found) == 3
+
 
 class ResumeParser:
     def __init__(self):
         """Initialize the resume parser"""
-        pass
+        self.extractor = ContactExtractor()
     
-    def parse_resume(self, file_path):
-        """Parse resume file and extract information"""
-        file_ext = os.path.splitext(file_path)[1].lower()
-        
+    def parse_resume(self, source, contacts_only=False, file_ext=None):
+        """Parse resume file and extract information.
+
+        ``source`` is a file path, the document bytes (``bytes`` or a
+        ``memoryview``) or a readable file-like object. ``file_ext`` is taken
+        from the path, or detected from the content when not given.
+
+        With ``contacts_only`` the document is read lazily, reading stops as
+        soon as name, email and phone have all been found, and the text is
+        not returned. The values are those of the text read up to then: an
+        explicit ``Name:``, ``Email:`` or ``Phone:`` line further down, which
+        a full parse prefers, is not seen. Cache the two modes separately.
+        """
+        if hasattr(source, 'read'):
+            source = source.read()
+        file_ext = (file_ext or _detect_file_ext(source)).lower()
+        stop_when = _ContactsFound(self.extractor) if contacts_only else None
+        
+        page_timings = None
         if file_ext == '.pdf':
-            text = self._extract_pdf_text(file_path)
+            text, page_timings = self._extract_pdf_text(source, stop_when=stop_when)
         elif file_ext in ['.docx', '.doc']:
-            text = self._extract_docx_text(file_path)
+            text = self._extract_docx_text(source, stop_when=stop_when)
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
         
-        # Debug: print extracted text
-        print(f"DEBUG: Extracted text: {repr(text)}")
-        
         # Extract only name, email, and phone
-        name = self._extract_name(text)
-        email = self._extract_email(text)
-        phone = self._extract_phone(text)
-        
-        print(f"DEBUG: Extracted name: {repr(name)}")
-        print(f"DEBUG: Extracted email: {repr(email)}")
-        print(f"DEBUG: Extracted phone: {repr(phone)}")
+        contacts = self.extractor.extract(text)
+        name = contacts['name']
+        email = contacts['email']
+        phone = contacts['phone']
+        
+        # Contact details are PII: values only at DEBUG, presence at INFO
+        logger.info(
+            "Parsed resume",
+            extra={
+                'file_type': file_ext,
+                'chars': len(text),
+                'pages': len(page_timings) if page_timings is not None else None,
+                'found': [field for field, value in (('name', name), ('email', email), ('phone', phone)) if value]
+            }
+        )
+        logger.debug("Extracted contacts: name=%r email=%r phone=%r", name, email, phone)
         
         result = {
             'name': name,
             'email': email,
             'phone': phone,
-            'text': text
+            'text': None if contacts_only else text,
+            'confidence': contacts['confidence'],
+            'pages': page_timings
         }
         
         return result
     
-    def _extract_pdf_text(self, file_path):
-        """Extract text from PDF file using multiple methods"""
-        text = ""
-        
+    def _extract_pdf_text(self, source, stop_when=None):
+        """Extract text from PDF file page by page.
+
+        Returns the text and per-page timing. Each page's text is passed to
+        ``stop_when(page_text)`` and extraction stops once it returns True.
+        """
+        page_texts = []
+        page_timings = []
+
+        pages = self.iter_pdf_pages(source)
+        try:
+            for page in pages:
+                page_timings.append({
+                    'page': page['page'],
+                    'method': page['method'],
+                    'seconds': round(page['seconds'], 4),
+                    'chars': len(page['text'])
+                })
+                if page['text']:
+                    page_texts.append(page['text'])
+                    if stop_when is not None and stop_when(page['text']):
+                        break
+        finally:
+            pages.close()
+
+        if page_timings and all(p['method'] == 'failed' for p in page_timings):
+            raise Exception("Failed to extract text from PDF")
+
+        return "\n".join(page_texts).strip(), page_timings
+
+    def iter_pdf_pages(self, source):
+        """Yield extracted pages in order, falling back to PyPDF2 per page"""
         # Try pdfplumber first (better for complex layouts)
         try:
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            pdf = pdfplumber.open(_open_source(source))
+        except MemoryError:
+            raise
         except Exception as e:
-            print(f"pdfplumber failed: {e}")
-            
-            # Fallback to PyPDF2
+            logger.warning("pdfplumber failed: %s", e)
+            # Fallback to PyPDF2 for the whole document
             try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    for page in pdf_reader.pages:
-                        text += page.extract_text() + "\n"
+                yield from _iter_pypdf_pages(source)
             except Exception as e2:
-                print(f"PyPDF2 also failed: {e2}")
+                logger.error("PyPDF2 also failed: %s", e2)
                 raise Exception("Failed to extract text from PDF")
-        
-        return text.strip()
+            return
+
+        with pdf:
+            yield from _iter_pdfplumber_pages(pdf, source, 0, len(pdf.pages))
     
-    def _extract_docx_text(self, file_path):
-        """Extract text from DOCX file"""
+    def _extract_docx_text(self, source, stop_when=None):
+        """Extract text from DOCX file.
+
+        Paragraphs are read in order. Every few paragraphs the ones read since
+        the last check are passed to ``stop_when(new_text)`` and reading stops
+        once it returns True.
+        """
         try:
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            doc = Document(_open_source(source))
+            paragraph_texts = []
+            for i, paragraph in enumerate(doc.paragraphs, start=1):
+                paragraph_texts.append(paragraph.text)
+                # Check every few paragraphs to keep the early-exit test cheap
+                if stop_when is not None and i % DOCX_STOP_CHECK_INTERVAL == 0 and stop_when(
+                    "\n".join(paragraph_texts[-DOCX_STOP_CHECK_INTERVAL:])
+                ):
+                    break
+            return "\n".join(paragraph_texts).strip()
+        except MemoryError:
+            raise
         except Exception as e:
             raise Exception(f"Failed to extract text from DOCX: {e}")
-    
-    def _extract_name(self, text):
-        """Extract name from resume text"""
-        lines = text.split('\n')
-        
-        # First, look for explicit "Name:" pattern
-        for line in lines:
-            line = line.strip()
-            if line.lower().startswith('name:'):
-                name = line[5:].strip()  # Remove "Name:" prefix
-                if name and len(name) < 100:
-                    return name
-        
-        # Look for name in first few lines (original logic)
-        for i, line in enumerate(lines[:5]):
-            line = line.strip()
-            if len(line) > 0 and len(line) < 100:  # Reasonable name length
-                # Check if line looks like a name (2-4 words, title case)
-                words = line.split()
-                if 2 <= len(words) <= 4:
-                    # Check if all words start with capital letters
-                    if all(word[0].isupper() for word in words if word):
-                        # Avoid common non-name patterns
-                        if not any(word.lower() in ['resume', 'cv', 'curriculum', 'vitae'] for word in words):
-                            return line
-        
-        # If no name found, try to extract from email (common pattern: firstname.lastname@domain.com)
-        email = self._extract_email(text)
-        if email and '@' in email:
-            local_part = email.split('@')[0]
-            if '.' in local_part:
-                # Convert firstname.lastname to "Firstname Lastname"
-                name_parts = local_part.split('.')
-                if len(name_parts) == 2:
-                    name = f"{name_parts[0].capitalize()} {name_parts[1].capitalize()}"
-                    return name
-            else:
-                # If no dot in email, use the local part as first name
-                if len(local_part) > 2:  # Avoid very short names
-                    return local_part.capitalize()
-        
-        return None
-    
-    def _extract_email(self, text):
-        """Extract email address from text"""
-        lines = text.split('\n')
-        
-        # First, look for explicit "Email:" or "email:" pattern
-        for line in lines:
-            line = line.strip()
-            print(f"DEBUG: Checking line for email: {repr(line)}")
-            if line.lower().startswith('email:'):
-                email = line[6:].strip()  # Remove "email:" prefix
-                print(f"DEBUG: Found email prefix, extracted: {repr(email)}")
-                if email:
-                    try:
-                        validate_email(email)
-                        print(f"DEBUG: Email validation passed: {email}")
-                        return email
-                    except EmailNotValidError as e:
-                        print(f"DEBUG: Email validation failed: {e}")
-                        pass
-        
-        # Then look for email patterns in the text
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        print(f"DEBUG: Found emails with regex: {emails}")
-        
-        if emails:
-            # Validate email
-            try:
-                validate_email(emails[0])
-                print(f"DEBUG: Regex email validation passed: {emails[0]}")
-                return emails[0]
-            except EmailNotValidError as e:
-                print(f"DEBUG: Regex email validation failed: {e}")
-                pass
-        
-        print("DEBUG: No email found")
-        return None
-    
-    def _extract_phone(self, text):
-        """Extract phone number from text"""
-        lines = text.split('\n')
-        
-        # First, look for explicit "Phone:" pattern
-        for line in lines:
-            line = line.strip()
-            if line.lower().startswith('phone:'):
-                phone = line[6:].strip()  # Remove "Phone:" prefix
-                if phone:
-                    # Clean the phone number
-                    phone_str = re.sub(r'[^\d+]', '', phone)
-                    if len(phone_str) >= 10:  # Minimum phone number length
-                        return phone_str
-        
-        # Then look for phone patterns in the text
-        phone_patterns = [
-            r'\+?1?[-.\s]?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})',  # US format
-            r'\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}',  # Simple format
-        ]
-        
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # Clean the first match
-                phone_str = ''.join(matches[0]) if isinstance(matches[0], tuple) else matches[0]
-                phone_str = re.sub(r'[^\d+]', '', phone_str)  # Keep only digits and +
-                
-                if len(phone_str) >= 10:  # Minimum phone number length
-                    return phone_str
-        
-        return None
-    
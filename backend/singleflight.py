@@ -0,0 +1,288 @@
+import os
+import copy
+import json
+import time
+import logging
+import threading
+
+import metrics
+import storage
+
+
+logger = logging.getLogger(__name__)
+
+
+COALESCED = metrics.Counter(
+    'coalesced_requests_total',
+    'Calls by whether they made the upstream call (leader, retry after a leader left no result) '
+    'or shared one in flight (joined, joined_remote)',
+    ('flight', 'role')
+)
+
+_MISSING = object()
+
+
+class _Flight:
+    """An upstream call in progress in this process, with the callers waiting for it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = _MISSING
+        self.error = None
+
+
+class Call:
+    """One caller's part in a flight.
+
+    A ``leader`` makes the upstream call and must end with ``finish``,
+    ``fail`` or ``abandon``. Any other caller calls ``wait``, which returns
+    (True, result) once the leader finishes, re-raises the leader's
+    exception when the leader ran in this process, or returns
+    (False, None) when no result came (the leader failed in another worker,
+    gave up or timed out). In that last case the caller has become the
+    leader and makes the call itself; a caller that waited in this process
+    then has the role ``retry``.
+    """
+
+    def __init__(self, group, key, flight, role):
+        self.group = group
+        self.key = key
+        self.role = role
+        self._flight = flight
+
+    @property
+    def leader(self):
+        return self.role in ('leader', 'local', 'alone', 'retry')
+
+    def wait(self):
+        if self.role == 'joined':
+            finished = self._flight.done.wait(self.group.timeout)
+            if finished and self._flight.error is not None:
+                COALESCED.inc(flight=self.group.name, role='joined')
+                raise self._flight.error
+            if finished and self._flight.result is not _MISSING:
+                COALESCED.inc(flight=self.group.name, role='joined')
+                return True, copy.deepcopy(self._flight.result)
+            # Not shared with anyone: the waiters of this process follow the original leader
+            logger.warning(
+                "Flight leader left no result, calling upstream again",
+                extra={'flight': self.group.name, 'timed_out': not finished}
+            )
+            self.role = 'retry'
+            return False, None
+
+        if self.role == 'remote':
+            result = self.group._wait_remote(self.key)
+            if result is not _MISSING:
+                COALESCED.inc(flight=self.group.name, role='joined_remote')
+                self._land(result=result)
+                return True, copy.deepcopy(result)
+            # Still lead the waiters of this process, without taking over the shared entry
+            self.role = 'local'
+            return False, None
+
+        raise RuntimeError("The leader of a flight has nothing to wait for")
+
+    def finish(self, result):
+        """Hand the result of the upstream call to every waiting caller"""
+        COALESCED.inc(flight=self.group.name, role=self._counted_role)
+        if self.role == 'leader' and self.group.shared:
+            self.group._store(self.key, result=result)
+        if self.role in ('leader', 'local'):
+            self._land(result=result)
+
+    def fail(self, error):
+        """Raise ``error`` in the callers waiting in this process; other workers call upstream themselves"""
+        COALESCED.inc(flight=self.group.name, role=self._counted_role)
+        if self.role == 'leader' and self.group.shared:
+            self.group._store(self.key, error=str(error))
+        if self.role in ('leader', 'local'):
+            self._land(error=error)
+
+    def abandon(self):
+        """End the flight without a result, e.g. when the client went away"""
+        if self.role == 'leader' and self.group.shared:
+            self.group._discard(self.key)
+        if self.role in ('leader', 'local'):
+            self._land()
+
+    @property
+    def _counted_role(self):
+        return 'retry' if self.role == 'retry' else 'leader'
+
+    def _land(self, result=_MISSING, error=None):
+        flight = self._flight
+        flight.result = result
+        flight.error = error
+        with self.group._lock:
+            if self.group._flights.get(self.key) is flight:
+                del self.group._flights[self.key]
+        flight.done.set()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical upstream calls into one.
+
+    Callers pass a key identifying the call's canonical input; while a call
+    for a key is in flight, later callers wait for its result instead of
+    making their own. Within a worker process the waiters share an event.
+    Across workers the leader holds a lease row in a SQLite table shared by
+    all workers (``shared``): one caller per other process polls that row
+    for the result and hands it on to the waiters of its own process. A
+    leader that dies is detected when its lease (``timeout`` seconds) runs
+    out. Results are kept only briefly, for followers that are still
+    polling; caching them longer is left to the caller.
+    """
+
+    def __init__(self, name, timeout, db_path=None, enabled=None, shared=None, result_window=10.0, poll_interval=0.05):
+        """Initialize the group from arguments or environment variables"""
+        self.name = name
+        self.timeout = timeout
+        self.db_path = db_path or storage.data_path('singleflight.db')
+        self.enabled = enabled if enabled is not None else os.getenv('COALESCE_REQUESTS', 'true').lower() == 'true'
+        self.shared = shared if shared is not None else os.getenv('COALESCE_SHARED', 'true').lower() == 'true'
+        self.result_window = result_window
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._flights = {}
+        if self.enabled and self.shared:
+            self._init_db()
+
+    def _connect(self):
+        return storage.connect(self.db_path)
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS flights (
+                    flight TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    lease_until REAL,
+                    expires_at REAL,
+                    PRIMARY KEY (flight, key)
+                );
+            """)
+        finally:
+            conn.close()
+
+    def begin(self, key):
+        """Join the flight for ``key``, or start it; returns this caller's Call"""
+        if not self.enabled:
+            return Call(self, key, _Flight(), 'alone')
+
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return Call(self, key, flight, 'joined')
+            flight = self._flights[key] = _Flight()
+
+        if not self.shared:
+            return Call(self, key, flight, 'local')
+        try:
+            leading = self._acquire(key)
+        except Exception:
+            logger.exception("Failed to take a shared flight lease", extra={'flight': self.name})
+            return Call(self, key, flight, 'local')
+        return Call(self, key, flight, 'leader' if leading else 'remote')
+
+    def do(self, key, fn):
+        """Return (fn(), shared): the result of ``fn``, computed once for concurrent callers with the same key"""
+        call = self.begin(key)
+        if not call.leader:
+            found, result = call.wait()
+            if found:
+                return result, True
+        try:
+            result = fn()
+        except Exception as e:
+            call.fail(e)
+            raise
+        except BaseException:
+            call.abandon()
+            raise
+        call.finish(result)
+        return result, False
+
+    @storage.blocking
+    def _acquire(self, key):
+        """Take the shared lease for ``key``; returns False if another worker holds it"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    "SELECT status, lease_until FROM flights WHERE flight = ? AND key = ?", (self.name, key)
+                ).fetchone()
+                if row is not None and row['status'] == 'running' and row['lease_until'] > now:
+                    conn.execute('ROLLBACK')
+                    return False
+                conn.execute(
+                    "DELETE FROM flights WHERE flight = ? AND status != 'running' AND expires_at <= ?", (self.name, now)
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO flights (flight, key, status, lease_until) VALUES (?, ?, 'running', ?)",
+                    (self.name, key, now + self.timeout)
+                )
+                conn.execute('COMMIT')
+                return True
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        finally:
+            conn.close()
+
+    @storage.blocking
+    def _store(self, key, result=None, error=None):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "UPDATE flights SET status = ?, result = ?, lease_until = NULL, expires_at = ? WHERE flight = ? AND key = ?",
+                    ('failed' if error is not None else 'done', json.dumps(result) if error is None else None,
+                     time.time() + self.result_window, self.name, key)
+                )
+            finally:
+                conn.close()
+        except Exception:
+            # Followers in other workers call upstream themselves once the lease runs out
+            logger.exception("Failed to store a shared flight result", extra={'flight': self.name})
+
+    @storage.blocking
+    def _discard(self, key):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("DELETE FROM flights WHERE flight = ? AND key = ?", (self.name, key))
+            finally:
+                conn.close()
+        except Exception:
+            logger.exception("Failed to discard a shared flight", extra={'flight': self.name})
+
+    @storage.blocking
+    def _read(self, key):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT status, result, lease_until FROM flights WHERE flight = ? AND key = ?", (self.name, key)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _wait_remote(self, key):
+        """Poll the leader's row in another worker until it has a result; _MISSING if none comes"""
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline:
+            row = self._read(key)
+            if row is None or row['status'] == 'failed':
+                return _MISSING
+            if row['status'] == 'done':
+                return json.loads(row['result'])
+            if row['lease_until'] <= time.time():
+                return _MISSING
+            time.sleep(self.poll_interval)
+        return _MISSING
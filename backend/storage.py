@@ -0,0 +1,77 @@
+import os
+import sys
+import sqlite3
+import functools
+
+
+def data_dir():
+    """Return the directory for local stores shared by all workers"""
+    path = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_path(filename):
+    """Return the path of a file inside the data directory"""
+    return os.path.join(data_dir(), filename)
+
+
+# Databases this process has already switched to WAL mode
+_wal_paths = set()
+
+
+def connect(db_path):
+    """Open a SQLite connection suitable for concurrent use by several processes"""
+    conn = sqlite3.connect(db_path, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    if db_path not in _wal_paths:
+        # WAL mode is stored in the database file, so it only needs setting once
+        conn.execute('PRAGMA journal_mode=WAL')
+        _wal_paths.add(db_path)
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+# Per OS thread state; a real thread-local even under monkey patching
+_thread_state = None
+
+
+def _pool_state(monkey):
+    global _thread_state
+    if _thread_state is None:
+        _thread_state = monkey.get_original('threading', 'local')()
+    return _thread_state
+
+
+def _gevent_hub():
+    """Return the gevent hub if this call runs on it under monkey patching, else None"""
+    monkey = sys.modules.get('gevent.monkey')
+    if monkey is None or not monkey.is_module_patched('threading'):
+        return None
+    # Calls made from gevent's thread pool may block their own thread
+    if getattr(_pool_state(monkey), 'offloaded', False):
+        return None
+    import gevent
+    return gevent.get_hub()
+
+
+def _run_offloaded(fn, args, kwargs):
+    _pool_state(sys.modules['gevent.monkey']).offloaded = True
+    return fn(*args, **kwargs)
+
+
+def blocking(fn):
+    """Run ``fn`` in gevent's thread pool when serving with gevent.
+
+    SQLite calls block in C, including while they wait out the busy
+    timeout for another worker's write lock, and greenlets cannot yield
+    there. Offloading them keeps the other requests of the worker running.
+    Without gevent, ``fn`` is called directly.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        hub = _gevent_hub()
+        if hub is None:
+            return fn(*args, **kwargs)
+        return hub.threadpool.apply(_run_offloaded, (fn, args, kwargs))
+    return wrapper
@@ -0,0 +1,58 @@
+import json
+
+
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_comment(text):
+    """Format a server-sent comment line, which clients ignore; keeps an idle stream open"""
+    return f": {text}\n\n"
+
+
+class JSONObjectStream:
+    """Incrementally extracts top-level JSON objects from streamed text.
+
+    Feed it the chunks of a completion that contains a JSON array of objects
+    (optionally wrapped in prose or a markdown code block); ``feed`` returns
+    every object whose closing brace arrived in that chunk.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """Consume a chunk of text and return the objects it completed"""
+        completed = []
+        for char in chunk:
+            if self._depth > 0:
+                self._buffer.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"' and self._depth > 0:
+                self._in_string = True
+            elif char == '{':
+                if self._depth == 0:
+                    self._buffer = [char]
+                self._depth += 1
+            elif char == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        completed.append(json.loads(''.join(self._buffer)))
+                    except json.JSONDecodeError:
+                        pass
+                    self._buffer = []
+        return completed
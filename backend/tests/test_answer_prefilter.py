@@ -0,0 +1,94 @@
+import pytest
+
+from answer_prefilter import AnswerPrefilter, DEFAULT_RULES
+
+
+# Answers the pre-filter must score locally, with the rule expected to catch them
+JUNK = [
+    ('', 'empty'),
+    ('   ', 'empty'),
+    ('idk', 'too_short'),
+    ('dunno', 'too_short'),
+    ('12345', 'too_short'),
+    ('fdkjvbvvkbvsd', 'gibberish'),
+    ('asdfghjklqwerty', 'gibberish'),
+    ('aaaaaaa', 'repeated_character'),
+    ('..........', 'repeated_character'),
+    ("I don't know", 'non_answer'),
+    ("I don't know.", 'non_answer'),
+    ('i dont know!', 'non_answer'),
+    ('I do not know', 'non_answer'),
+    ('No idea.', 'too_short'),
+    ('Not sure...', 'non_answer'),
+    ('not sure sorry', 'non_answer'),
+    ('whatever.', 'too_short'),
+    ('!!!! ???? !!!!', 'punctuation_only'),
+    ('-- -- -- -- --', 'punctuation_only'),
+    ('?!?!?!?!?!?!', 'punctuation_only'),
+    ('test test test test', 'repeated_word'),
+    ('blah blah blah blah blah', 'repeated_word'),
+    ('answer answer answer answer', 'repeated_word')
+]
+
+# Answers that must go on to the LLM
+GENUINE = [
+    'The virtual DOM is an in-memory tree React diffs against the previous render.',
+    'let and const are block scoped while var is function scoped and hoisted.',
+    'Use cursor based pagination with a stable sort key and a capped page size.',
+    'Expand then contract: add columns, dual write, backfill, switch reads, drop old columns.',
+    'Closures capture variables from the enclosing scope.',
+    'REST API', 'SQL joins', 'useEffect', 'Promises', 'CSS grid', 'git rebase', 'Docker',
+    'O(n log n)',
+    'I think a hash map gives O(1) lookups on average.',
+    'Probably an index on the foreign key column would fix the slow join.',
+    'Not sure about the exact syntax, but I would debounce the input handler.',
+    '0.30000000000000004',
+    '2^10 = 1024',
+    '404 then 301 redirect',
+    'SELECT * FROM users WHERE id = 1'
+]
+
+
+@pytest.fixture
+def prefilter():
+    return AnswerPrefilter(disabled=[])
+
+
+def test_rejects_every_junk_answer(prefilter):
+    rejected = [answer for answer, _ in JUNK if prefilter.classify(answer) is not None]
+    assert len(rejected) / len(JUNK) == 1.0
+
+
+def test_never_rejects_a_genuine_answer(prefilter):
+    assert [answer for answer in GENUINE if prefilter.classify(answer) is not None] == []
+
+
+@pytest.mark.parametrize('answer, rule', JUNK)
+def test_junk_is_caught_by_the_expected_rule(prefilter, answer, rule):
+    assert prefilter.classify(answer)[0] == rule
+
+
+def test_rejections_have_the_score_response_shape(prefilter):
+    _, response = prefilter.classify('?!?!?!?!?!?!')
+    assert response['success'] is True
+    assert response['score'] == 5
+    assert set(response['detailed_scores']) == {
+        'technical_accuracy', 'problem_solving', 'communication', 'relevance', 'depth_of_knowledge'
+    }
+
+
+def test_classify_many_matches_classify(prefilter):
+    answers = [answer for answer, _ in JUNK] + GENUINE + ['idk', 'idk', None]
+    assert prefilter.classify_many(answers) == [prefilter.classify(answer) for answer in answers]
+
+
+def test_disabled_rules_are_skipped():
+    prefilter = AnswerPrefilter(disabled=['repeated_word', 'punctuation_only'])
+    assert prefilter.classify('test test test test') is None
+    assert prefilter.classify('!!!! ???? !!!!') is None
+    assert prefilter.classify('') is not None
+
+
+def test_rule_names_are_unique():
+    names = [rule[0] for rule in DEFAULT_RULES]
+    assert len(names) == len(set(names))
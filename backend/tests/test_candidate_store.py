@@ -0,0 +1,38 @@
+import pytest
+
+from candidate_store import MAX_PAGE_SIZE, CandidateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CandidateStore(db_path=str(tmp_path / 'candidates.db'))
+    store.upsert([
+        {'id': f'candidate_{i}', 'name': f'Cand{i} Example', 'email': f'candidate{i}@example.com'}
+        for i in range(450)
+    ])
+    return store
+
+
+def page_limits(store, monkeypatch):
+    limits = []
+    page = store._page
+
+    def traced(**kwargs):
+        limits.append(kwargs['limit'])
+        return page(**kwargs)
+
+    monkeypatch.setattr(store, '_page', traced)
+    return limits
+
+
+def test_list_caps_page_size(store, monkeypatch):
+    limits = page_limits(store, monkeypatch)
+    assert len(store.list(limit=500)['candidates']) == MAX_PAGE_SIZE
+    assert limits == [MAX_PAGE_SIZE]
+
+
+def test_export_uses_the_requested_batch_size(store, monkeypatch):
+    limits = page_limits(store, monkeypatch)
+    exported = [candidate['id'] for candidate in store.iter_export(batch_size=300)]
+    assert limits == [300, 300]
+    assert len(exported) == len(set(exported)) == 450
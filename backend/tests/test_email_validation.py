@@ -0,0 +1,26 @@
+import email_validation
+from email_validation import DeliverabilityChecker, _domain_key
+
+
+def test_domain_key_uses_ascii_form():
+    assert _domain_key('jordan@Bücher.Example') == 'xn--bcher-kva.example'
+    assert _domain_key('jordan@XN--BCHER-KVA.example') == 'xn--bcher-kva.example'
+    assert _domain_key('not an email@Example.COM') == 'example.com'
+
+
+def test_idn_spellings_share_one_lookup(tmp_path, monkeypatch):
+    lookups = []
+
+    def resolve(domain, timeout):
+        lookups.append(domain)
+        return False, 'no MX record'
+
+    monkeypatch.setattr(email_validation, '_resolve_domain', resolve)
+    checker = DeliverabilityChecker(enabled=True, db_path=str(tmp_path / 'email_domains.db'))
+    emails = ['jordan@bücher.example', 'sam@BÜCHER.example', 'alex@xn--bcher-kva.example']
+    assert checker.check(emails) == {email: False for email in emails}
+    assert lookups == ['xn--bcher-kva.example']
+
+    # Cached under the ASCII form for every spelling
+    assert checker.check(['kim@Bücher.example']) == {'kim@Bücher.example': False}
+    assert lookups == ['xn--bcher-kva.example']
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from llm_client import LLMClient, LLMUnavailable
+from rate_limiter import RateLimiter
+from resilience import CircuitBreaker
+from benchmarks.mock_openai import start_mock_server
+
+MESSAGES = [{"role": "user", "content": "Summarize the interview in two sentences."}]
+
+
+@pytest.fixture
+def mock_server():
+    server = start_mock_server(latency=0, jitter=0)
+    yield server
+    server.shutdown()
+
+
+def make_limiter(tmp_path, **config):
+    return RateLimiter(db_path=str(tmp_path / 'rate_limiter.db'), max_wait=0.2, **config)
+
+
+def test_open_breaker_spends_no_quota(tmp_path, mock_server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    limiter = make_limiter(tmp_path)
+    client = LLMClient(base_url=mock_server.base_url, breaker=breaker, rate_limiter=limiter)
+
+    with pytest.raises(LLMUnavailable, match='temporarily unavailable'):
+        client.chat_completion(MESSAGES, max_tokens=50)
+    assert limiter.stats()['acquired'] == 0
+
+
+def test_half_open_probe_is_released_when_quota_runs_out(tmp_path, mock_server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    limiter = make_limiter(tmp_path, requests_per_minute=1)
+    limiter.acquire(1)
+    time.sleep(0.02)
+    client = LLMClient(base_url=mock_server.base_url, breaker=breaker, rate_limiter=limiter)
+
+    with pytest.raises(LLMUnavailable, match='quota is exhausted'):
+        client.chat_completion(MESSAGES, max_tokens=50)
+    # The probe slot was not used up by the call that never went out
+    assert breaker.allow()
+
+
+def test_stream_records_token_usage(tmp_path, mock_server):
+    client = LLMClient(base_url=mock_server.base_url, rate_limiter=make_limiter(tmp_path))
+
+    content = ''.join(client.stream_chat_completion(MESSAGES, max_tokens=50))
+    stats = client.stats()
+    assert content
+    assert stats['prompt_tokens'] == mock_server.config.stats['prompt_tokens'] > 0
+    assert stats['prompt_tokens_estimated'] > 0
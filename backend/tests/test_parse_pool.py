@@ -0,0 +1,35 @@
+import pytest
+
+from parse_pool import ParseLimitExceeded, ParsePool, ParseTimeout
+from resume_parser import ResumeParser
+from benchmarks.common import synthetic_pdf
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**config):
+        pools.append(ParsePool(max_workers=1, **config))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def test_parse_timeout_has_a_message(make_pool):
+    pool = make_pool(timeout=0.2)
+    with pytest.raises(ParseTimeout, match='did not finish within 0.2 seconds'):
+        pool.parse(synthetic_pdf(40), ResumeParser(), file_ext='.pdf')
+
+
+def test_memory_limit_is_a_limit_error(make_pool):
+    # The memory cap needs the resource module, which Windows lacks
+    pytest.importorskip('resource')
+    pool = make_pool(memory_limit_mb=250)
+    with pytest.raises(ParseLimitExceeded, match='memory limit'):
+        pool.parse(synthetic_pdf(100), ResumeParser(), file_ext='.pdf')
+    assert pool.stats()['limit_exceeded'] == 1
+    # The next document gets a fresh process
+    assert pool.parse(synthetic_pdf(1), ResumeParser(), contacts_only=True, file_ext='.pdf')['name'] == 'Jordan Example'
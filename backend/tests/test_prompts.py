@@ -0,0 +1,112 @@
+import json
+
+import pytest
+import requests
+
+from prompts import (
+    SCORE_SYSTEM_PROMPT, SUMMARY_ANSWER_MAX_TOKENS, build_score_messages, build_summary_messages,
+    estimate_message_tokens, estimate_tokens, truncate_to_budget
+)
+from benchmarks.bench_prompts import ANSWERS, legacy_score_messages
+from benchmarks.mock_openai import SCORE, start_mock_server
+
+
+RUBRIC = ['technical_accuracy', 'problem_solving', 'communication', 'relevance', 'depth_of_knowledge']
+
+# Every key of the JSON the scoring prompt asks for
+SCORE_KEYS = ['score', 'feedback', *RUBRIC, 'strengths', 'areas_for_improvement', 'suggestions']
+
+LONG_ANSWER = ' '.join(f'word{i}' for i in range(3000))
+
+
+@pytest.fixture(scope='module')
+def mock_api():
+    server = start_mock_server()
+    yield server
+    server.shutdown()
+
+
+@pytest.mark.parametrize('name,question,answer', ANSWERS, ids=[name for name, _, _ in ANSWERS])
+def test_score_prompt_keeps_rubric_question_answer_and_schema(name, question, answer):
+    messages, truncated = build_score_messages(question, answer)
+    system, user = messages[0]['content'], messages[1]['content']
+
+    for criterion in RUBRIC:
+        assert criterion in system
+    assert '90-100' in system and '0-39' in system
+    schema = json.loads(system[system.index('{'):system.rindex('}') + 1])
+    assert list(schema) == SCORE_KEYS
+
+    assert question['text'] in user
+    assert question['difficulty'] in user
+    assert question['category'] in user
+    if truncated:
+        assert answer.startswith(user.split("Candidate's answer:\n", 1)[1].split(' [... ')[0])
+    else:
+        assert answer.strip() in user
+
+
+@pytest.mark.parametrize('name,question,answer', ANSWERS, ids=[name for name, _, _ in ANSWERS])
+def test_score_prompt_is_smaller_than_legacy_prompt(name, question, answer):
+    compact = estimate_message_tokens(build_score_messages(question, answer)[0])
+    assert compact < estimate_message_tokens(legacy_score_messages(question, answer))
+
+
+def test_system_prompt_is_identical_for_every_answer():
+    assert {build_score_messages(question, answer)[0][0]['content'] for _, question, answer in ANSWERS} == {SCORE_SYSTEM_PROMPT}
+
+
+@pytest.mark.parametrize('max_tokens', [0, 1, 10, 50, 250, 1000])
+def test_truncate_to_budget_stays_within_budget(max_tokens):
+    text, truncated = truncate_to_budget(LONG_ANSWER, max_tokens)
+    assert truncated
+    assert estimate_tokens(text) <= max(max_tokens, estimate_tokens('[... 99999 characters omitted ...]'))
+    assert 'characters omitted' in text
+
+
+def test_truncate_to_budget_keeps_start_and_end_on_word_boundaries():
+    text, _ = truncate_to_budget(LONG_ANSWER, 100)
+    head, tail = text.split(' [... ')
+    assert LONG_ANSWER.startswith(head + ' ')
+    assert LONG_ANSWER.endswith(' ' + tail.split('omitted ...] ')[1])
+    omitted = int(tail.split(' ')[0])
+    assert len(head) + omitted + len(tail.split('omitted ...] ')[1]) == len(LONG_ANSWER)
+
+
+def test_truncate_to_budget_leaves_short_text_alone():
+    assert truncate_to_budget('A closure captures its scope.', 100) == ('A closure captures its scope.', False)
+    assert truncate_to_budget(None, 100) == ('', False)
+
+
+@pytest.mark.parametrize('max_answer_tokens', [50, 200, 1000])
+def test_score_prompt_answer_stays_within_budget(max_answer_tokens):
+    question = ANSWERS[0][1]
+    messages, truncated = build_score_messages(question, LONG_ANSWER, max_answer_tokens=max_answer_tokens)
+    assert truncated
+    # Rounding of the two estimates may add one token
+    answer_tokens = estimate_message_tokens(messages) - estimate_message_tokens(build_score_messages(question, '')[0])
+    assert answer_tokens <= max_answer_tokens + 1
+
+
+def test_summary_prompt_truncates_each_answer():
+    candidate = {
+        'name': 'Ada', 'email': 'ada@example.com', 'finalScore': 80,
+        'questions': [{'text': question['text']} for _, question, _ in ANSWERS[:3]],
+        'answers': [{'answer': LONG_ANSWER, 'score': 70} for _ in range(3)]
+    }
+    prompt = build_summary_messages(candidate)[1]['content']
+    for i in range(3):
+        answer = prompt.split(f'A{i + 1}: ', 1)[1].split('\nScore:', 1)[0]
+        assert estimate_tokens(answer) <= SUMMARY_ANSWER_MAX_TOKENS
+    assert 'Questions answered: 3/3' in prompt
+
+
+def test_compact_prompt_scores_against_mock_api(mock_api):
+    for _, question, answer in ANSWERS:
+        messages, _ = build_score_messages(question, answer)
+        response = requests.post(f'{mock_api.base_url}/chat/completions',
+                                 json={'model': 'gpt-3.5-turbo', 'messages': messages, 'temperature': 0}, timeout=5)
+        assert response.status_code == 200
+        assert json.loads(response.json()['choices'][0]['message']['content']) == SCORE
+        # The mock counts prompt tokens the same way, so the estimate is never low
+        assert response.json()['usage']['prompt_tokens'] <= estimate_message_tokens(messages)
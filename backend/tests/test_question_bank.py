@@ -0,0 +1,62 @@
+import time
+
+from question_bank import DIFFICULTIES, QuestionBank
+
+
+def question_set(start):
+    return [
+        {'text': f'Question number {start + i} about {difficulty} topics?', 'difficulty': difficulty, 'category': 'Backend'}
+        for i, difficulty in enumerate(DIFFICULTIES * 2)
+    ]
+
+
+def lease_expiry(bank):
+    conn = bank._connect()
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'refill_lease'").fetchone()
+    finally:
+        conn.close()
+    return row['value'] if row else None
+
+
+def test_refill_renews_lease_before_every_call(tmp_path):
+    expiries = []
+
+    def generator():
+        expiries.append(lease_expiry(bank))
+        time.sleep(0.01)
+        return question_set(len(expiries) * 10)
+
+    bank = QuestionBank(generator, db_path=str(tmp_path / 'bank.db'), target=4, max_refill_calls=5, refill_lease=60)
+    assert bank.refill() == 12
+    assert len(expiries) == 2
+    assert expiries[1] > expiries[0] > time.time() + 50
+    # Released once the refill is done
+    assert lease_expiry(bank) is None
+
+
+def test_refill_stops_when_lease_was_taken_over(tmp_path):
+    calls = []
+
+    def generator():
+        calls.append(1)
+        # Another worker takes over the lease while this call runs
+        conn = bank._connect()
+        try:
+            conn.execute("UPDATE meta SET value = ? WHERE key = 'refill_lease'", (time.time() + 1000,))
+        finally:
+            conn.close()
+        return question_set(0)[:1]
+
+    bank = QuestionBank(generator, db_path=str(tmp_path / 'bank.db'), target=4, max_refill_calls=5, refill_lease=60)
+    bank.refill()
+    taken_over = lease_expiry(bank)
+    assert len(calls) == 1
+    # The other worker's lease is left in place
+    assert taken_over is not None and taken_over > time.time() + 900
+
+
+def test_refill_skipped_while_lease_is_held(tmp_path):
+    bank = QuestionBank(lambda: question_set(0), db_path=str(tmp_path / 'bank.db'), target=4, refill_lease=60)
+    assert bank._acquire_lease(60) is not None
+    assert bank.refill() == 0
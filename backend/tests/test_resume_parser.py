@@ -0,0 +1,60 @@
+import io
+
+import pytest
+from docx import Document
+
+from resume_parser import ResumeParser, _ContactsFound
+from benchmarks.common import synthetic_pdf
+
+
+@pytest.fixture(scope='module')
+def parser():
+    return ResumeParser()
+
+
+def test_contacts_found_across_chunks(parser):
+    check = _ContactsFound(parser.extractor)
+    assert not check('Jordan Example\nFrontend developer')
+    assert not check('Email: jordan.example@gmail.com')
+    assert check('Phone: +1 (555) 010-2030')
+
+
+def test_contacts_found_ignores_heading_after_first_chunk(parser):
+    check = _ContactsFound(parser.extractor)
+    assert not check('Built services in react and node.')
+    assert not check('Senior Frontend Developer\nPhone: +1 (555) 010-2030')
+    assert check('Name: Jordan Example\nEmail: jordan@example.com')
+
+
+def test_contacts_found_takes_name_from_email_in_later_chunk(parser):
+    check = _ContactsFound(parser.extractor)
+    assert not check('Built services in react and node.')
+    assert check('Senior Frontend Developer\nPhone: +1 (555) 010-2030\nEmail: jordan.example@gmail.com')
+
+
+def test_contacts_only_pdf_stops_after_first_page(parser):
+    result = parser.parse_resume(synthetic_pdf(10), contacts_only=True, file_ext='.pdf')
+    assert (result['name'], result['email'], result['phone']) == ('Jordan Example', 'jordan.example@gmail.com', '5550102030')
+    assert len(result['pages']) == 1
+    assert result['text'] is None
+
+
+def test_full_parse_pdf_reads_every_page(parser):
+    result = parser.parse_resume(synthetic_pdf(10), file_ext='.pdf')
+    assert len(result['pages']) == 10
+    assert result['text'].startswith('Jordan Example')
+
+
+def test_contacts_only_keeps_values_found_before_stopping(parser):
+    document = Document()
+    for line in ['Jordan Example', 'jordan.example@gmail.com', '+1 (555) 010-2030']:
+        document.add_paragraph(line)
+    for _ in range(20):
+        document.add_paragraph('Built services in react and node.')
+    document.add_paragraph('Name: Jordan A. Example')
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    # Documented difference: the full parse prefers the explicit Name: line it reads later
+    assert parser.parse_resume(buffer.getvalue(), contacts_only=True, file_ext='.docx')['name'] == 'Jordan Example'
+    assert parser.parse_resume(buffer.getvalue(), file_ext='.docx')['name'] == 'Jordan A. Example'
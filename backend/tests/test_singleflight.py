@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from singleflight import COALESCED, SingleFlight
+
+
+@pytest.fixture
+def flights():
+    return SingleFlight('test', timeout=5, enabled=True, shared=False)
+
+
+def started_waiter(flights, key):
+    """Join the flight for ``key`` in another thread; returns (thread, outcome dict)"""
+    outcome = {}
+    joined = threading.Event()
+
+    def wait():
+        call = flights.begin(key)
+        outcome['call'] = call
+        joined.set()
+        outcome['result'] = call.wait()
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    joined.wait(5)
+    return thread, outcome
+
+
+def test_joined_caller_shares_the_result(flights):
+    leader = flights.begin('k')
+    thread, outcome = started_waiter(flights, 'k')
+    assert outcome['call'].role == 'joined'
+    leader.finish({'score': 70})
+    thread.join(5)
+    assert outcome['result'] == (True, {'score': 70})
+
+
+def test_joined_caller_retries_when_leader_abandons(flights, caplog):
+    leader = flights.begin('k')
+    thread, outcome = started_waiter(flights, 'k')
+    leader.abandon()
+    thread.join(5)
+
+    call = outcome['call']
+    assert outcome['result'] == (False, None)
+    assert call.role == 'retry' and call.leader
+    assert 'left no result' in caplog.text
+
+    before = COALESCED._values.get(('test', 'retry'), 0)
+    call.finish({'score': 70})
+    assert COALESCED._values.get(('test', 'retry'), 0) == before + 1
@@ -43,6 +43,7 @@ const InterviewChat: React.FC<InterviewChatProps> = ({ extractedData }) => {
     showWelcomeBackModal,
     chatHistory,
     candidateId,
+    candidateInfo,
   } = useSelector((state: RootState) => state.interview);
 
   const [answer, setAnswer] = useState("");
@@ -386,10 +387,19 @@ const InterviewChat: React.FC<InterviewChatProps> = ({ extractedData }) => {
     }
 
     try {
-      // ===== Score the answer ===== //
+      // ===== Score the answer; the final one also starts the summary ===== //
+      const isFinalAnswer = currentQuestionIndex + 1 >= questions.length;
       const scoringResult = await aiService.scoreAnswer(
         currentQuestion,
-        answer
+        answer,
+        isFinalAnswer && candidateInfo
+          ? {
+              name: candidateInfo.name,
+              email: candidateInfo.email,
+              answers,
+              questions,
+            }
+          : undefined
       );
 
       const answerData: InterviewAnswer = {
@@ -411,7 +421,7 @@ const InterviewChat: React.FC<InterviewChatProps> = ({ extractedData }) => {
       setAnswer("");
 
       // ===== Check if interview is complete ===== //
-      if (currentQuestionIndex + 1 >= questions.length) {
+      if (isFinalAnswer) {
         setTimeout(() => {
           dispatch(completeInterview());
         }, 1000);
@@ -428,6 +438,8 @@ const InterviewChat: React.FC<InterviewChatProps> = ({ extractedData }) => {
     timeRemaining,
     currentQuestionIndex,
     questions,
+    answers,
+    candidateInfo,
     dispatch,
     isCollectingInfo,
     missingFields,
@@ -10,7 +10,7 @@ export const API_CONFIG = {
     GENERATE_QUESTIONS: "/chat/generate-questions",
     SCORE_ANSWER: "/chat/score-answer",
     GENERATE_SUMMARY: "/chat/generate-summary",
-    PARSE_RESUME: "/resume/parse",
+    PARSE_RESUME: "/resume/parse?include_text=true",
   },
   TIMEOUT: 30000, // 30 seconds
   RETRY_ATTEMPTS: 3,
@@ -40,7 +40,14 @@ class AIService {
 
   async scoreAnswer(
     question: InterviewQuestion,
-    answer: string
+    answer: string,
+    // ===== Pass with the final answer so the backend starts the summary right away ===== //
+    summaryCandidate?: {
+      name: string;
+      email: string;
+      answers: { answer: string; score: number }[];
+      questions: { text: string }[];
+    }
   ): Promise<{
     score: number;
     feedback: string;
@@ -64,7 +71,11 @@ class AIService {
           headers: {
             "Content-Type": "application/json",
           },
-          body: JSON.stringify({ question, answer }),
+          body: JSON.stringify({
+            question,
+            answer,
+            ...(summaryCandidate && { summary_candidate: summaryCandidate }),
+          }),
         }
       );
 